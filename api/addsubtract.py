@@ -1,11 +1,39 @@
-from datetime import datetime, timedelta
-from typing import Union
-from fastapi import APIRouter, HTTPException
+import math
+from datetime import timedelta
+from typing import Optional, Union
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel
+from core import calendar_math, settings
+from core.business_days import get_calendar
+from core.metrics import PhaseTimer
+from core.parsing import parse_datetime
+from core.streaming import STREAM_OPENAPI, STREAM_RESPONSES, stream_rows
+from core.transitions import format_offset, get_table
 
 router = APIRouter()
 
-@router.get("/addsubtract/", response_model=dict, responses={
+
+class AddSubtractResponse(BaseModel):
+    original: str
+    amount: float
+    unit: str
+    result: str
+    timezone: Optional[str] = None
+
+
+UNITS = ["seconds", "minutes", "hours", "days", "weeks", "months", "years", "business_days"]
+# Con zona horaria estas unidades avanzan en tiempo absoluto; el resto, en hora local
+ABSOLUTE_UNITS = ["seconds", "minutes", "hours"]
+MICROSECOND = timedelta(microseconds=1)
+INVALID_DATE_OPERATION_MSG = "Invalid date operation resulting in an invalid date."
+INVALID_TIMEZONE_MSG = "Invalid time zone. Check available zones here: https://en.wikipedia.org/wiki/List_of_tz_database_time_zones"
+
+
+@router.get("/addsubtract/", response_model=AddSubtractResponse, response_model_exclude_none=True, responses={
     200: {"description": "Successful response", "content": {"application/json": {"example": {"original": "2021-05-31T00:00:00", "amount": 5, "unit": "days", "result": "2021-06-05T00:00:00"}}}},
+    400: {"description": "Bad Request", "content": {"application/json": {
+        "example": {"detail": "Day 31 does not exist in 2021-06."}
+    }}},
     422: {"description": "Validation Error", "content": {"application/json": {
     "example": {
         "detail": [
@@ -26,32 +54,58 @@ router = APIRouter()
             },
             {
                 "loc": ["query", "unit"],
-                "msg": "Unit must be 'days', 'weeks', or 'years'.",
+                "msg": "Unit must be 'seconds', 'minutes', 'hours', 'days', 'weeks', 'months', 'years', or 'business_days'.",
                 "type": "value_error"
             }
         ]
     }
 }}}
 })
-def add_subtract_time(date_str: str, amount: Union[int, float], unit: str, operation: str) -> dict:
+async def add_subtract_time(
+    date_str: str,
+    amount: Union[int, float],
+    unit: str,
+    operation: str,
+    calendar: Optional[str] = None,
+    time_str: str = "00:00:00",
+    timezone: Optional[str] = None,
+    overflow: Optional[str] = None
+) -> dict:
     """
-    Add or subtract a specified amount of time (days, weeks, or years) from a given date.
+    Add or subtract a specified amount of time from a given date.
 
     Parameters:
     - date_str (str): The base date in the format 'YYYY-MM-DD'.
-    - amount (Union[int, float]): The amount of time to add or subtract (can be integer or float for days/weeks).
-    - unit (str): The unit of time to add or subtract (days, weeks, or years).
+    - amount (Union[int, float]): The amount of time to add or subtract. Months and
+      years must add up to a whole number of months (1.5 years is 18 months);
+      business_days must be an integer.
+    - unit (str): seconds, minutes, hours, days, weeks, months, years, or business_days.
     - operation (str): The operation to perform. Must be 'add' or 'subtract'.
+    - calendar (Optional[str]): Holiday calendar skipped by 'business_days' (e.g., 'us_federal').
+      Without it only weekends are skipped.
+    - time_str (str): Time of day of the base date in 'HH:MM:SS' format. Default '00:00:00'.
+    - timezone (Optional[str]): IANA timezone of the base date. Seconds, minutes and
+      hours are then added in absolute time (adding 1 hour across a DST change moves
+      the clock by 0 or 2 hours), while days and longer units keep the local time of
+      day. Results that fall in a DST gap are moved forward by the gap.
+    - overflow (Optional[str]): What to do when months/years land on a day the target
+      month does not have (e.g., Jan 31 + 1 month): 'clamp' (last day of the month),
+      'overflow' (carry into the next month) or 'error' (400).
+      Default: DATETIME_MONTH_OVERFLOW_POLICY ('clamp').
 
     Returns:
     - dict: The resulting date after adding or subtracting the specified time in a detailed format.
+      With a timezone, 'original' and 'result' include their UTC offsets.
 
     Raises:
-    - HTTPException: If the date format is incorrect, the unit is invalid, or the operation is invalid.
+    - HTTPException: If the date format is incorrect, the amount is not finite, the unit,
+      operation, timezone or overflow policy is invalid (422), or the result does not
+      exist or falls outside years 1 to 9999 (400).
     """
+    phases = PhaseTimer("addsubtract")
     try:
         # Convertir el string de fecha a un objeto datetime
-        date = datetime.strptime(date_str, "%Y-%m-%d")
+        date = parse_datetime(date_str, time_str)
     except ValueError:
         raise HTTPException(status_code=422, detail="Invalid date format. Expected 'YYYY-MM-DD'.")
 
@@ -60,38 +114,112 @@ def add_subtract_time(date_str: str, amount: Union[int, float], unit: str, opera
         num = float(amount)
     except ValueError:
         raise HTTPException(status_code=422, detail="Amount must be an integer or float.")
+    if not math.isfinite(num):
+        raise HTTPException(status_code=422, detail="Amount must be a finite number.")
 
     # Validar operación y unidad
     if operation not in ["add", "subtract"]:
         raise HTTPException(status_code=422, detail="Operation must be 'add' or 'subtract'.")
-    if unit not in ["days", "weeks", "years"]:
-        raise HTTPException(status_code=422, detail="Unit must be 'days', 'weeks', or 'years'.")
-
-    if unit == "days":
-        delta = timedelta(days=num)
-    elif unit == "weeks":
-        delta = timedelta(weeks=num)
-    elif unit == "years":
+    if unit not in UNITS:
+        raise HTTPException(status_code=422, detail="Unit must be 'seconds', 'minutes', 'hours', 'days', 'weeks', 'months', 'years', or 'business_days'.")
+    policy = overflow or settings.MONTH_OVERFLOW_POLICY
+    if policy not in calendar_math.POLICIES:
+        raise HTTPException(status_code=422, detail="Overflow must be 'clamp', 'overflow', or 'error'.")
+
+    table = None
+    if timezone:
         try:
-            new_year = date.year + num if operation == "add" else date.year - num
-            # Asegurarnos de que el año sea un entero
-            result_date = date.replace(year=int(new_year))
+            table = get_table(timezone)
         except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid date operation resulting in an invalid date.")
+            raise HTTPException(status_code=422, detail=INVALID_TIMEZONE_MSG)
+
+    sign = 1 if operation == "add" else -1
+    if unit in calendar_math.MONTH_UNITS:
+        steps = num * calendar_math.MONTH_UNITS[unit]
+        if not steps.is_integer():
+            raise HTTPException(status_code=422, detail="Amount must add up to a whole number of months for 'months' and 'years'.")
+        steps = sign * int(steps)
+    elif unit == "business_days":
+        if not num.is_integer():
+            raise HTTPException(status_code=422, detail="Amount must be an integer for business_days.")
+        try:
+            holidays = get_calendar(calendar)
+        except ValueError:
+            raise HTTPException(status_code=422, detail="Unknown holiday calendar.")
+        steps = sign * int(num)
+    elif num.is_integer():
+        steps = sign * int(num) * calendar_math.FIXED_UNITS[unit]
     else:
-        delta = None  # Nunca se alcanzará por la validación anterior
+        # Cantidades fraccionarias: mismo redondeo al microsegundo que timedelta
+        try:
+            steps = sign * (timedelta(**{unit: num}) // MICROSECOND)
+        except OverflowError:
+            raise HTTPException(status_code=400, detail=INVALID_DATE_OPERATION_MSG)
+    phases.mark("parse")
 
-    # Para 'days' y 'weeks', aplicar el delta directamente
-    if unit in ["days", "weeks"]:
-        result_date = date + delta if operation == "add" else date - delta
+    start = calendar_math.to_microseconds(date.year, date.month, date.day, date.hour, date.minute, date.second)
+    try:
+        if table is not None:
+            # Normalizar la hora de partida (una hora inexistente avanza con el salto)
+            utc_seconds = table.resolve(start // 1000000)[0]
+            start_offset = table.offset_at(utc_seconds)[0]
+            start = (utc_seconds + start_offset) * 1000000
+
+        if unit == "business_days":
+            days, time_of_day = divmod(start, calendar_math.MICROSECONDS_PER_DAY)
+            ordinal = holidays.add_ordinal(days + calendar_math.EPOCH_ORDINAL, steps)
+            result = (ordinal - calendar_math.EPOCH_ORDINAL) * calendar_math.MICROSECONDS_PER_DAY + time_of_day
+        elif table is not None and unit in ABSOLUTE_UNITS:
+            result = calendar_math.shift(start - start_offset * 1000000, steps, unit) + start_offset * 1000000
+        else:
+            result = calendar_math.shift(start, steps, unit, policy)
+
+        if table is not None:
+            # Pasar por UTC para aplicar el offset vigente en el instante resultante
+            if unit in ABSOLUTE_UNITS:
+                utc = result - start_offset * 1000000
+            else:
+                utc = table.resolve(result // 1000000)[0] * 1000000 + result % 1000000
+            result_offset = table.offset_at(utc // 1000000)[0]
+            result = utc + result_offset * 1000000
+            if not calendar_math.in_range(result):
+                raise ValueError("Result outside the supported date range.")
+    except calendar_math.MissingDayError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except (ValueError, OverflowError):
+        # También los resultados que caen fuera de los años 1-9999 al pasar por la zona horaria
+        raise HTTPException(status_code=400, detail=INVALID_DATE_OPERATION_MSG)
 
     # Formatear las fechas como ISO 8601
-    original_date_iso = date.isoformat()
-    result_date_iso = result_date.isoformat()
+    original_date_iso = calendar_math.isoformat(start)
+    result_date_iso = calendar_math.isoformat(result)
+    if table is not None:
+        original_date_iso += format_offset(start_offset)
+        result_date_iso += format_offset(result_offset)
+    phases.mark("compute")
 
-    return {
+    response = {
         "original": original_date_iso,
         "amount": num if num.is_integer() else num,  # Devuelve int si es .0
         "unit": unit,
         "result": result_date_iso
-    }
\ No newline at end of file
+    }
+    if table is not None:
+        response["timezone"] = timezone
+    return response
+
+
+@router.post("/addsubtract/stream", responses=STREAM_RESPONSES, openapi_extra=STREAM_OPENAPI)
+async def add_subtract_time_stream(request: Request):
+    """
+    Run `add_subtract_time` over every row of an NDJSON or CSV upload and stream
+    the results back as NDJSON. Rows use the GET query parameter names.
+
+    Example (application/x-ndjson):
+        {"date_str": "2021-05-31", "amount": 5, "unit": "days", "operation": "add"}
+
+    Example (text/csv):
+        date_str,amount,unit,operation
+        2021-05-31,5,days,add
+    """
+    return stream_rows(request, add_subtract_time)
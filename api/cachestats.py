@@ -0,0 +1,45 @@
+from fastapi import APIRouter
+from pydantic import BaseModel
+from typing import Dict, Optional
+from core.cache import response_cache
+
+router = APIRouter()
+
+
+class CacheStatsResponse(BaseModel):
+    enabled: bool
+    backend: str
+    entries: int
+    max_entries: Optional[int]
+    evictions: Optional[int]
+    ttl_seconds: int
+    hits: int
+    misses: int
+    hit_ratio: float
+
+
+@router.get("/cache/stats/", response_model=CacheStatsResponse, responses={
+    200: {
+        "description": "Successful response",
+        "content": {
+            "application/json": {
+                "example": {
+                    "enabled": True,
+                    "backend": "MemoryBackend",
+                    "entries": 120,
+                    "max_entries": 10000,
+                    "evictions": 0,
+                    "ttl_seconds": 3600,
+                    "hits": 950,
+                    "misses": 120,
+                    "hit_ratio": 0.88785
+                }
+            }
+        }
+    }
+})
+async def get_cache_stats() -> Dict:
+    """
+    Report the state of the response cache: size, hit/miss counters and hit ratio.
+    """
+    return response_cache.stats()
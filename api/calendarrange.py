@@ -0,0 +1,182 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import Dict, List
+from core import settings
+from core.business_days import available_calendars
+from core.calendar_index import DAYS_EN, count_weekday, iso_week_dates, weekday_dates
+from core.parsing import parse_date
+
+router = APIRouter()
+
+
+class IsoWeekDatesResponse(BaseModel):
+    iso_year: int
+    iso_week: int
+    dates: List[str]
+
+
+class WeekdayDatesResponse(BaseModel):
+    start_date: str
+    end_date: str
+    weekday: int
+    day_of_week: str
+    count: int
+    dates: List[str]
+
+
+class HolidayCalendarsResponse(BaseModel):
+    calendars: List[str]
+
+
+@router.get("/calendar/isoweek/", response_model=IsoWeekDatesResponse, responses={
+    200: {
+        "description": "Successful response",
+        "content": {
+            "application/json": {
+                "example": {
+                    "iso_year": 2021,
+                    "iso_week": 22,
+                    "dates": ["2021-05-31", "2021-06-01", "2021-06-02", "2021-06-03",
+                              "2021-06-04", "2021-06-05", "2021-06-06"]
+                }
+            }
+        }
+    },
+    422: {
+        "description": "Validation Error",
+        "content": {
+            "application/json": {
+                "example": {
+                    "detail": "ISO year 2021 has no week 53."
+                }
+            }
+        }
+    }
+})
+async def get_iso_week_dates(iso_year: int, iso_week: int) -> Dict:
+    """
+    List every date (Monday to Sunday) of an ISO 8601 week.
+
+    Parameters:
+    - iso_year (int): ISO year
+    - iso_week (int): ISO week number (1-53)
+
+    Returns:
+        Dictionary containing:
+        - iso_year: ISO year
+        - iso_week: ISO week number
+        - dates: The seven dates of the week in 'YYYY-MM-DD' format
+
+    Example:
+        /calendar/isoweek/?iso_year=2021&iso_week=22
+    """
+    try:
+        dates = [value.isoformat() for value in iso_week_dates(iso_year, iso_week)]
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"ISO year {iso_year} has no week {iso_week}.")
+
+    return {
+        "iso_year": iso_year,
+        "iso_week": iso_week,
+        "dates": dates
+    }
+
+
+@router.get("/calendar/weekdays/", response_model=WeekdayDatesResponse, responses={
+    200: {
+        "description": "Successful response",
+        "content": {
+            "application/json": {
+                "example": {
+                    "start_date": "2024-05-01",
+                    "end_date": "2024-05-31",
+                    "weekday": 0,
+                    "day_of_week": "Monday",
+                    "count": 4,
+                    "dates": ["2024-05-06", "2024-05-13", "2024-05-20", "2024-05-27"]
+                }
+            }
+        }
+    },
+    422: {
+        "description": "Validation Error",
+        "content": {
+            "application/json": {
+                "example": {
+                    "detail": "Invalid date format. Expected 'YYYY-MM-DD'."
+                }
+            }
+        }
+    }
+})
+async def get_weekday_dates(start_date: str, end_date: str, weekday: int) -> Dict:
+    """
+    List every date falling on a given weekday between two dates (inclusive).
+
+    Parameters:
+    - start_date (str): First date in 'YYYY-MM-DD' format
+    - end_date (str): Last date in 'YYYY-MM-DD' format
+    - weekday (int): Day of the week (0=Monday, 6=Sunday)
+
+    Returns:
+        Dictionary containing:
+        - start_date, end_date: The requested range
+        - weekday: The requested weekday number
+        - day_of_week: English name of the weekday
+        - count: Number of dates found
+        - dates: Matching dates in 'YYYY-MM-DD' format
+
+    Example:
+        /calendar/weekdays/?start_date=2024-05-01&end_date=2024-05-31&weekday=0
+    """
+    try:
+        start = parse_date(start_date)
+        end = parse_date(end_date)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid date format. Expected 'YYYY-MM-DD'.")
+    if not 0 <= weekday <= 6:
+        raise HTTPException(status_code=422, detail="Weekday must be between 0 (Monday) and 6 (Sunday).")
+    if end < start:
+        raise HTTPException(status_code=400, detail="End date must be greater than or equal to start date")
+
+    count = count_weekday(start, end, weekday)
+    if count > settings.CALENDAR_MAX_RESULTS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Range too large: {count} dates (maximum {settings.CALENDAR_MAX_RESULTS})."
+        )
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "weekday": weekday,
+        "day_of_week": DAYS_EN[weekday],
+        "count": count,
+        "dates": [value.isoformat() for value in weekday_dates(start, end, weekday)]
+    }
+
+
+@router.get("/calendar/holidays/", response_model=HolidayCalendarsResponse, responses={
+    200: {
+        "description": "Successful response",
+        "content": {
+            "application/json": {
+                "example": {
+                    "calendars": ["us_federal"]
+                }
+            }
+        }
+    }
+})
+async def list_holiday_calendars() -> Dict:
+    """
+    List the holiday calendars accepted by the `calendar` parameter of
+    /addsubtract/ (unit 'business_days') and /difference/ (business_days=true).
+
+    Returns:
+        Dictionary containing:
+        - calendars: Calendar names in alphabetical order
+    """
+    return {
+        "calendars": sorted(available_calendars())
+    }
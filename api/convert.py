@@ -1,11 +1,142 @@
-from fastapi import APIRouter, HTTPException
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from pydantic import BaseModel
+from core import negotiation
+from core.coalescing import MicroBatcher
+from core.columnar import COLUMNAR_OPENAPI, COLUMNAR_RESPONSES, ColumnarError, column, columnar_response, table_from_columns, timestamp_values, valid_mask
+from core.executor import run_bulk
+from core.metrics import PhaseTimer
+from core.parsing import parse_datetime
+from core.streaming import STREAM_OPENAPI, STREAM_RESPONSES, stream_rows
+from core.timezones import get_zone, get_zone_group
+from core.transitions import OUT_OF_RANGE_MSG
+from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo  # Python 3.9+
-from typing import Optional
+from typing import Iterable, List, Optional, Tuple, Union
 
 router = APIRouter()
 
-@router.get("/convert", response_model=dict, responses={
+INVALID_DATETIME_MSG = "Invalid date or time format. Expected 'YYYY-MM-DD' for date and 'HH:MM:SS' for time."
+INVALID_TIMEZONE_MSG = "Invalid time zone. Check available zones here: https://en.wikipedia.org/wiki/List_of_tz_database_time_zones"
+
+
+class ConvertItem(BaseModel):
+    date: str
+    time: str
+    from_timezone: str
+    to_timezone: str
+
+
+class ConvertBatchRequest(BaseModel):
+    items: Optional[List[ConvertItem]] = None
+    timestamps: Optional[List[str]] = None
+    from_timezone: Optional[str] = None
+    to_timezone: Optional[str] = None
+
+
+class ConvertResponse(BaseModel):
+    original: str
+    from_timezone: str
+    to_timezone: str
+    converted: str
+
+
+class ConvertTarget(BaseModel):
+    to_timezone: str
+    converted: str
+
+
+class ConvertMultiResponse(BaseModel):
+    original: str
+    from_timezone: str
+    count: int
+    conversions: List[ConvertTarget]
+
+
+class ConvertBatchError(BaseModel):
+    index: int
+    error: str
+
+
+class ConvertBatchResponse(BaseModel):
+    count: int
+    errors: int
+    results: List[Union[ConvertResponse, ConvertBatchError]]
+
+
+def _convert(naive_datetime: datetime, from_timezone: str, to_timezone: str,
+             source_timezone: ZoneInfo, target_timezone: ZoneInfo) -> dict:
+    """
+    Convert one wall time between two zones.
+
+    Raises:
+        ValueError: If the instant falls outside years 1 to 9999 in UTC or in
+        the target zone (e.g., 0001-01-01T00:00:00 in Asia/Tokyo).
+    """
+    # Asociar zona horaria y convertir
+    source_datetime = naive_datetime.replace(tzinfo=source_timezone)
+    try:
+        target_datetime = source_datetime.astimezone(target_timezone)
+    except OverflowError:
+        raise ValueError(OUT_OF_RANGE_MSG)
+
+    return {
+        "original": source_datetime.isoformat(),
+        "from_timezone": from_timezone,
+        "to_timezone": to_timezone,
+        "converted": target_datetime.isoformat()
+    }
+
+def _convert_many(items: List[Tuple[datetime, str, str, ZoneInfo, ZoneInfo]]) -> List[Union[dict, Exception]]:
+    """
+    Vectorized `_convert` for the requests grouped by the micro-batcher: the
+    rows of each zone pair are resolved at once through the transition tables.
+    """
+    import numpy as np
+    from core import vectorized
+    from core.calendar_math import EPOCH
+    from core.transitions import format_offset, get_table
+
+    pairs: dict = {}
+    for index, (naive_datetime, from_timezone, to_timezone, _, _) in enumerate(items):
+        pairs.setdefault((from_timezone, to_timezone), []).append(index)
+
+    results: List[Union[dict, Exception]] = [None] * len(items)
+    for (from_timezone, to_timezone), rows in pairs.items():
+        local_seconds = np.array([(items[row][0] - EPOCH) // timedelta(seconds=1) for row in rows], dtype=np.int64)
+        # Misma regla que replace(tzinfo=...) + astimezone(): fold=0
+        utc_seconds, _, _ = vectorized.localize(local_seconds, get_table(from_timezone))
+        target_offsets = vectorized.offsets_at(utc_seconds, get_table(to_timezone))
+        source_offsets = (local_seconds - utc_seconds).tolist()
+        target_local = (utc_seconds + target_offsets).tolist()
+        for row, utc, source_offset, local, target_offset in zip(
+                rows, utc_seconds.tolist(), source_offsets, target_local, target_offsets.tolist()):
+            try:
+                EPOCH + timedelta(seconds=utc)
+            except OverflowError:
+                # Instante UTC fuera de los años 1-9999: las tablas solo conocen
+                # un offset aproximado, así que la fila se resuelve como en GET
+                try:
+                    results[row] = _convert(*items[row])
+                except ValueError as exc:
+                    results[row] = exc
+                continue
+            try:
+                converted = (EPOCH + timedelta(seconds=local)).isoformat()
+            except OverflowError:
+                results[row] = ValueError(OUT_OF_RANGE_MSG)
+                continue
+            results[row] = {
+                "original": items[row][0].isoformat() + format_offset(source_offset),
+                "from_timezone": from_timezone,
+                "to_timezone": to_timezone,
+                "converted": converted + format_offset(target_offset)
+            }
+    return results
+
+
+convert_batcher = MicroBatcher("convert", lambda item: _convert(*item), _convert_many)
+
+@router.get("/convert", response_model=ConvertResponse, responses={
     200: {"description": "Successful response", "content": {"application/json": {"example": {"original": "2024-05-28T15:00:00-05:00", "from_timezone": "America/Bogota", "to_timezone": "America/Argentina/Buenos_Aires", "converted": "2024-05-28T17:00:00-03:00"}}}},
     422: {"description": "Validation Error", "content": {"application/json": {
         "example": {
@@ -34,7 +165,7 @@ router = APIRouter()
         }
     }}}
 })
-def convert_timezone(date: str, time: str, from_timezone: str, to_timezone: str) -> dict:
+async def convert_timezone(date: str, time: str, from_timezone: str, to_timezone: str) -> dict:
     """
     Converts a specified date and time from one time zone to another.
 
@@ -60,36 +191,292 @@ def convert_timezone(date: str, time: str, from_timezone: str, to_timezone: str)
         ```
 
     Exceptions:
-        HTTPException: If the date or time format is incorrect, or the time zone is invalid.
+        HTTPException: If the date or time format is incorrect, the time zone is invalid,
+        or the instant falls outside years 1 to 9999 (422).
     """
+    phases = PhaseTimer("convert")
     try:
-        # Validar fecha y hora por separado
-        datetime.strptime(date, "%Y-%m-%d")
-        datetime.strptime(time, "%H:%M:%S")
-        datetime_str = f"{date}T{time}"
-        naive_datetime = datetime.strptime(datetime_str, "%Y-%m-%dT%H:%M:%S")
-    except ValueError as e:
-        raise HTTPException(
-            status_code=422,
-            detail="Invalid date or time format. Expected 'YYYY-MM-DD' for date and 'HH:MM:SS' for time."
-        )
+        naive_datetime = parse_datetime(date, time)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=INVALID_DATETIME_MSG)
 
     try:
-        source_timezone = ZoneInfo(from_timezone)
-        target_timezone = ZoneInfo(to_timezone)
-    except Exception:
-        raise HTTPException(
-            status_code=422,
-            detail="Invalid time zone. Check available zones here: https://en.wikipedia.org/wiki/List_of_tz_database_time_zones"
-        )
+        source_timezone = get_zone(from_timezone)
+        target_timezone = get_zone(to_timezone)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=INVALID_TIMEZONE_MSG)
+    phases.mark("parse")
 
-    # Asociar zona horaria y convertir
+    try:
+        result = await convert_batcher.submit((naive_datetime, from_timezone, to_timezone,
+                                               source_timezone, target_timezone))
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    phases.mark("compute")
+    return result
+
+
+@router.get("/convert/multi", response_model=ConvertMultiResponse, responses={
+    200: {"description": "Successful response", "content": {"application/json": {"example": {
+        "original": "2024-05-28T15:00:00-05:00",
+        "from_timezone": "America/Bogota",
+        "count": 2,
+        "conversions": [
+            {"to_timezone": "Europe/Madrid", "converted": "2024-05-28T22:00:00+02:00"},
+            {"to_timezone": "Asia/Tokyo", "converted": "2024-05-29T05:00:00+09:00"}
+        ]
+    }}}},
+    422: {"description": "Validation Error", "content": {"application/json": {
+        "example": {"detail": "Provide at least one 'to_timezones' value or a 'group'."}
+    }}}
+})
+async def convert_timezone_multi(date: str, time: str, from_timezone: str,
+                                 to_timezones: Optional[List[str]] = Query(None),
+                                 group: Optional[str] = None) -> dict:
+    """
+    Converts one date and time to many time zones at once.
+
+    Parameters:
+    - date (str): The base date in the 'YYYY-MM-DD' format.
+    - time (str): The base time in the 'HH:MM:SS' format.
+    - from_timezone (str): The original time zone (e.g., 'America/Bogota').
+    - to_timezones (List[str], optional): Target time zones; repeat the
+      parameter or separate the names with commas.
+    - group (str, optional): A named zone group (see /timezones/groups/),
+      added after `to_timezones`.
+
+    Returns:
+        dict: The original date and time, and one {"to_timezone", "converted"}
+        entry per target zone (duplicates removed, in request order).
+
+    Usage Example:
+        ```
+        /convert/multi?date=2024-05-28&time=15:00:00&from_timezone=America/Bogota&to_timezones=Europe/Madrid,Asia/Tokyo&group=offices
+        ```
+
+    Exceptions:
+        HTTPException: If the date or time format is incorrect, a time zone or
+        the group is invalid, no target zone is given, or the instant falls
+        outside years 1 to 9999 in UTC or in a target zone.
+    """
+    phases = PhaseTimer("convert_multi")
+    try:
+        naive_datetime = parse_datetime(date, time)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=INVALID_DATETIME_MSG)
+
+    names = [name.strip() for value in to_timezones or () for name in value.split(",") if name.strip()]
+    if group is not None:
+        try:
+            names.extend(get_zone_group(group))
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+    if not names:
+        raise HTTPException(status_code=422, detail="Provide at least one 'to_timezones' value or a 'group'.")
+
+    try:
+        source_timezone = get_zone(from_timezone)
+        targets = {name: get_zone(name) for name in names}
+    except ValueError:
+        raise HTTPException(status_code=422, detail=INVALID_TIMEZONE_MSG)
+    phases.mark("parse")
+
+    # La hora de origen se resuelve una sola vez; cada zona de destino solo
+    # aplica su offset al mismo instante UTC
     source_datetime = naive_datetime.replace(tzinfo=source_timezone)
-    target_datetime = source_datetime.astimezone(target_timezone)
+    try:
+        instant = source_datetime.astimezone(timezone.utc)
+        conversions = [
+            {"to_timezone": name, "converted": instant.astimezone(target_timezone).isoformat()}
+            for name, target_timezone in targets.items()
+        ]
+    except OverflowError:
+        raise HTTPException(status_code=422, detail=OUT_OF_RANGE_MSG)
+    phases.mark("compute")
 
     return {
         "original": source_datetime.isoformat(),
         "from_timezone": from_timezone,
-        "to_timezone": to_timezone,
-        "converted": target_datetime.isoformat()
-    }
\ No newline at end of file
+        "count": len(conversions),
+        "conversions": conversions
+    }
+
+
+def convert_batch(items: Iterable[Tuple[str, str, str, str]]) -> List[dict]:
+    """
+    Convert many (date, time, from_timezone, to_timezone) rows in one pass,
+    keeping the input order.
+
+    Zones come from the shared registry, so the cost stays linear in the
+    number of rows. Invalid rows produce an {"index", "error"} entry
+    instead of failing the batch.
+    """
+    results = []
+    for index, (date, time, from_timezone, to_timezone) in enumerate(items):
+        try:
+            naive_datetime = parse_datetime(date, time)
+        except ValueError:
+            results.append({"index": index, "error": INVALID_DATETIME_MSG})
+            continue
+
+        try:
+            source_timezone = get_zone(from_timezone)
+            target_timezone = get_zone(to_timezone)
+        except ValueError:
+            results.append({"index": index, "error": INVALID_TIMEZONE_MSG})
+            continue
+
+        try:
+            results.append(_convert(naive_datetime, from_timezone, to_timezone,
+                                    source_timezone, target_timezone))
+        except ValueError as exc:
+            results.append({"index": index, "error": str(exc)})
+    return results
+
+
+def convert_batch_body(items: List[Tuple[str, str, str, str]], wire_format: str = negotiation.JSON) -> bytes:
+    """Convert a batch and render the ConvertBatchResponse in the negotiated wire format (runs in the bulk pool)."""
+    results = convert_batch(items)
+    # Las filas ya tienen la forma de ConvertBatchResponse: se serializan
+    # directamente, sin validar de nuevo cada una contra el modelo
+    return negotiation.dumps({
+        "count": len(results),
+        "errors": sum(1 for result in results if "error" in result),
+        "results": results
+    }, wire_format)
+
+
+@router.post("/convert", response_model=ConvertBatchResponse, responses={
+    200: {"description": "Successful response", "content": {"application/json": {"example": {
+        "count": 2,
+        "errors": 1,
+        "results": [
+            {"original": "2024-05-28T15:00:00-05:00", "from_timezone": "America/Bogota", "to_timezone": "Europe/Madrid", "converted": "2024-05-28T22:00:00+02:00"},
+            {"index": 1, "error": "Invalid time zone. Check available zones here: https://en.wikipedia.org/wiki/List_of_tz_database_time_zones"}
+        ]
+    }}}},
+    422: {"description": "Validation Error", "content": {"application/json": {
+        "example": {
+            "detail": "Provide either 'items' or 'timestamps' with 'from_timezone' and 'to_timezone'."
+        }
+    }}}
+})
+async def convert_timezone_batch(request: ConvertBatchRequest) -> Response:
+    """
+    Converts many date/time values between time zones in a single request.
+
+    Body (one of):
+    - items: list of {"date", "time", "from_timezone", "to_timezone"} objects.
+    - timestamps: list of 'YYYY-MM-DDTHH:MM:SS' strings, converted with the
+      shared "from_timezone" and "to_timezone" fields.
+
+    Returns:
+        dict: "count", number of "errors" and "results" in input order. A row
+        that cannot be converted is reported as {"index": i, "error": "..."}
+        without failing the rest of the batch.
+
+    The conversion runs in the bulk process pool.
+
+    Exceptions:
+        HTTPException: If the body mixes both modes or is missing the shared zones
+        (422), or the bulk pool is full (503).
+    """
+    if request.items is not None and request.timestamps is None:
+        items = [(item.date, item.time, item.from_timezone, item.to_timezone) for item in request.items]
+    elif request.timestamps is not None and request.items is None \
+            and request.from_timezone and request.to_timezone:
+        items = []
+        for timestamp in request.timestamps:
+            date, _, time = timestamp.partition("T")
+            items.append((date, time, request.from_timezone, request.to_timezone))
+    else:
+        raise HTTPException(
+            status_code=422,
+            detail="Provide either 'items' or 'timestamps' with 'from_timezone' and 'to_timezone'."
+        )
+
+    wire_format = negotiation.current()
+    body = await run_bulk(convert_batch_body, items, wire_format)
+    return negotiation.encoded_response(body, wire_format)
+
+
+@router.post("/convert/stream", responses=STREAM_RESPONSES, openapi_extra=STREAM_OPENAPI)
+async def convert_timezone_stream(request: Request):
+    """
+    Run `convert_timezone` over every row of an NDJSON or CSV upload and stream
+    the results back as NDJSON. Rows use the GET query parameter names.
+
+    Example (application/x-ndjson):
+        {"date": "2024-05-28", "time": "15:00:00", "from_timezone": "America/Bogota", "to_timezone": "Europe/Madrid"}
+
+    Example (text/csv):
+        date,time,from_timezone,to_timezone
+        2024-05-28,15:00:00,America/Bogota,Europe/Madrid
+    """
+    return stream_rows(request, convert_timezone)
+
+
+def convert_table(table, from_timezone: Optional[str], to_timezone: str):
+    """Convert the 'timestamp' column of an Arrow table to `to_timezone`."""
+    import numpy as np
+    import pyarrow as pa
+    from core import vectorized
+    from core.transitions import get_table
+
+    timestamps = column(table, "timestamp")
+    values, per_second, zone = timestamp_values(timestamps, "timestamp")
+    seconds, fraction = np.divmod(values, per_second)
+    if zone:
+        # Ya son instantes UTC: la columna convertida reutiliza sus valores
+        utc_seconds = seconds
+        converted = timestamps.cast(pa.timestamp(timestamps.type.unit, tz=to_timezone))
+    else:
+        if not from_timezone:
+            raise ColumnarError("Column 'timestamp' has no time zone: 'from_timezone' is required.")
+        # Horas locales de la zona de origen, resueltas como GET /convert (fold=0)
+        utc_seconds, _, _ = vectorized.localize(seconds, get_table(from_timezone))
+        converted = pa.array(utc_seconds * per_second + fraction,
+                             type=pa.timestamp(timestamps.type.unit, tz=to_timezone),
+                             mask=~valid_mask(timestamps) if timestamps.null_count else None)
+    offsets = vectorized.offsets_at(utc_seconds, get_table(to_timezone))
+
+    return table_from_columns({
+        "timestamp": timestamps,
+        "converted": converted,
+        "converted_local": pa.array((utc_seconds + offsets) * per_second + fraction,
+                                    type=pa.timestamp(timestamps.type.unit),
+                                    mask=~valid_mask(timestamps) if timestamps.null_count else None),
+        "utc_offset": offsets.astype(np.int32)
+    }, valid_mask(timestamps))
+
+
+@router.post("/convert/arrow", responses=COLUMNAR_RESPONSES, openapi_extra=COLUMNAR_OPENAPI)
+async def convert_timezone_arrow(request: Request, to_timezone: str, from_timezone: Optional[str] = None):
+    """
+    Convert a whole timestamp column of an Arrow IPC stream or Parquet body
+    to another time zone.
+
+    Parameters:
+    - to_timezone (str): The time zone to convert to.
+    - from_timezone (str, optional): The zone of the wall times when the
+      column has no time zone (required in that case, ignored otherwise).
+
+    Input column:
+    - timestamp: timestamp of any unit, naive (wall-clock in from_timezone)
+      or with a time zone
+
+    Output columns: timestamp, converted (the same instants typed in
+    to_timezone), converted_local (naive wall-clock time in to_timezone) and
+    utc_offset (int32 seconds). Null timestamps give null rows.
+
+    Exceptions:
+        HTTPException: If a time zone or the body is invalid (422), or the
+        bulk pool is full (503).
+    """
+    try:
+        for name in (from_timezone, to_timezone):
+            if name:
+                get_zone(name)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=INVALID_TIMEZONE_MSG)
+    return await columnar_response(request, convert_table, from_timezone, to_timezone)
@@ -1,26 +1,83 @@
-from fastapi import APIRouter, HTTPException
-from datetime import datetime
-from typing import Optional
+from datetime import timedelta
+from fastapi import APIRouter, HTTPException, Query, Response
+from pydantic import BaseModel, Field
+from typing import Dict, List, Literal, Optional
+from core import calendar_math, negotiation
+from core.executor import run_bulk
+from core.metrics import PhaseTimer
+from core.parsing import parse_datetime
+from core.timezones import is_valid_timezone
+from core.transitions import EPOCH, KINDS, OUT_OF_RANGE_MSG, format_offset, get_table
 
 router = APIRouter()
 
-@router.get("/format-datetime/", response_model=dict, responses={
+INVALID_DATETIME_MSG = "Invalid datetime format. Expected 'YYYY-MM-DD' for date and 'HH:MM:SS' for time."
+INVALID_TIMESTAMP_MSG = "Invalid datetime format. Expected 'YYYY-MM-DDTHH:MM:SS'."
+INVALID_TIMEZONE_MSG = "Invalid time zone. Check available zones here: https://en.wikipedia.org/wiki/List_of_tz_database_time_zones"
+
+# Formato binario de /format-datetime (POST): un registro por fila, little-endian
+# (wall_time es el índice en KINDS: 0=valid, 1=ambiguous, 2=nonexistent)
+BULK_FIELDS = [
+    ("status", "<u2"),
+    ("unix_ms", "<i8"),
+    ("utc_offset", "<i4"),
+    ("wall_time", "|u1"),
+]
+
+
+class FormatDatetimeResponse(BaseModel):
+    unix_ms: int
+    utc_format: str
+    iso_8601: str
+    locale_format: str
+    timezone: Optional[str] = None
+    utc_offset: Optional[str] = None
+    abbreviation: Optional[str] = None
+    wall_time: Optional[str] = None
+
+
+class FormatDatetimeBulkRequest(BaseModel):
+    timestamps: List[str]
+    timezone: Optional[str] = None
+    fold: int = Field(0, ge=0, le=1)
+
+
+class FormatDatetimeBulkError(BaseModel):
+    index: int
+    status_code: int
+    detail: List[Dict]
+
+
+class FormatDatetimeBulkResponse(BaseModel):
+    count: int
+    errors: List[FormatDatetimeBulkError]
+    unix_ms: List[Optional[int]]
+    iso_8601: List[Optional[str]]
+    wall_time: List[Optional[str]]
+
+
+@router.get("/format-datetime/", response_model=FormatDatetimeResponse, response_model_exclude_none=True, responses={
     200: {"description": "Successful response", "content": {"application/json": {"example": {
-        "unix_ms": 1717002000000,
-        "utc_format": "Wed, 29 May 2024 12:00:00 GMT",
-        "iso_8601": "2024-05-29T12:00:00",
-        "locale_format": "May 29, 2024, 12:00:00"
+        "unix_ms": 1716998400000,
+        "utc_format": "Wed, 29 May 2024 16:00:00 GMT",
+        "iso_8601": "2024-05-29T12:00:00-04:00",
+        "locale_format": "May 29, 2024, 12:00:00",
+        "timezone": "America/New_York",
+        "utc_offset": "-04:00",
+        "abbreviation": "EDT",
+        "wall_time": "valid"
     }}}},
     422: {"description": "Validation Error", "content": {"application/json": {
         "example": {
-            "detail": "Invalid datetime format. Expected 'YYYY-MM-DD' for date and 'HH:MM:SS' for time."
+            "detail": INVALID_DATETIME_MSG
         }
     }}}
 })
-def format_datetime(
+async def format_datetime(
     date: str, 
     time: str,
-    timezone: Optional[str] = None
+    timezone: Optional[str] = None,
+    fold: int = Query(0, ge=0, le=1)
 ) -> dict:
     """
     Converts a given date and time to multiple standard formats.
@@ -28,37 +85,194 @@ def format_datetime(
     Parameters:
     - date (str): Date in 'YYYY-MM-DD' format.
     - time (str): Time in 'HH:MM:SS' format.
-    - timezone (Optional[str]): IANA timezone (e.g., 'America/New_York'). Not yet implemented.
+    - timezone (Optional[str]): IANA timezone (e.g., 'America/New_York') the
+      date and time are expressed in. Without it they are taken as UTC.
+    - fold (int): For wall times repeated or skipped by a DST change, 0 uses
+      the offset in effect before the change and 1 the one after (PEP 495). Default 0.
 
     Returns:
         dict: Converted datetime in formats:
             - unix_ms: Unix timestamp in milliseconds
-            - utc_format: RFC 1123 format (e.g., 'Wed, 29 May 2024 12:00:00 GMT')
-            - iso_8601: ISO 8601 format without timezone (e.g., '2024-05-29T12:00:00')
-            - locale_format: Locale-friendly format (e.g., 'May 29, 2024, 12:00:00')
+            - utc_format: RFC 1123 format in UTC (e.g., 'Wed, 29 May 2024 16:00:00 GMT')
+            - iso_8601: ISO 8601 format, with the UTC offset when a timezone is given
+              (e.g., '2024-05-29T12:00:00-04:00')
+            - locale_format: Locale-friendly format of the local time (e.g., 'May 29, 2024, 12:00:00')
+        With a timezone it also includes:
+            - timezone, utc_offset ('+HH:MM') and abbreviation (e.g., 'EDT')
+            - wall_time: 'valid', 'ambiguous' (repeated by a DST change) or
+              'nonexistent' (skipped by a DST change; the local time is
+              reported as the clock reads at the resolved instant)
 
     Example:
-        /format-datetime/?date=2024-05-29&time=12:00:00
+        /format-datetime/?date=2024-05-29&time=12:00:00&timezone=America/New_York
     """
+    phases = PhaseTimer("current")
     try:
         # Validación estricta del formato
-        dt = datetime.strptime(f"{date}T{time}", "%Y-%m-%dT%H:%M:%S")
+        dt = parse_datetime(date, time)
     except ValueError:
         raise HTTPException(
             status_code=422,
-            detail="Invalid datetime format. Expected 'YYYY-MM-DD' for date and 'HH:MM:SS' for time."
+            detail=INVALID_DATETIME_MSG
         )
 
-    # TODO: Implementar manejo de timezone si se necesita
+    table = None
     if timezone:
-        raise HTTPException(
-            status_code=501,
-            detail="Timezone support is not yet implemented."
-        )
+        try:
+            table = get_table(timezone)
+        except ValueError:
+            raise HTTPException(status_code=422, detail=INVALID_TIMEZONE_MSG)
+
+    phases.mark("parse")
+
+    local_seconds = (dt - EPOCH) // timedelta(seconds=1)
+    if table is None:
+        # Sin zona horaria la fecha se interpreta como UTC, no como hora local del servidor
+        result = {
+            "unix_ms": local_seconds * 1000,
+            "utc_format": dt.strftime("%a, %d %b %Y %H:%M:%S GMT"),
+            "iso_8601": dt.isoformat(),
+            "locale_format": dt.strftime("%b %d, %Y, %H:%M:%S")
+        }
+    else:
+        try:
+            utc_seconds, wall_time = table.resolve(local_seconds, fold)
+            offset, abbreviation = table.offset_at(utc_seconds)
+            utc_dt = EPOCH + timedelta(seconds=utc_seconds)
+            local_dt = utc_dt + timedelta(seconds=offset)
+        except (ValueError, OverflowError):
+            # El instante UTC cae fuera de los años 1-9999 (p. ej. 0001-01-01 en Asia/Tokyo)
+            raise HTTPException(status_code=422, detail=OUT_OF_RANGE_MSG)
+        result = {
+            "unix_ms": utc_seconds * 1000,
+            "utc_format": utc_dt.strftime("%a, %d %b %Y %H:%M:%S GMT"),
+            "iso_8601": local_dt.isoformat() + format_offset(offset),
+            "locale_format": local_dt.strftime("%b %d, %Y, %H:%M:%S"),
+            "timezone": timezone,
+            "utc_offset": format_offset(offset),
+            "abbreviation": abbreviation,
+            "wall_time": wall_time
+        }
+    phases.mark("compute")
+    return result
+
+
+def format_datetime_bulk_body(timestamps: List[str], timezone: Optional[str], fold: int,
+                              format: str = "json", wire_format: str = negotiation.JSON) -> bytes:
+    """
+    Resolve many local timestamps to Unix milliseconds and offset-qualified
+    ISO 8601 strings with one transition-table search per column (runs in
+    the bulk pool).
+    """
+    import numpy as np
+    from core import vectorized
 
-    return {
-        "unix_ms": int(dt.timestamp()) * 1000,
-        "utc_format": dt.strftime("%a, %d %b %Y %H:%M:%S GMT"),
-        "iso_8601": dt.isoformat(),
-        "locale_format": dt.strftime("%b %d, %Y, %H:%M:%S")
-    }
\ No newline at end of file
+    local_seconds, valid = vectorized.parse_timestamps(timestamps)
+    parsed = valid.copy()
+    if timezone:
+        utc_seconds, offsets, kinds = vectorized.localize(local_seconds, get_table(timezone), fold)
+        # Como en GET: si el instante UTC cae fuera de los años 1-9999 la fila es un 422
+        utc_days = utc_seconds // 86400 + calendar_math.EPOCH_ORDINAL
+        valid &= (utc_days >= 1) & (utc_days <= calendar_math.MAX_ORDINAL)
+    else:
+        utc_seconds, offsets, kinds = local_seconds, None, np.zeros(len(local_seconds), dtype=np.int8)
+
+    if format == "binary":
+        records = np.zeros(len(local_seconds), dtype=np.dtype(BULK_FIELDS))
+        records["status"] = np.where(valid, 200, 422)
+        records["unix_ms"] = np.where(valid, utc_seconds * 1000, 0)
+        if offsets is not None:
+            records["utc_offset"] = np.where(valid, offsets, 0)
+        records["wall_time"] = np.where(valid, kinds, 0)
+        return records.tobytes()
+
+    local_text = (utc_seconds if offsets is None else utc_seconds + offsets).astype("datetime64[s]")
+    iso_8601 = np.datetime_as_string(local_text).astype(object)
+    if offsets is not None:
+        distinct, inverse = np.unique(offsets, return_inverse=True)
+        iso_8601 += np.array([format_offset(int(offset)) for offset in distinct], dtype=object)[inverse]
+
+    errors = [
+        {
+            "index": index,
+            "status_code": 422,
+            "detail": [{
+                "loc": ["body", "timestamps", index],
+                "msg": INVALID_TIMESTAMP_MSG if not parsed[index] else OUT_OF_RANGE_MSG,
+                "type": "value_error"
+            }]
+        }
+        for index in np.flatnonzero(~valid).tolist()
+    ]
+
+    def column(values) -> list:
+        result = values.tolist()
+        for error in errors:
+            result[error["index"]] = None
+        return result
+
+    return negotiation.dumps({
+        "count": len(timestamps),
+        "errors": errors,
+        "unix_ms": column(utc_seconds * 1000),
+        "iso_8601": column(iso_8601),
+        "wall_time": column(np.array(KINDS, dtype=object)[kinds])
+    }, wire_format)
+
+
+@router.post("/format-datetime/", response_model=FormatDatetimeBulkResponse, responses={
+    200: {"description": "Successful response (columnar JSON, or a packed binary array with format=binary)", "content": {"application/json": {"example": {
+        "count": 3,
+        "errors": [
+            {"index": 2, "status_code": 422, "detail": [
+                {"loc": ["body", "timestamps", 2], "msg": INVALID_TIMESTAMP_MSG, "type": "value_error"}
+            ]}
+        ],
+        "unix_ms": [1710055800000, 1730611800000, None],
+        "iso_8601": ["2024-03-10T03:30:00-04:00", "2024-11-03T01:30:00-04:00", None],
+        "wall_time": ["nonexistent", "ambiguous", None]
+    }}}},
+    422: {"description": "Validation Error", "content": {"application/json": {
+        "example": {
+            "detail": INVALID_TIMEZONE_MSG
+        }
+    }}}
+})
+async def format_datetime_bulk(request: FormatDatetimeBulkRequest,
+                               format: Literal["json", "binary"] = "json") -> Response:
+    """
+    Resolve many local timestamps at once.
+
+    Body:
+    - timestamps: Local datetimes in 'YYYY-MM-DDTHH:MM:SS' format
+    - timezone: IANA timezone of the timestamps (UTC if omitted)
+    - fold: 0 or 1, as in GET /format-datetime/
+
+    Returns columnar JSON with, per row, the Unix timestamp in milliseconds,
+    the ISO 8601 local time with its UTC offset and the kind of wall time.
+    Rows that do not parse, or whose UTC instant falls outside years 1 to
+    9999, are reported in "errors" and hold null in every column. The computation runs in the bulk process pool.
+
+    Parameters:
+    - format: 'json' (columnar, default) or 'binary'. The binary form is the
+      raw little-endian records of BULK_FIELDS (status, unix_ms, utc_offset
+      in seconds, wall_time as an index into 'valid', 'ambiguous',
+      'nonexistent'); its layout is sent in the X-Record-Dtype header.
+
+    Raises:
+        HTTPException: If the time zone is invalid (422), or the bulk
+        pool is full (503)
+    """
+    if request.timezone and not is_valid_timezone(request.timezone):
+        raise HTTPException(status_code=422, detail=INVALID_TIMEZONE_MSG)
+
+    wire_format = negotiation.current()
+    body = await run_bulk(format_datetime_bulk_body, request.timestamps, request.timezone, request.fold,
+                          format, wire_format)
+    if format == "binary":
+        return Response(
+            content=body,
+            media_type="application/octet-stream",
+            headers={"X-Record-Dtype": str(BULK_FIELDS)}
+        )
+    return negotiation.encoded_response(body, wire_format)
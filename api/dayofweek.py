@@ -1,10 +1,23 @@
-from fastapi import APIRouter, HTTPException
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel
 from typing import Literal
+from core.calendar_index import DAYS_EN, DAYS_ES, get_index
+from core.columnar import COLUMNAR_OPENAPI, COLUMNAR_RESPONSES, column, columnar_response, epoch_days, table_from_columns, valid_mask
+from core.metrics import PhaseTimer
+from core.parsing import parse_date
+from core.streaming import STREAM_OPENAPI, STREAM_RESPONSES, stream_rows
 
 router = APIRouter()
 
-@router.get("/dayofweek/", response_model=dict, responses={
+
+class DayOfWeekResponse(BaseModel):
+    date: str
+    day_of_week: str
+    day_of_week_es: str
+    day_number: int
+
+
+@router.get("/dayofweek/", response_model=DayOfWeekResponse, responses={
     200: {"description": "Successful response", "content": {"application/json": {
         "example": {
             "date": "2024-05-28",
@@ -19,7 +32,7 @@ router = APIRouter()
         }
     }}}
 })
-def day_of_week(
+async def day_of_week(
     date_str: str,
     language: Literal['en', 'es'] = 'en'
 ) -> dict:
@@ -41,28 +54,72 @@ def day_of_week(
     Example:
         /dayofweek/?date_str=2024-05-28&language=es
     """
+    phases = PhaseTimer("dayofweek")
     try:
-        date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
+        date_obj = parse_date(date_str)
     except ValueError:
         raise HTTPException(
             status_code=422,
             detail="Invalid date format. Use 'YYYY-MM-DD'."
         )
 
-    days_es = [
-        "Lunes", "Martes", "Miércoles",
-        "Jueves", "Viernes", "Sábado", "Domingo"
-    ]
-    days_en = [
-        "Monday", "Tuesday", "Wednesday",
-        "Thursday", "Friday", "Saturday", "Sunday"
-    ]
+    phases.mark("parse")
 
-    day_num = date_obj.weekday()  # 0=Monday, 6=Sunday
+    day_num = get_index().weekday_of(date_obj)  # 0=Monday, 6=Sunday
+    phases.mark("compute")
 
     return {
         "date": date_str,  # Mantener el string original
-        "day_of_week": days_en[day_num] if language == 'en' else days_es[day_num],
-        "day_of_week_es": days_es[day_num],
+        "day_of_week": DAYS_EN[day_num] if language == 'en' else DAYS_ES[day_num],
+        "day_of_week_es": DAYS_ES[day_num],
         "day_number": day_num
-    }
\ No newline at end of file
+    }
+
+
+@router.post("/dayofweek/stream", responses=STREAM_RESPONSES, openapi_extra=STREAM_OPENAPI)
+async def day_of_week_stream(request: Request):
+    """
+    Run `day_of_week` over every row of an NDJSON or CSV upload and stream
+    the results back as NDJSON. Rows use the GET query parameter names.
+
+    Example (application/x-ndjson):
+        {"date_str": "2024-05-28", "language": "es"}
+
+    Example (text/csv):
+        date_str,language
+        2024-05-28,es
+    """
+    return stream_rows(request, day_of_week)
+
+
+def day_of_week_table(table, language: str):
+    """Compute the day_of_week columns for the 'date' column of an Arrow table."""
+    import numpy as np
+    import pyarrow as pa
+
+    dates = column(table, "date")
+    valid = valid_mask(dates)
+    day_number = ((epoch_days(dates, "date") + 3) % 7).astype(np.uint8)  # 1970-01-01 fue jueves
+    indices = pa.array(day_number.astype(np.int8), mask=None if valid.all() else ~valid)
+    names = pa.array(DAYS_EN if language == 'en' else DAYS_ES)
+
+    return table_from_columns({
+        "date": dates,
+        "day_of_week": pa.DictionaryArray.from_arrays(indices, names),
+        "day_of_week_es": pa.DictionaryArray.from_arrays(indices, pa.array(DAYS_ES)),
+        "day_number": day_number
+    }, valid)
+
+
+@router.post("/dayofweek/arrow", responses=COLUMNAR_RESPONSES, openapi_extra=COLUMNAR_OPENAPI)
+async def day_of_week_arrow(request: Request, language: Literal['en', 'es'] = 'en'):
+    """
+    Compute `day_of_week` for a whole column of an Arrow IPC stream or Parquet body.
+
+    Input column:
+    - date: date32, date64 or timestamp (with a time zone, the date in that zone)
+
+    Output columns: date, day_of_week and day_of_week_es (dictionary-encoded
+    names) and day_number (uint8, 0=Monday). Null dates give null rows.
+    """
+    return await columnar_response(request, day_of_week_table, language)
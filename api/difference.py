@@ -1,10 +1,141 @@
-from fastapi import APIRouter, HTTPException
-from datetime import datetime
-from typing import Dict
+from fastapi import APIRouter, HTTPException, Response, Request
+from pydantic import BaseModel
+from typing import Any, Dict, List, Literal, Optional, Union
+from core import negotiation
+from core.business_days import get_calendar
+from core.coalescing import MicroBatcher
+from core.columnar import COLUMNAR_OPENAPI, COLUMNAR_RESPONSES, ColumnarError, column, columnar_response, table_from_columns, timestamp_values, valid_mask
+from core.executor import run_bulk
+from core.metrics import PhaseTimer
+from core.parsing import parse_datetime
+from core.streaming import STREAM_OPENAPI, STREAM_RESPONSES, stream_rows
 
 router = APIRouter()
 
-@router.get("/difference/", response_model=Dict, responses={
+INVALID_DATETIME_MSG = "Invalid datetime format. Expected 'YYYY-MM-DD' for date and 'HH:MM:SS' for time."
+NEGATIVE_DIFFERENCE_MSG = "End datetime must be greater than or equal to start datetime"
+
+# Formato binario de /difference (POST): un registro por fila, little-endian.
+# Se guarda como lista de campos para no importar NumPy al cargar el módulo.
+BULK_FIELDS = [
+    ("status", "<u2"),
+    ("total_seconds", "<i8"),
+    ("total_days", "<f8"),
+    ("total_hours", "<f8"),
+    ("total_minutes", "<f8"),
+    ("days", "<i8"),
+    ("hours", "|u1"),
+    ("minutes", "|u1"),
+    ("seconds", "|u1"),
+]
+
+
+class DifferenceBulkRequest(BaseModel):
+    starts: List[str]
+    ends: List[str]
+
+
+class Breakdown(BaseModel):
+    days: int
+    hours: int
+    minutes: int
+    seconds: int
+
+
+class Difference(BaseModel):
+    total_days: float
+    total_hours: float
+    total_minutes: float
+    total_seconds: int
+    breakdown: Breakdown
+    business_days: Optional[int] = None
+
+
+class DifferenceResponse(BaseModel):
+    start_datetime: str
+    end_datetime: str
+    difference: Difference
+
+
+class BulkBreakdown(BaseModel):
+    days: List[Optional[int]]
+    hours: List[Optional[int]]
+    minutes: List[Optional[int]]
+    seconds: List[Optional[int]]
+
+
+class BulkDifference(BaseModel):
+    total_days: List[Optional[float]]
+    total_hours: List[Optional[float]]
+    total_minutes: List[Optional[float]]
+    total_seconds: List[Optional[int]]
+    breakdown: BulkBreakdown
+
+
+class BulkRowError(BaseModel):
+    index: int
+    status_code: int
+    detail: Union[str, List[Dict[str, Any]]]
+
+
+class DifferenceBulkResponse(BaseModel):
+    count: int
+    errors: List[BulkRowError]
+    start_datetime: List[Optional[str]]
+    end_datetime: List[Optional[str]]
+    difference: BulkDifference
+
+
+def build_difference(total_seconds: int) -> Dict:
+    """Build the "difference" payload (totals and breakdown) for a second count."""
+    # Descomposición completa
+    days, remainder = divmod(total_seconds, 86400)
+    hours, remainder = divmod(remainder, 3600)
+    minutes, seconds = divmod(remainder, 60)
+
+    return {
+        "total_days": round(total_seconds / 86400, 6),
+        "total_hours": round(total_seconds / 3600, 6),
+        "total_minutes": round(total_seconds / 60, 6),
+        "total_seconds": total_seconds,
+        "breakdown": {
+            "days": days,
+            "hours": hours,
+            "minutes": minutes,
+            "seconds": seconds
+        }
+    }
+
+def build_differences(totals: List[int]) -> List[Dict]:
+    """Vectorized `build_difference` for the requests grouped by the micro-batcher."""
+    import numpy as np
+    from core import vectorized
+
+    total_seconds = np.array(totals, dtype=np.int64)
+    days, hours, minutes, seconds = (values.tolist() for values in vectorized.breakdown(total_seconds))
+    total_days, total_hours, total_minutes = (
+        vectorized.round_ratio(total_seconds, divisor).tolist() for divisor in (86400, 3600, 60)
+    )
+    return [
+        {
+            "total_days": total_days[index],
+            "total_hours": total_hours[index],
+            "total_minutes": total_minutes[index],
+            "total_seconds": total,
+            "breakdown": {
+                "days": days[index],
+                "hours": hours[index],
+                "minutes": minutes[index],
+                "seconds": seconds[index]
+            }
+        }
+        for index, total in enumerate(totals)
+    ]
+
+
+difference_batcher = MicroBatcher("difference", build_difference, build_differences)
+
+@router.get("/difference/", response_model=DifferenceResponse, response_model_exclude_none=True, responses={
     200: {
         "description": "Successful response",
         "content": {
@@ -45,11 +176,13 @@ router = APIRouter()
         }
     }
 })
-def calculate_datetime_difference(
+async def calculate_datetime_difference(
     start_date: str,
     start_time: str,
     end_date: str,
-    end_time: str
+    end_time: str,
+    business_days: bool = False,
+    calendar: Optional[str] = None
 ) -> Dict:
     """
     Calculate the difference between two datetimes with precise breakdown.
@@ -59,6 +192,10 @@ def calculate_datetime_difference(
     - start_time: Start time in 'HH:MM:SS' format
     - end_date: End date in 'YYYY-MM-DD' format
     - end_time: End time in 'HH:MM:SS' format
+    - business_days: Also count the business days from start_date (inclusive)
+      to end_date (exclusive)
+    - calendar: Holiday calendar excluded from that count (e.g., 'us_federal');
+      without it only weekends are excluded
 
     Returns:
         Dictionary containing:
@@ -75,63 +212,297 @@ def calculate_datetime_difference(
                 - minutes: Remaining minutes (0-59)
                 - seconds: Remaining seconds (0-59)
             }
+            - business_days: Business days in [start_date, end_date) (only with business_days=true)
         }
 
     Raises:
-        HTTPException: If any datetime parameter has invalid format
+        HTTPException: If any datetime parameter has invalid format or the calendar is unknown
     """
     # Validación individual de cada campo
+    phases = PhaseTimer("difference")
     errors = []
     try:
-        start_dt = datetime.strptime(f"{start_date}T{start_time}", "%Y-%m-%dT%H:%M:%S")
+        start_dt = parse_datetime(start_date, start_time)
     except ValueError:
         errors.append({
             "loc": ["query", "start_date"],
-            "msg": "Invalid datetime format. Expected 'YYYY-MM-DD' for date and 'HH:MM:SS' for time.",
+            "msg": INVALID_DATETIME_MSG,
             "type": "value_error"
         })
     
     try:
-        end_dt = datetime.strptime(f"{end_date}T{end_time}", "%Y-%m-%dT%H:%M:%S")
+        end_dt = parse_datetime(end_date, end_time)
     except ValueError:
         errors.append({
             "loc": ["query", "end_date"],
-            "msg": "Invalid datetime format. Expected 'YYYY-MM-DD' for date and 'HH:MM:SS' for time.",
+            "msg": INVALID_DATETIME_MSG,
             "type": "value_error"
         })
     
+    if business_days:
+        try:
+            holidays = get_calendar(calendar)
+        except ValueError:
+            errors.append({
+                "loc": ["query", "calendar"],
+                "msg": "Unknown holiday calendar.",
+                "type": "value_error"
+            })
+
     if errors:
         raise HTTPException(status_code=422, detail=errors)
+    phases.mark("parse")
 
     # Validar que end >= start
     if end_dt < start_dt:
         raise HTTPException(
             status_code=400,
-            detail="End datetime must be greater than or equal to start datetime"
+            detail=NEGATIVE_DIFFERENCE_MSG
         )
 
     # Calcular diferencia
     delta = end_dt - start_dt
     total_seconds = int(delta.total_seconds())
     
-    # Descomposición completa
-    days, remainder = divmod(total_seconds, 86400)
-    hours, remainder = divmod(remainder, 3600)
-    minutes, seconds = divmod(remainder, 60)
+    difference = await difference_batcher.submit(total_seconds)
+    if business_days:
+        difference["business_days"] = holidays.count(start_dt.date(), end_dt.date())
+    phases.mark("compute")
 
     return {
         "start_datetime": start_dt.isoformat(),
         "end_datetime": end_dt.isoformat(),
+        "difference": difference
+    }
+
+
+def _bulk_columns(total_seconds, parsed):
+    """
+    Compute the BULK_FIELDS columns for arrays of second differences.
+
+    Returns:
+        (status, columns): 200, 400 (negative) or 422 (not parsed) per row,
+        and the value columns by field name (0 on failed rows).
+    """
+    import numpy as np
+    from core import vectorized
+
+    negative = parsed & (total_seconds < 0)
+    ok = parsed & ~negative
+    total_seconds = np.where(ok, total_seconds, 0)
+
+    days, hours, minutes, seconds = vectorized.breakdown(total_seconds)
+    status = np.where(ok, 200, np.where(negative, 400, 422)).astype(np.uint16)
+    return status, {
+        "total_seconds": total_seconds,
+        "total_days": vectorized.round_ratio(total_seconds, 86400),
+        "total_hours": vectorized.round_ratio(total_seconds, 3600),
+        "total_minutes": vectorized.round_ratio(total_seconds, 60),
+        "days": days,
+        "hours": hours.astype(np.uint8),
+        "minutes": minutes.astype(np.uint8),
+        "seconds": seconds.astype(np.uint8)
+    }
+
+
+def difference_bulk_body(starts: List[str], ends: List[str], format: str,
+                         wire_format: str = negotiation.JSON) -> bytes:
+    """
+    Compute the bulk differences and render them as columnar JSON or as
+    packed BULK_FIELDS records (runs in the bulk pool).
+    """
+    import numpy as np
+    from core import vectorized
+
+    start_seconds, start_valid = vectorized.parse_timestamps(starts)
+    end_seconds, end_valid = vectorized.parse_timestamps(ends)
+    status, columns = _bulk_columns(end_seconds - start_seconds, start_valid & end_valid)
+    ok = status == 200
+    negative = status == 400
+    total_seconds, total_days, total_hours, total_minutes = (
+        columns[name] for name in ("total_seconds", "total_days", "total_hours", "total_minutes")
+    )
+    days, hours, minutes, seconds = (columns[name] for name in ("days", "hours", "minutes", "seconds"))
+
+    if format == "binary":
+        records = np.zeros(len(total_seconds), dtype=np.dtype(BULK_FIELDS))
+        records["status"] = status
+        for name, values in columns.items():
+            records[name] = values
+        return records.tobytes()
+
+    errors = []
+    for index in np.flatnonzero(~ok).tolist():
+        if negative[index]:
+            errors.append({"index": index, "status_code": 400, "detail": NEGATIVE_DIFFERENCE_MSG})
+            continue
+        detail = []
+        if not start_valid[index]:
+            detail.append({"loc": ["body", "starts", index], "msg": INVALID_DATETIME_MSG, "type": "value_error"})
+        if not end_valid[index]:
+            detail.append({"loc": ["body", "ends", index], "msg": INVALID_DATETIME_MSG, "type": "value_error"})
+        errors.append({"index": index, "status_code": 422, "detail": detail})
+
+    def column(values) -> list:
+        result = values.tolist()
+        for error in errors:
+            result[error["index"]] = None
+        return result
+
+    # Columnas construidas aquí con la forma de DifferenceBulkResponse: se
+    # serializan directamente, sin validar de nuevo cada valor
+    return negotiation.dumps({
+        "count": len(total_seconds),
+        "errors": errors,
+        "start_datetime": [value if valid else None for value, valid in zip(starts, start_valid.tolist())],
+        "end_datetime": [value if valid else None for value, valid in zip(ends, end_valid.tolist())],
         "difference": {
-            "total_days": round(total_seconds / 86400, 6),
-            "total_hours": round(total_seconds / 3600, 6),
-            "total_minutes": round(total_seconds / 60, 6),
-            "total_seconds": total_seconds,
+            "total_days": column(total_days),
+            "total_hours": column(total_hours),
+            "total_minutes": column(total_minutes),
+            "total_seconds": column(total_seconds),
             "breakdown": {
-                "days": days,
-                "hours": hours,
-                "minutes": minutes,
-                "seconds": seconds
+                "days": column(days),
+                "hours": column(hours),
+                "minutes": column(minutes),
+                "seconds": column(seconds)
+            }
+        }
+    }, wire_format)
+
+
+@router.post("/difference/", response_model=DifferenceBulkResponse, responses={
+    200: {
+        "description": "Successful response (columnar JSON, or a packed binary array with format=binary)",
+        "content": {
+            "application/json": {
+                "example": {
+                    "count": 2,
+                    "errors": [
+                        {"index": 1, "status_code": 400, "detail": "End datetime must be greater than or equal to start datetime"}
+                    ],
+                    "start_datetime": ["2021-05-31T00:00:00", "2021-06-02T00:00:00"],
+                    "end_datetime": ["2021-06-01T00:00:00", "2021-06-01T00:00:00"],
+                    "difference": {
+                        "total_days": [1.0, None],
+                        "total_hours": [24.0, None],
+                        "total_minutes": [1440.0, None],
+                        "total_seconds": [86400, None],
+                        "breakdown": {
+                            "days": [1, None],
+                            "hours": [0, None],
+                            "minutes": [0, None],
+                            "seconds": [0, None]
+                        }
+                    }
+                }
+            },
+            "application/octet-stream": {}
+        }
+    },
+    422: {
+        "description": "Validation Error",
+        "content": {
+            "application/json": {
+                "example": {
+                    "detail": "'starts' and 'ends' must have the same length."
+                }
             }
         }
-    }
\ No newline at end of file
+    }
+})
+async def calculate_datetime_difference_bulk(
+    request: DifferenceBulkRequest,
+    format: Literal["json", "binary"] = "json"
+):
+    """
+    Calculate many datetime differences at once with NumPy.
+
+    Body:
+    - starts: Start datetimes in 'YYYY-MM-DDTHH:MM:SS' format
+    - ends: End datetimes in 'YYYY-MM-DDTHH:MM:SS' format (same length as starts)
+
+    Each row gives exactly the same values as GET /difference/. Rows that would
+    fail there are reported in "errors" with the same status code and detail,
+    and hold null in every column.
+
+    Parameters:
+    - format: 'json' (columnar, default) or 'binary'. The binary form is the
+      raw little-endian records of BULK_FIELDS (status, total_seconds,
+      total_days, total_hours, total_minutes, days, hours, minutes, seconds);
+      its layout is sent in the X-Record-Dtype header.
+
+    The computation runs in the bulk process pool.
+
+    Raises:
+        HTTPException: If 'starts' and 'ends' differ in length (422), or the
+        bulk pool is full (503)
+    """
+    if len(request.starts) != len(request.ends):
+        raise HTTPException(status_code=422, detail="'starts' and 'ends' must have the same length.")
+
+    wire_format = negotiation.current()
+    body = await run_bulk(difference_bulk_body, request.starts, request.ends, format, wire_format)
+    if format == "binary":
+        return Response(
+            content=body,
+            media_type="application/octet-stream",
+            headers={"X-Record-Dtype": str(BULK_FIELDS)}
+        )
+    return negotiation.encoded_response(body, wire_format)
+
+
+@router.post("/difference/stream", responses=STREAM_RESPONSES, openapi_extra=STREAM_OPENAPI)
+async def calculate_datetime_difference_stream(request: Request):
+    """
+    Run `calculate_datetime_difference` over every row of an NDJSON or CSV upload and stream
+    the results back as NDJSON. Rows use the GET query parameter names.
+
+    Example (application/x-ndjson):
+        {"start_date": "2021-05-31", "start_time": "00:00:00", "end_date": "2021-06-01", "end_time": "00:00:00"}
+
+    Example (text/csv):
+        start_date,start_time,end_date,end_time
+        2021-05-31,00:00:00,2021-06-01,00:00:00
+    """
+    return stream_rows(request, calculate_datetime_difference)
+
+
+def difference_table(table):
+    """Compute the difference columns for the 'start' and 'end' timestamp columns of an Arrow table."""
+    import numpy as np
+    import pyarrow as pa
+
+    starts = column(table, "start")
+    ends = column(table, "end")
+    start_values, start_units, start_zone = timestamp_values(starts, "start")
+    end_values, end_units, end_zone = timestamp_values(ends, "end")
+    if bool(start_zone) != bool(end_zone):
+        raise ColumnarError("Columns 'start' and 'end' must both have a time zone or both be naive.")
+
+    # Segundos y fracción por separado (la fracción en la unidad más fina de
+    # las dos) para no desbordar int64 al cambiar de unidad
+    units = max(start_units, end_units)
+    end_seconds, end_fraction = np.divmod(end_values, end_units)
+    start_seconds, start_fraction = np.divmod(start_values, start_units)
+    fraction = end_fraction * (units // end_units) - start_fraction * (units // start_units)
+    total_seconds = end_seconds - start_seconds + fraction // units
+    status, columns = _bulk_columns(total_seconds, valid_mask(starts) & valid_mask(ends))
+    return table_from_columns({"status": pa.array(status), **columns}, status == 200)
+
+
+@router.post("/difference/arrow", responses=COLUMNAR_RESPONSES, openapi_extra=COLUMNAR_OPENAPI)
+async def calculate_datetime_difference_arrow(request: Request):
+    """
+    Calculate the differences between two timestamp columns of an Arrow IPC
+    stream or Parquet body.
+
+    Input columns:
+    - start, end: timestamps of any unit, both naive (wall-clock) or both with a time zone
+
+    Output columns: status (200, 400 if end < start, 422 if a value is
+    null), total_seconds, total_days, total_hours, total_minutes, days,
+    hours, minutes and seconds, with the same values as GET /difference/;
+    rows whose status is not 200 are null. Sub-second parts are truncated.
+    """
+    return await columnar_response(request, difference_table)
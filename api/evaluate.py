@@ -0,0 +1,195 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Union
+from fastapi import APIRouter, HTTPException, Response
+from pydantic import BaseModel
+from core import negotiation
+from core.business_days import get_calendar
+from core.calendar_index import DAYS_EN
+from core.executor import run_bulk
+from core.expressions import ExpressionSyntaxError, compile_expression
+from core.metrics import PhaseTimer
+from core.parsing import parse_date
+
+router = APIRouter()
+
+INVALID_DATE_MSG = "Invalid date format. Expected 'YYYY-MM-DD'."
+
+
+class EvaluateResponse(BaseModel):
+    expression: str
+    anchor: str
+    result: str
+    day_of_week: str
+
+
+class EvaluateBulkRequest(BaseModel):
+    expression: str
+    anchors: List[str]
+    calendar: Optional[str] = None
+
+
+class EvaluateRowError(BaseModel):
+    index: int
+    status_code: int
+    detail: Union[str, List[Dict[str, Any]]]
+
+
+class EvaluateBulkResponse(BaseModel):
+    expression: str
+    count: int
+    errors: List[EvaluateRowError]
+    results: List[Optional[str]]
+
+
+def _compile(expression: str, source: str):
+    try:
+        return compile_expression(expression)
+    except ExpressionSyntaxError as exc:
+        raise HTTPException(status_code=422, detail=[{"loc": [source, "expression"], "msg": str(exc), "type": "value_error"}])
+
+
+def _calendar(name: Optional[str]):
+    try:
+        return get_calendar(name)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+
+@router.get("/evaluate/", response_model=EvaluateResponse, responses={
+    200: {"description": "Successful response", "content": {"application/json": {"example": {
+        "expression": "last business day of next month",
+        "anchor": "2025-10-15",
+        "result": "2025-11-28",
+        "day_of_week": "Friday"
+    }}}},
+    400: {"description": "Bad Request", "content": {"application/json": {
+        "example": {"detail": "There is no fifth Tuesday in that period."}
+    }}},
+    422: {"description": "Validation Error", "content": {"application/json": {
+        "example": {
+            "detail": [
+                {
+                    "loc": ["query", "expression"],
+                    "msg": "Unexpected 'foo' at word 1; expected a date, 'today', a quantity or a day selector.",
+                    "type": "value_error"
+                }
+            ]
+        }
+    }}}
+})
+async def evaluate_expression(expression: str, anchor: Optional[str] = None,
+                              calendar: Optional[str] = None) -> Dict:
+    """
+    Evaluate a relative date expression such as "last business day of next
+    month", "third Tuesday of 2025-11" or "3 business days after today".
+
+    Parameters:
+    - expression (str): The expression (see the grammar in core/expressions.py).
+      Compiled expressions are cached, so repeating one skips the parser.
+    - anchor (Optional[str]): The date 'today' refers to, in 'YYYY-MM-DD' format.
+      Default: the current date in UTC.
+    - calendar (Optional[str]): Holiday calendar for business days (e.g., 'us_federal').
+      Without it only weekends are skipped.
+
+    Returns:
+        Dictionary containing:
+        - expression: The normalized expression
+        - anchor: The anchor date
+        - result: The resulting date in 'YYYY-MM-DD' format
+        - day_of_week: Day of the week of the result
+
+    Raises:
+        HTTPException: If the expression, anchor or calendar is invalid (422), or the
+        result does not exist or is out of range (400).
+    """
+    phases = PhaseTimer("evaluate")
+    plan = _compile(expression, "query")
+    try:
+        anchor_date = parse_date(anchor) if anchor is not None else datetime.now(timezone.utc).date()
+    except ValueError:
+        raise HTTPException(status_code=422, detail=INVALID_DATE_MSG)
+    holidays = _calendar(calendar)
+    phases.mark("parse")
+
+    try:
+        result = plan.evaluate(anchor_date, holidays)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    phases.mark("compute")
+
+    return {
+        "expression": plan.text,
+        "anchor": anchor_date.isoformat(),
+        "result": result.isoformat(),
+        "day_of_week": DAYS_EN[result.weekday()]
+    }
+
+
+def evaluate_bulk_body(expression: str, anchors: List[str], calendar: Optional[str],
+                       wire_format: str = negotiation.JSON) -> bytes:
+    """Evaluate one expression against every anchor and render EvaluateBulkResponse (runs in the bulk pool)."""
+    plan = compile_expression(expression)
+    holidays = get_calendar(calendar)
+    errors = []
+    results = []
+    for index, anchor in enumerate(anchors):
+        try:
+            anchor_date = parse_date(anchor)
+        except ValueError:
+            errors.append({"index": index, "status_code": 422, "detail": [
+                {"loc": ["body", "anchors", index], "msg": INVALID_DATE_MSG, "type": "value_error"}
+            ]})
+            results.append(None)
+            continue
+        try:
+            results.append(plan.evaluate(anchor_date, holidays).isoformat())
+        except ValueError as exc:
+            errors.append({"index": index, "status_code": 400, "detail": str(exc)})
+            results.append(None)
+
+    return negotiation.dumps({
+        "expression": plan.text,
+        "count": len(results),
+        "errors": errors,
+        "results": results
+    }, wire_format)
+
+
+@router.post("/evaluate/", response_model=EvaluateBulkResponse, responses={
+    200: {"description": "Successful response", "content": {"application/json": {"example": {
+        "expression": "third tuesday of next month",
+        "count": 3,
+        "errors": [{"index": 2, "status_code": 422, "detail": [
+            {"loc": ["body", "anchors", 2], "msg": "Invalid date format. Expected 'YYYY-MM-DD'.", "type": "value_error"}
+        ]}],
+        "results": ["2025-11-18", "2025-12-16", None]
+    }}}},
+    422: {"description": "Validation Error", "content": {"application/json": {
+        "example": {"detail": "Unknown holiday calendar: 'nope'"}
+    }}}
+})
+async def evaluate_expression_bulk(request: EvaluateBulkRequest) -> Response:
+    """
+    Evaluate one expression against many anchor dates.
+
+    Body:
+    - expression: The expression, compiled once for the whole batch.
+    - anchors: Anchor dates in 'YYYY-MM-DD' format.
+    - calendar (optional): Holiday calendar for business days.
+
+    Returns:
+        dict: "expression" (normalized), "count", "errors" and "results" in input
+        order. A row whose anchor is invalid (422) or whose result does not exist
+        (400) is null in "results" and listed in "errors" without failing the batch.
+
+    The evaluation runs in the bulk process pool.
+
+    Exceptions:
+        HTTPException: If the expression or the calendar is invalid (422), or the
+        bulk pool is full (503).
+    """
+    plan = _compile(request.expression, "body")
+    _calendar(request.calendar)
+    wire_format = negotiation.current()
+    body = await run_bulk(evaluate_bulk_body, plan.text, request.anchors, request.calendar, wire_format)
+    return negotiation.encoded_response(body, wire_format)
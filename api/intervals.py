@@ -0,0 +1,318 @@
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import TYPE_CHECKING, Dict, Iterator, Optional
+from api.difference import Difference, build_difference, build_differences
+from core import intervals, negotiation, settings
+from core.executor import run_bulk
+from core.streaming import CSV_MEDIA_TYPE, NDJSON_MEDIA_TYPE, dumps_row, row_media_type
+
+if TYPE_CHECKING:
+    import numpy as np
+
+router = APIRouter()
+
+# Filas por fragmento enviado al cliente
+CHUNK_ROWS = 1000
+
+# Documentación OpenAPI del cuerpo aceptado por los endpoints de intervalos
+INTERVALS_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": {
+                "type": "object",
+                "required": ["starts", "ends"],
+                "properties": {
+                    "starts": {"type": "array", "items": {"type": "string"}},
+                    "ends": {"type": "array", "items": {"type": "string"}},
+                },
+            }, "example": {
+                "starts": ["2024-01-01T09:00:00", "2024-01-01T10:30:00", "2024-01-01T14:00:00"],
+                "ends": ["2024-01-01T11:00:00", "2024-01-01T12:00:00", "2024-01-01T15:00:00"]
+            }},
+            NDJSON_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+            CSV_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
+
+INVALID_INPUT_RESPONSE = {"description": "Validation Error", "content": {"application/json": {"example": {
+    "detail": [{"loc": ["body", "ends", 1], "msg": "End datetime must be greater than or equal to start datetime",
+                "type": "value_error"}]
+}}}}
+
+
+def _rows_response(rows: Iterator[bytes], count: int, wire_format: str) -> StreamingResponse:
+    # Generador síncrono: Starlette lo recorre en un hilo
+    return StreamingResponse(rows, media_type=row_media_type(wire_format), headers={"X-Interval-Count": str(count)})
+
+
+class IntervalSummary(BaseModel):
+    count: int
+    start: Optional[str]
+    end: Optional[str]
+    span: Difference
+    covered: Difference
+    merged_count: int
+    gap_count: int
+    gaps: Difference
+    overlap_count: int
+    overlapped: Difference
+    max_concurrent: int
+    overlapping_pairs: int
+
+
+def _format(seconds: "np.ndarray") -> list:
+    import numpy as np
+    return np.datetime_as_string(seconds.astype("datetime64[s]")).tolist()
+
+
+def iter_interval_rows(starts: "np.ndarray", ends: "np.ndarray", extra: Dict[str, "np.ndarray"],
+                       wire_format: str) -> Iterator[bytes]:
+    """Render intervals (with their duration and any `extra` columns) one chunk at a time."""
+    for offset in range(0, len(starts), CHUNK_ROWS):
+        chunk_starts = starts[offset:offset + CHUNK_ROWS]
+        chunk_ends = ends[offset:offset + CHUNK_ROWS]
+        columns = {name: values[offset:offset + CHUNK_ROWS].tolist() for name, values in extra.items()}
+        differences = build_differences((chunk_ends - chunk_starts).tolist())
+        yield b"".join(
+            dumps_row({
+                "start": start,
+                "end": end,
+                **{name: values[index] for name, values in columns.items()},
+                "difference": difference
+            }, wire_format)
+            for index, (start, end, difference) in enumerate(zip(_format(chunk_starts), _format(chunk_ends), differences))
+        )
+
+
+def iter_pair_rows(order: "np.ndarray", starts: "np.ndarray", ends: "np.ndarray", counts: "np.ndarray",
+                   wire_format: str) -> Iterator[bytes]:
+    """Render every overlapping pair one chunk at a time."""
+    for first, second, overlap_starts, overlap_ends in intervals.iter_pairs(order, starts, ends, counts, CHUNK_ROWS):
+        differences = build_differences((overlap_ends - overlap_starts).tolist())
+        yield b"".join(
+            dumps_row({"first": left, "second": right, "start": start, "end": end, "difference": difference}, wire_format)
+            for left, right, start, end, difference in zip(
+                first.tolist(), second.tolist(), _format(overlap_starts), _format(overlap_ends), differences
+            )
+        )
+
+
+def summary_body(starts, ends, wire_format: str = negotiation.JSON) -> bytes:
+    """Aggregate the interval set and render IntervalSummary (runs in the bulk pool)."""
+    _, sorted_starts, sorted_ends = intervals.sort_intervals(starts, ends)
+    merged_starts, merged_ends = intervals.merge(sorted_starts, sorted_ends)
+    gap_starts, gap_ends = intervals.gaps(merged_starts, merged_ends)
+    region_starts, region_ends, _, max_depth = intervals.depth_regions(sorted_starts, sorted_ends)
+    pairs = int(intervals.pair_counts(sorted_starts, sorted_ends).sum())
+
+    bounds = _format(merged_starts[:1]) + _format(merged_ends[-1:])
+    return negotiation.dumps({
+        "count": len(starts),
+        "start": bounds[0] if bounds else None,
+        "end": bounds[1] if bounds else None,
+        "span": build_difference(int(merged_ends[-1] - merged_starts[0]) if bounds else 0),
+        "covered": build_difference(int((merged_ends - merged_starts).sum())),
+        "merged_count": len(merged_starts),
+        "gap_count": len(gap_starts),
+        "gaps": build_difference(int((gap_ends - gap_starts).sum())),
+        "overlap_count": len(region_starts),
+        "overlapped": build_difference(int((region_ends - region_starts).sum())),
+        "max_concurrent": max_depth,
+        "overlapping_pairs": pairs
+    }, wire_format)
+
+
+def merged_columns(starts, ends):
+    """Merged intervals (runs in the bulk pool)."""
+    _, sorted_starts, sorted_ends = intervals.sort_intervals(starts, ends)
+    return intervals.merge(sorted_starts, sorted_ends)
+
+
+def gap_columns(starts, ends):
+    """Gaps between the merged intervals (runs in the bulk pool)."""
+    return intervals.gaps(*merged_columns(starts, ends))
+
+
+def region_columns(starts, ends, min_depth: int):
+    """Regions covered at least `min_depth` times (runs in the bulk pool)."""
+    _, sorted_starts, sorted_ends = intervals.sort_intervals(starts, ends)
+    return intervals.depth_regions(sorted_starts, sorted_ends, min_depth)[:3]
+
+
+def pair_columns(starts, ends):
+    """Sorted intervals and their pair counts, to generate the overlapping pairs (runs in the bulk pool)."""
+    order, sorted_starts, sorted_ends = intervals.sort_intervals(starts, ends)
+    return order, sorted_starts, sorted_ends, intervals.pair_counts(sorted_starts, sorted_ends)
+
+
+@router.post("/intervals/summary", response_model=IntervalSummary, openapi_extra=INTERVALS_OPENAPI, responses={
+    200: {"description": "Successful response", "content": {"application/json": {"example": {
+        "count": 3,
+        "start": "2024-01-01T09:00:00",
+        "end": "2024-01-01T15:00:00",
+        "span": {"total_days": 0.25, "total_hours": 6.0, "total_minutes": 360.0, "total_seconds": 21600,
+                 "breakdown": {"days": 0, "hours": 6, "minutes": 0, "seconds": 0}},
+        "covered": {"total_days": 0.166667, "total_hours": 4.0, "total_minutes": 240.0, "total_seconds": 14400,
+                    "breakdown": {"days": 0, "hours": 4, "minutes": 0, "seconds": 0}},
+        "merged_count": 2,
+        "gap_count": 1,
+        "gaps": {"total_days": 0.083333, "total_hours": 2.0, "total_minutes": 120.0, "total_seconds": 7200,
+                 "breakdown": {"days": 0, "hours": 2, "minutes": 0, "seconds": 0}},
+        "overlap_count": 1,
+        "overlapped": {"total_days": 0.020833, "total_hours": 0.5, "total_minutes": 30.0, "total_seconds": 1800,
+                       "breakdown": {"days": 0, "hours": 0, "minutes": 30, "seconds": 0}},
+        "max_concurrent": 2,
+        "overlapping_pairs": 1
+    }}}},
+    422: INVALID_INPUT_RESPONSE
+})
+async def summarize_intervals(request: Request) -> Response:
+    """
+    Aggregate a set of intervals: total covered time, gaps and overlaps.
+
+    Body (one of):
+    - application/json: {"starts": [...], "ends": [...]} in 'YYYY-MM-DDTHH:MM:SS' format.
+    - application/x-ndjson or text/csv: one {"start", "end"} record per line
+      (CSV with a 'start,end' header). Read and parsed in chunks, so large
+      sets (up to DATETIME_INTERVALS_MAX_COUNT) only cost 16 bytes per interval.
+
+    Intervals are half-open, [start, end): touching intervals do not overlap.
+
+    Returns:
+        dict:
+        - count: Number of intervals received
+        - start / end: Earliest start and latest end (null if nothing is covered)
+        - span: Time from start to end
+        - covered: Time covered by at least one interval
+        - merged_count: Number of intervals after merging overlapping and touching ones
+        - gap_count / gaps: Uncovered stretches between start and end, and their total
+        - overlap_count / overlapped: Stretches covered by two or more intervals, and their total
+        - max_concurrent: Highest number of intervals covering the same instant
+        - overlapping_pairs: Number of pairs of intervals that overlap
+        Durations use the "difference" format of GET /difference/.
+
+    The computation runs in the bulk process pool.
+
+    Raises:
+        HTTPException: If the body or a datetime is invalid, an interval ends
+        before it starts, or there are too many intervals (422), or the bulk
+        pool is full (503)
+    """
+    starts, ends = await intervals.read_intervals(request)
+    wire_format = negotiation.current()
+    body = await run_bulk(summary_body, starts, ends, wire_format)
+    return negotiation.encoded_response(body, wire_format)
+
+
+@router.post("/intervals/merge", openapi_extra=INTERVALS_OPENAPI, responses={
+    200: {"description": "One NDJSON line per merged interval, sorted by start", "content": {NDJSON_MEDIA_TYPE: {
+        "example": '{"start":"2024-01-01T09:00:00","end":"2024-01-01T12:00:00","difference":{"total_days":0.125,'
+                   '"total_hours":3.0,"total_minutes":180.0,"total_seconds":10800,"breakdown":{"days":0,"hours":3,'
+                   '"minutes":0,"seconds":0}}}\n'
+    }, negotiation.MSGPACK_MEDIA_TYPE: {}}},
+    422: INVALID_INPUT_RESPONSE
+})
+async def merge_intervals(request: Request) -> StreamingResponse:
+    """
+    Merge overlapping and touching intervals and stream the result as NDJSON.
+
+    Takes the same body as POST /intervals/summary. Each line holds the
+    "start" and "end" of a merged interval and its "difference" (same format
+    as GET /difference/). The number of lines is sent in the X-Interval-Count header.
+
+    Raises:
+        HTTPException: If the body is invalid or too large (422), or the bulk pool is full (503)
+    """
+    starts, ends = await intervals.read_intervals(request)
+    merged_starts, merged_ends = await run_bulk(merged_columns, starts, ends)
+    wire_format = negotiation.current()
+    return _rows_response(iter_interval_rows(merged_starts, merged_ends, {}, wire_format), len(merged_starts), wire_format)
+
+
+@router.post("/intervals/gaps", openapi_extra=INTERVALS_OPENAPI, responses={
+    200: {"description": "One NDJSON line per gap, sorted by start", "content": {NDJSON_MEDIA_TYPE: {
+        "example": '{"start":"2024-01-01T12:00:00","end":"2024-01-01T14:00:00","difference":{"total_days":0.083333,'
+                   '"total_hours":2.0,"total_minutes":120.0,"total_seconds":7200,"breakdown":{"days":0,"hours":2,'
+                   '"minutes":0,"seconds":0}}}\n'
+    }, negotiation.MSGPACK_MEDIA_TYPE: {}}},
+    422: INVALID_INPUT_RESPONSE
+})
+async def interval_gaps(request: Request) -> StreamingResponse:
+    """
+    Stream the uncovered stretches between the earliest start and the latest end, as NDJSON.
+
+    Takes the same body as POST /intervals/summary. Each line holds the
+    "start" and "end" of a gap and its "difference". The number of lines is
+    sent in the X-Interval-Count header.
+
+    Raises:
+        HTTPException: If the body is invalid or too large (422), or the bulk pool is full (503)
+    """
+    starts, ends = await intervals.read_intervals(request)
+    gap_starts, gap_ends = await run_bulk(gap_columns, starts, ends)
+    wire_format = negotiation.current()
+    return _rows_response(iter_interval_rows(gap_starts, gap_ends, {}, wire_format), len(gap_starts), wire_format)
+
+
+@router.post("/intervals/overlaps", openapi_extra=INTERVALS_OPENAPI, responses={
+    200: {"description": "One NDJSON line per overlap region (or per overlapping pair with pairs=true)",
+          "content": {NDJSON_MEDIA_TYPE: {
+              "example": '{"start":"2024-01-01T10:30:00","end":"2024-01-01T11:00:00","max_depth":2,"difference":'
+                         '{"total_days":0.020833,"total_hours":0.5,"total_minutes":30.0,"total_seconds":1800,'
+                         '"breakdown":{"days":0,"hours":0,"minutes":30,"seconds":0}}}\n'
+          }, negotiation.MSGPACK_MEDIA_TYPE: {}}},
+    422: {"description": "Validation Error", "content": {"application/json": {"example": {
+        "detail": "The intervals have 4999950000 overlapping pairs; the maximum is 1000000."
+    }}}}
+})
+async def interval_overlaps(
+    request: Request,
+    min_depth: int = Query(2, ge=1),
+    pairs: bool = False
+) -> StreamingResponse:
+    """
+    Stream the overlaps of a set of intervals as NDJSON.
+
+    Takes the same body as POST /intervals/summary.
+
+    Parameters:
+    - min_depth (int): Report the stretches covered by at least this many
+      intervals at once. Default 2 (any overlap); 1 gives the merged intervals.
+    - pairs (bool): Instead of the regions, list every pair of overlapping
+      intervals. Default false.
+
+    Each line holds:
+        - Regions: "start", "end", "max_depth" (most intervals covering one
+          instant of the region) and "difference".
+        - Pairs: "first" and "second" (positions of the two intervals in the
+          input; first starts no later than second), "start" and "end" of
+          their overlap and its "difference".
+
+    The number of lines is sent in the X-Interval-Count header. There may be
+    up to n(n-1)/2 pairs, so pairs=true is limited to DATETIME_INTERVALS_MAX_PAIRS
+    of them; the pairs are generated while they are sent.
+
+    Raises:
+        HTTPException: If the body is invalid or too large, or there are too
+        many pairs (422), or the bulk pool is full (503)
+    """
+    starts, ends = await intervals.read_intervals(request)
+    wire_format = negotiation.current()
+    if pairs:
+        order, sorted_starts, sorted_ends, counts = await run_bulk(pair_columns, starts, ends)
+        total = int(counts.sum())
+        if total > settings.INTERVALS_MAX_PAIRS:
+            raise HTTPException(
+                status_code=422,
+                detail=f"The intervals have {total} overlapping pairs; the maximum is {settings.INTERVALS_MAX_PAIRS}."
+            )
+        return _rows_response(iter_pair_rows(order, sorted_starts, sorted_ends, counts, wire_format), total, wire_format)
+
+    region_starts, region_ends, max_depth = await run_bulk(region_columns, starts, ends, min_depth)
+    return _rows_response(
+        iter_interval_rows(region_starts, region_ends, {"max_depth": max_depth}, wire_format),
+        len(region_starts), wire_format
+    )
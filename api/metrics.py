@@ -0,0 +1,101 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+from typing import Dict, List
+from core import metrics, settings
+from core.profiler import profiler
+
+router = APIRouter()
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PROFILER_DISABLED_MSG = "Profiler is disabled. Set DATETIME_PROFILER_ALLOWED=1 to enable it."
+
+
+class ProfilerStack(BaseModel):
+    stack: str
+    samples: int
+
+
+class ProfilerResponse(BaseModel):
+    running: bool
+    interval_ms: float
+    total_samples: int
+    top: List[ProfilerStack]
+
+
+def _require_profiler() -> None:
+    if not settings.PROFILER_ALLOWED:
+        raise HTTPException(status_code=403, detail=PROFILER_DISABLED_MSG)
+
+
+def _profiler_state(limit: int = 20) -> Dict:
+    return {
+        "running": profiler.running,
+        "interval_ms": profiler.interval * 1000,
+        "total_samples": sum(profiler.samples.values()),
+        "top": [{"stack": stack, "samples": count} for stack, count in profiler.top(limit)]
+    }
+
+
+@router.get("/metrics", response_class=PlainTextResponse, responses={
+    200: {"description": "Metrics in the Prometheus text format", "content": {PROMETHEUS_MEDIA_TYPE: {
+        "example": 'datetime_http_requests_total{route="/dayofweek/",method="GET",status="200"} 42\n'
+    }}}
+})
+async def get_metrics() -> PlainTextResponse:
+    """
+    Expose request counts, error counts by status, latency histograms per
+    route, handler phase timings (parse/compute), in-flight requests, cache
+    counters and pending bulk jobs in the Prometheus text format.
+    """
+    return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_MEDIA_TYPE)
+
+
+@router.post("/metrics/profiler/start", response_model=ProfilerResponse)
+async def start_profiler(interval_ms: float = Query(5.0, ge=1.0, le=1000.0)) -> Dict:
+    """
+    Start the sampling profiler on the event loop thread. Previous samples are discarded.
+
+    Parameters:
+    - interval_ms (float): Time between samples, in milliseconds. Default 5.
+    """
+    _require_profiler()
+    profiler.start(interval_ms / 1000)
+    return _profiler_state()
+
+
+@router.post("/metrics/profiler/stop", response_model=ProfilerResponse)
+async def stop_profiler() -> Dict:
+    """
+    Stop the sampling profiler. Collected samples stay available until the next start.
+    """
+    _require_profiler()
+    profiler.stop()
+    return _profiler_state()
+
+
+@router.get("/metrics/profiler", responses={
+    200: {"description": "Collected samples", "content": {
+        "application/json": {"example": {
+            "running": False, "interval_ms": 5.0, "total_samples": 2,
+            "top": [{"stack": "main.py:run:10;core/parsing.py:parse_date:40", "samples": 2}]
+        }},
+        "text/plain": {"example": "main.py:run:10;core/parsing.py:parse_date:40 2\n"}
+    }},
+    403: {"description": "Profiler disabled", "content": {"application/json": {
+        "example": {"detail": PROFILER_DISABLED_MSG}
+    }}}
+})
+async def get_profiler(format: str = Query("json", pattern="^(json|collapsed)$"), limit: int = Query(20, ge=1, le=1000)):
+    """
+    Return the samples collected by the profiler.
+
+    Parameters:
+    - format (str): 'json' for the most frequent stacks, or 'collapsed' for
+      the full flame-graph input ('frame;frame;frame count' per line).
+    - limit (int): Number of stacks returned in JSON form. Default 20.
+    """
+    _require_profiler()
+    if format == "collapsed":
+        return PlainTextResponse(profiler.collapsed())
+    return _profiler_state(limit)
@@ -0,0 +1,176 @@
+from datetime import date, timedelta
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Iterator, Literal, Optional
+from core import negotiation, settings
+from core.calendar_index import DAYS_EN, get_index
+from core.parsing import parse_timestamp
+from core.streaming import NDJSON_MEDIA_TYPE, dumps_row, row_media_type
+from core.transitions import EPOCH, format_offset, get_table
+
+router = APIRouter()
+
+INVALID_TIMESTAMP_MSG = "Invalid datetime format. Expected 'YYYY-MM-DDTHH:MM:SS'."
+INVALID_TIMEZONE_MSG = "Invalid time zone. Check available zones here: https://en.wikipedia.org/wiki/List_of_tz_database_time_zones"
+
+UNIT_SECONDS = {"seconds": 1, "minutes": 60, "hours": 3600, "days": 86400, "weeks": 604800}
+# Unidades que avanzan en hora local (misma hora del reloj cada día) en lugar de en tiempo absoluto
+WALL_CLOCK_UNITS = ("days", "weeks")
+
+# Filas por fragmento enviado al cliente
+CHUNK_ROWS = 1000
+
+EPOCH_ORDINAL = EPOCH.toordinal()
+
+
+def iter_series(start: int, step: int, count: int, table=None, wall_clock: bool = False,
+                wire_format: str = negotiation.JSON) -> Iterator[bytes]:
+    """
+    Generate the series one NDJSON (or MessagePack) chunk at a time.
+
+    `start` is in local seconds since 1970-01-01T00:00:00 when `wall_clock`
+    is set and in UTC seconds otherwise. Day-level fields (weekday, ISO
+    week) are computed once per day, not once per row.
+    """
+    index = get_index()
+    current_day = None
+    day_fields = None
+    lines = []
+    for position in range(count):
+        value = start + position * step
+        if table is None:
+            utc_seconds = local_seconds = value
+            suffix = ""
+        else:
+            if wall_clock:
+                utc_seconds, _ = table.resolve(value)
+            else:
+                utc_seconds = value
+            offset = table.offset_at(utc_seconds)[0]
+            local_seconds = utc_seconds + offset
+            suffix = format_offset(offset)
+
+        day, seconds = divmod(local_seconds, 86400)
+        if day != current_day:
+            current_day = day
+            day_value = date.fromordinal(EPOCH_ORDINAL + day)
+            weekday, iso_year, iso_week, _ = index.lookup(day_value)
+            day_fields = (day_value.isoformat() + "T", DAYS_EN[weekday], weekday, iso_year, iso_week)
+        hours, seconds = divmod(seconds, 3600)
+        minutes, seconds = divmod(seconds, 60)
+
+        lines.append(dumps_row({
+            "datetime": f"{day_fields[0]}{hours:02d}:{minutes:02d}:{seconds:02d}{suffix}",
+            "unix_ms": utc_seconds * 1000,
+            "day_of_week": day_fields[1],
+            "day_number": day_fields[2],
+            "iso_year": day_fields[3],
+            "iso_week": day_fields[4]
+        }, wire_format))
+        if len(lines) == CHUNK_ROWS:
+            yield b"".join(lines)
+            lines = []
+    if lines:
+        yield b"".join(lines)
+
+
+@router.get("/series/", responses={
+    200: {"description": "One NDJSON line per element of the series", "content": {NDJSON_MEDIA_TYPE: {
+        "example": '{"datetime":"2024-03-10T01:00:00-05:00","unix_ms":1710050400000,"day_of_week":"Sunday",'
+                   '"day_number":6,"iso_year":2024,"iso_week":10}\n'
+                   '{"datetime":"2024-03-10T03:00:00-04:00","unix_ms":1710054000000,"day_of_week":"Sunday",'
+                   '"day_number":6,"iso_year":2024,"iso_week":10}\n'
+    }, negotiation.MSGPACK_MEDIA_TYPE: {}}},
+    400: {"description": "Bad Request", "content": {"application/json": {
+        "example": {"detail": "End datetime must be greater than or equal to start datetime"}
+    }}},
+    422: {"description": "Validation Error", "content": {"application/json": {
+        "example": {"detail": "The series would have 8760001 items; the maximum is 1000000."}
+    }}}
+})
+async def generate_series(
+    start: str,
+    end: str,
+    step: int = Query(1, ge=1),
+    unit: Literal["seconds", "minutes", "hours", "days", "weeks"] = "days",
+    timezone: Optional[str] = None
+) -> StreamingResponse:
+    """
+    Stream every datetime from start to end (inclusive) at a fixed step, as NDJSON.
+
+    Parameters:
+    - start (str): First datetime in 'YYYY-MM-DDTHH:MM:SS' format (local time of `timezone`)
+    - end (str): Last datetime in 'YYYY-MM-DDTHH:MM:SS' format (local time of `timezone`)
+    - step (int): Step size, in `unit`s. Default 1.
+    - unit (str): 'seconds', 'minutes', 'hours', 'days' or 'weeks'. Default 'days'.
+      Seconds, minutes and hours advance in absolute time, so a DST change
+      never repeats or skips an element; days and weeks advance on the wall
+      clock and keep the same local time of day.
+    - timezone (Optional[str]): IANA timezone of start and end. UTC if omitted.
+
+    Each line holds:
+        - datetime: Local datetime in ISO 8601 format (with its UTC offset when a timezone is given)
+        - unix_ms: Unix timestamp in milliseconds
+        - day_of_week / day_number: Weekday name and number (0=Monday, 6=Sunday)
+        - iso_year / iso_week: ISO 8601 year and week number
+
+    The series is generated while it is sent, so its length only affects
+    the time the response takes; it may have at most DATETIME_SERIES_MAX_COUNT elements.
+
+    Example:
+        /series/?start=2024-01-01T00:00:00&end=2024-12-31T23:00:00&step=1&unit=hours&timezone=Europe/Madrid
+
+    Raises:
+        HTTPException: If a datetime or the timezone is invalid, a datetime falls
+        outside years 1 to 9999 in UTC, or the series is too long (422), or end is
+        before start (400)
+    """
+    errors = []
+    try:
+        start_dt = parse_timestamp(start)
+    except ValueError:
+        errors.append({"loc": ["query", "start"], "msg": INVALID_TIMESTAMP_MSG, "type": "value_error"})
+    try:
+        end_dt = parse_timestamp(end)
+    except ValueError:
+        errors.append({"loc": ["query", "end"], "msg": INVALID_TIMESTAMP_MSG, "type": "value_error"})
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+
+    table = None
+    if timezone:
+        try:
+            table = get_table(timezone)
+        except ValueError:
+            raise HTTPException(status_code=422, detail=INVALID_TIMEZONE_MSG)
+
+    first = (start_dt - EPOCH) // timedelta(seconds=1)
+    last = (end_dt - EPOCH) // timedelta(seconds=1)
+    wall_clock = unit in WALL_CLOCK_UNITS
+    try:
+        if table is not None and not wall_clock:
+            first = table.resolve(first)[0]
+            last = table.resolve(last)[0]
+        if table is not None:
+            # Los extremos acotan la serie: si su offset existe, el de cada elemento también
+            for value in (first, last):
+                table.offset_at(table.resolve(value)[0] if wall_clock else value)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if last < first:
+        raise HTTPException(status_code=400, detail="End datetime must be greater than or equal to start datetime")
+
+    step_seconds = step * UNIT_SECONDS[unit]
+    count = (last - first) // step_seconds + 1
+    if count > settings.SERIES_MAX_COUNT:
+        raise HTTPException(
+            status_code=422,
+            detail=f"The series would have {count} items; the maximum is {settings.SERIES_MAX_COUNT}."
+        )
+
+    # Generador síncrono: Starlette lo recorre en un hilo, así una serie
+    # larga no bloquea el bucle de eventos mientras se genera
+    return StreamingResponse(
+        iter_series(first, step_seconds, count, table, wall_clock, negotiation.current()),
+        media_type=row_media_type(negotiation.current())
+    )
@@ -0,0 +1,79 @@
+from fastapi import APIRouter
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from core.timezones import available_zone_groups, get_zone_group, sorted_timezone_names
+
+router = APIRouter()
+
+
+class TimezoneListResponse(BaseModel):
+    count: int
+    timezones: List[str]
+
+
+class ZoneGroupsResponse(BaseModel):
+    groups: Dict[str, List[str]]
+
+
+@router.get("/timezones/", response_model=TimezoneListResponse, responses={
+    200: {
+        "description": "Successful response",
+        "content": {
+            "application/json": {
+                "example": {
+                    "count": 2,
+                    "timezones": ["America/Bogota", "America/Boise"]
+                }
+            }
+        }
+    }
+})
+async def list_timezones(prefix: Optional[str] = None) -> Dict:
+    """
+    List the IANA time zones accepted by the other endpoints.
+
+    Parameters:
+    - prefix (Optional[str]): Only return zones starting with this prefix (e.g., 'America/').
+
+    Returns:
+        Dictionary containing:
+        - count: Number of zones returned
+        - timezones: Zone names in alphabetical order
+
+    Example:
+        /timezones/?prefix=Europe/
+    """
+    names = sorted_timezone_names()
+    if prefix:
+        names = tuple(name for name in names if name.startswith(prefix))
+
+    return {
+        "count": len(names),
+        "timezones": names
+    }
+
+
+@router.get("/timezones/groups/", response_model=ZoneGroupsResponse, responses={
+    200: {
+        "description": "Successful response",
+        "content": {
+            "application/json": {
+                "example": {
+                    "groups": {"offices": ["America/Los_Angeles", "Europe/Madrid", "Asia/Tokyo"]}
+                }
+            }
+        }
+    }
+})
+async def list_zone_groups() -> Dict:
+    """
+    List the named zone groups accepted by the `group` parameter of
+    /convert/multi, with their zones.
+
+    Returns:
+        Dictionary containing:
+        - groups: Zone names of each group, by group name in alphabetical order
+    """
+    return {
+        "groups": {name: get_zone_group(name) for name in sorted(available_zone_groups())}
+    }
@@ -1,10 +1,23 @@
-from fastapi import APIRouter, HTTPException
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel
 from typing import Dict
+from core.calendar_index import get_index
+from core.columnar import COLUMNAR_OPENAPI, COLUMNAR_RESPONSES, column, columnar_response, epoch_days, table_from_columns, valid_mask
+from core.metrics import PhaseTimer
+from core.parsing import parse_date
+from core.streaming import STREAM_OPENAPI, STREAM_RESPONSES, stream_rows
 
 router = APIRouter()
 
-@router.get("/weeknumber_iso/", response_model=Dict, responses={
+
+class IsoWeekNumberResponse(BaseModel):
+    date: str
+    iso_week_number: int
+    iso_year: int
+    description: str
+
+
+@router.get("/weeknumber_iso/", response_model=IsoWeekNumberResponse, responses={
     200: {
         "description": "Successful response", 
         "content": {
@@ -33,7 +46,7 @@ router = APIRouter()
         }
     }
 })
-def get_iso_week_number(date_str: str) -> Dict:
+async def get_iso_week_number(date_str: str) -> Dict:
     """
     Get the ISO week number for a given date according to ISO 8601 standard.
 
@@ -53,8 +66,9 @@ def get_iso_week_number(date_str: str) -> Dict:
     Example:
         /weeknumber_iso/?date_str=2021-05-31
     """
+    phases = PhaseTimer("weeknumber")
     try:
-        date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
+        date_obj = parse_date(date_str)
     except ValueError:
         raise HTTPException(
             status_code=422,
@@ -65,11 +79,58 @@ def get_iso_week_number(date_str: str) -> Dict:
             }
         )
 
-    iso_year, iso_week, iso_day = date_obj.isocalendar()
+    phases.mark("parse")
+
+    _, iso_year, iso_week, _ = get_index().lookup(date_obj)
+    phases.mark("compute")
 
     return {
         "date": date_str,
         "iso_week_number": iso_week,
         "iso_year": iso_year,
         "description": f"Week {iso_week} of ISO year {iso_year}"
-    }
\ No newline at end of file
+    }
+
+
+@router.post("/weeknumber_iso/stream", responses=STREAM_RESPONSES, openapi_extra=STREAM_OPENAPI)
+async def get_iso_week_number_stream(request: Request):
+    """
+    Run `get_iso_week_number` over every row of an NDJSON or CSV upload and stream
+    the results back as NDJSON. Rows use the GET query parameter names.
+
+    Example (application/x-ndjson):
+        {"date_str": "2021-05-31"}
+
+    Example (text/csv):
+        date_str
+        2021-05-31
+    """
+    return stream_rows(request, get_iso_week_number)
+
+
+def iso_week_number_table(table):
+    """Compute the ISO week columns for the 'date' column of an Arrow table."""
+    import numpy as np
+    from core import vectorized
+
+    dates = column(table, "date")
+    _, iso_year, iso_week = vectorized.iso_weeks(epoch_days(dates, "date"))
+    return table_from_columns({
+        "date": dates,
+        "iso_week_number": iso_week.astype(np.uint8),
+        "iso_year": iso_year.astype(np.int32)
+    }, valid_mask(dates))
+
+
+@router.post("/weeknumber_iso/arrow", responses=COLUMNAR_RESPONSES, openapi_extra=COLUMNAR_OPENAPI)
+async def get_iso_week_number_arrow(request: Request):
+    """
+    Compute `get_iso_week_number` for a whole column of an Arrow IPC stream or Parquet body.
+
+    Input column:
+    - date: date32, date64 or timestamp (with a time zone, the date in that zone)
+
+    Output columns: date, iso_week_number (uint8) and iso_year (int32).
+    Null dates give null rows.
+    """
+    return await columnar_response(request, iso_week_number_table)
@@ -0,0 +1,78 @@
+"""
+Benchmark: /addsubtract arithmetic, the previous datetime/timedelta code vs.
+the integer engine in core.calendar_math.
+
+"legacy" is the arithmetic the endpoint used before (timedelta for days and
+weeks, date.replace(year=...) for years; no months or sub-day units). "engine"
+is calendar_math.shift on microseconds since the epoch plus isoformat(), i.e.
+everything the endpoint now does after parsing. Units the legacy code did
+not support are reported for the engine only.
+
+Usage:
+    python -m benchmarks.bench_calendar_math [--number N]
+"""
+import argparse
+import timeit
+from datetime import datetime, timedelta
+
+from core import calendar_math
+
+BASE = datetime(2024, 1, 31, 15, 30, 45)
+BASE_US = calendar_math.to_microseconds(2024, 1, 31, 15, 30, 45)
+
+
+def _legacy(unit: str, amount: int):
+    if unit == "years":
+        def run():
+            return BASE.replace(year=BASE.year + amount).isoformat()
+    else:
+        def run():
+            return (BASE + timedelta(**{unit: amount})).isoformat()
+    return run
+
+
+def _engine(unit: str, amount: int):
+    if unit in calendar_math.MONTH_UNITS:
+        steps = amount * calendar_math.MONTH_UNITS[unit]
+    else:
+        steps = amount * calendar_math.FIXED_UNITS[unit]
+
+    def run():
+        return calendar_math.isoformat(calendar_math.shift(BASE_US, steps, unit))
+    return run
+
+
+# unit -> amount; legacy only for the units it supported
+CASES = {
+    "seconds": 90,
+    "minutes": 90,
+    "hours": 36,
+    "days": 5,
+    "weeks": 3,
+    "months": 1,
+    "years": 1,
+}
+LEGACY_UNITS = ("days", "weeks", "years")
+
+
+def _ops_per_second(fn, number: int) -> float:
+    return number / min(timeit.repeat(fn, number=number, repeat=5))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=50000)
+    args = parser.parse_args()
+
+    print(f"{'unit':<8} {'legacy ops/s':>14} {'engine ops/s':>14} {'ratio':>7}")
+    for unit, amount in CASES.items():
+        engine = _ops_per_second(_engine(unit, amount), args.number)
+        if unit in LEGACY_UNITS:
+            legacy = _ops_per_second(_legacy(unit, amount), args.number)
+            print(f"{unit:<8} {legacy:>14,.0f} {engine:>14,.0f} {engine / legacy:>6.2f}x")
+        else:
+            print(f"{unit:<8} {'-':>14} {engine:>14,.0f} {'-':>7}")
+
+
+if __name__ == "__main__":
+    main()
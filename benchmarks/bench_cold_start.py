@@ -0,0 +1,96 @@
+"""
+Benchmark: cold start of main:app, with the OpenAPI document built at
+runtime vs. prebuilt by `python -m core.openapi_static` (DATETIME_OPENAPI_STATIC).
+
+Every run is a fresh interpreter that imports main, enters its lifespan
+and serves GET /openapi.json, GET / and one endpoint, calling the
+ASGI app directly so no HTTP client import is counted. Reported values are
+medians over the runs, in milliseconds.
+
+Usage:
+    python -m benchmarks.bench_cold_start [--runs N]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Se ejecuta en un intérprete nuevo por cada medición
+CHILD = r"""
+import asyncio, json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def call(path, query=b""):
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query,
+             "root_path": "", "headers": [], "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80)}
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        pass
+    begin = time.perf_counter()
+    await main.app(scope, receive, send)
+    return (time.perf_counter() - begin) * 1000
+
+async def run():
+    begin = time.perf_counter()
+    async with main.app.router.lifespan_context(main.app):
+        startup_ms = (time.perf_counter() - begin) * 1000
+        openapi_ms = await call("/openapi.json")
+        docs_ms = await call("/")
+        endpoint_ms = await call("/dayofweek/", b"date_str=2024-05-28")
+    return startup_ms, openapi_ms, docs_ms, endpoint_ms
+
+startup_ms, openapi_ms, docs_ms, endpoint_ms = asyncio.run(run())
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": startup_ms,
+    "first_openapi_ms": openapi_ms,
+    "first_docs_ms": docs_ms,
+    "first_endpoint_ms": endpoint_ms,
+    "ready_ms": (time.perf_counter() - started) * 1000,
+}))
+"""
+
+COLUMNS = ("import_ms", "startup_ms", "first_openapi_ms", "first_docs_ms", "first_endpoint_ms", "ready_ms")
+
+
+def _measure(env: dict, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {column: statistics.median(sample[column] for sample in samples) for column in COLUMNS}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    base_env = dict(os.environ, DATETIME_BULK_WORKERS="0", DATETIME_CACHE_ENABLED="0")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "openapi.json")
+        subprocess.run([sys.executable, "-m", "core.openapi_static", "--output", path],
+                       cwd=ROOT, env=base_env, check=True, capture_output=True)
+        modes = {
+            "runtime": dict(base_env, DATETIME_OPENAPI_STATIC="0"),
+            "static": dict(base_env, DATETIME_OPENAPI_STATIC="1", DATETIME_OPENAPI_STATIC_PATH=path),
+        }
+        results = {mode: _measure(env, args.runs) for mode, env in modes.items()}
+
+    print(f"{'mode':<8} " + " ".join(f"{column:>18}" for column in COLUMNS))
+    for mode, values in results.items():
+        print(f"{mode:<8} " + " ".join(f"{values[column]:>18.1f}" for column in COLUMNS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Microbenchmark: legacy strptime parsing vs. the shared core.parsing module.
+
+For each endpoint the legacy pattern (as it was written in the router) is
+timed against the new parser, both cold (cache cleared before every call,
+so only fromisoformat + validation is measured) and warm (repeated input,
+served from the LRU cache).
+
+Usage:
+    python -m benchmarks.bench_parsing [--number N]
+"""
+import argparse
+import timeit
+from datetime import datetime
+
+from core import parsing
+
+DATE = "2024-05-28"
+TIME = "15:30:45"
+
+
+def _legacy_date():
+    return datetime.strptime(DATE, "%Y-%m-%d").date()
+
+
+def _legacy_datetime_date_only():
+    return datetime.strptime(DATE, "%Y-%m-%d")
+
+
+def _legacy_combined():
+    return datetime.strptime(f"{DATE}T{TIME}", "%Y-%m-%dT%H:%M:%S")
+
+
+def _legacy_convert():
+    datetime.strptime(DATE, "%Y-%m-%d")
+    datetime.strptime(TIME, "%H:%M:%S")
+    return datetime.strptime(f"{DATE}T{TIME}", "%Y-%m-%dT%H:%M:%S")
+
+
+def _legacy_difference():
+    return _legacy_combined(), _legacy_combined()
+
+
+def _new_date():
+    return parsing.parse_date(DATE)
+
+
+def _new_datetime_date_only():
+    return parsing.parse_datetime(DATE)
+
+
+def _new_combined():
+    return parsing.parse_datetime(DATE, TIME)
+
+
+def _new_difference():
+    return _new_combined(), _new_combined()
+
+
+# endpoint -> (legacy, new)
+CASES = {
+    "addsubtract": (_legacy_datetime_date_only, _new_datetime_date_only),
+    "convert": (_legacy_convert, _new_combined),
+    "current": (_legacy_combined, _new_combined),
+    "dayofweek": (_legacy_date, _new_date),
+    "difference": (_legacy_difference, _new_difference),
+    "weeknumber": (_legacy_date, _new_date),
+}
+
+
+def _cold(fn):
+    def run():
+        parsing.clear_caches()
+        return fn()
+    return run
+
+
+def _per_call_us(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    clear_cost = _per_call_us(parsing.clear_caches, args.number)
+    print(f"{'endpoint':<12} {'strptime us':>12} {'cold us':>10} {'warm us':>10} {'speedup':>9}")
+    for endpoint, (legacy, new) in CASES.items():
+        legacy_us = _per_call_us(legacy, args.number)
+        cold_us = _per_call_us(_cold(new), args.number) - clear_cost
+        warm_us = _per_call_us(new, args.number)
+        print(f"{endpoint:<12} {legacy_us:>12.3f} {cold_us:>10.3f} {warm_us:>10.3f} {legacy_us / warm_us:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: response serialization cost per request, before and after
+typed response models + ORJSONResponse.
+
+"before" reproduces the old path: the payload is validated against a
+generic dict and rendered with the standard-library json encoder
+(JSONResponse). "after" validates it against the endpoint's Pydantic
+model and renders it with orjson (ORJSONResponse), as FastAPI now does.
+Batch payloads are built by the endpoint in their final shape and are
+rendered with orjson directly, skipping per-row validation.
+
+Usage:
+    python -m benchmarks.bench_serialization [--number N]
+"""
+import argparse
+import asyncio
+import timeit
+from typing import Dict
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from api.addsubtract import AddSubtractResponse, add_subtract_time
+from api.convert import ConvertResponse, convert_batch, convert_timezone
+from api.dayofweek import DayOfWeekResponse, day_of_week
+from api.difference import DifferenceResponse, calculate_datetime_difference
+from api.weeknumber import IsoWeekNumberResponse, get_iso_week_number
+
+BATCH_ROWS = 1000
+
+
+def _batch_payload() -> Dict:
+    results = convert_batch([("2024-05-28", "15:00:00", "America/Bogota", "Europe/Madrid")] * BATCH_ROWS)
+    return {"count": len(results), "errors": 0, "results": results}
+
+
+# endpoint -> (response model or None for direct rendering, sample payload)
+CASES = {
+    "addsubtract": (AddSubtractResponse, asyncio.run(add_subtract_time("2021-05-31", 5, "days", "add"))),
+    "convert": (ConvertResponse, asyncio.run(convert_timezone("2024-05-28", "15:00:00", "America/Bogota", "Europe/Madrid"))),
+    "dayofweek": (DayOfWeekResponse, asyncio.run(day_of_week("2024-05-28", "es"))),
+    "difference": (DifferenceResponse, asyncio.run(calculate_datetime_difference("2021-05-31", "00:00:00", "2021-06-01", "01:02:03"))),
+    "weeknumber_iso": (IsoWeekNumberResponse, asyncio.run(get_iso_week_number("2021-05-31"))),
+    f"convert batch x{BATCH_ROWS}": (None, _batch_payload()),
+}
+
+
+def _before(payload: Dict):
+    adapter = TypeAdapter(dict)
+
+    def run() -> bytes:
+        content = adapter.dump_python(adapter.validate_python(payload), mode="json")
+        return JSONResponse(content).body
+    return run
+
+
+def _after(model, payload: Dict):
+    if model is None:
+        return lambda: ORJSONResponse(payload).body
+    adapter = TypeAdapter(model)
+
+    def run() -> bytes:
+        content = adapter.dump_python(adapter.validate_python(payload), mode="json")
+        return ORJSONResponse(content).body
+    return run
+
+
+def _per_call_us(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<22} {'before us':>11} {'after us':>10} {'speedup':>9}")
+    for endpoint, (model, payload) in CASES.items():
+        number = max(args.number // 100, 10) if "batch" in endpoint else args.number
+        before_us = _per_call_us(_before(payload), number)
+        after_us = _per_call_us(_after(model, payload), number)
+        print(f"{endpoint:<22} {before_us:>11.2f} {after_us:>10.2f} {before_us / after_us:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
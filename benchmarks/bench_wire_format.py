@@ -0,0 +1,114 @@
+"""
+Benchmark: response size and latency of each wire format (JSON, MessagePack
+and, for the bulk modes, the packed binary records).
+
+For every case the response is requested in each format through the app
+in process (no network), and the report gives the body size, the
+server-side encoding time, the client-side decoding time and the latency of
+the whole request (encode + send + decode).
+
+Usage:
+    python -m benchmarks.bench_wire_format [--number N] [--rows N]
+"""
+import argparse
+import ast
+import os
+import random
+import timeit
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+os.environ.setdefault("DATETIME_BULK_WORKERS", "0")
+os.environ.setdefault("DATETIME_CACHE_ENABLED", "0")
+
+import msgpack
+import numpy as np
+import orjson
+from fastapi.testclient import TestClient
+
+from core import negotiation
+
+ACCEPT = {"json": "application/json", "msgpack": negotiation.MSGPACK_MEDIA_TYPE, "binary": "application/json"}
+
+
+def _timestamps(rows: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    base = datetime(2000, 1, 1)
+    return [(base + timedelta(seconds=rng.randrange(10 ** 9))).isoformat() for _ in range(rows)]
+
+
+def _decoder(fmt: str, headers) -> Callable[[bytes], object]:
+    if fmt == "msgpack":
+        return msgpack.unpackb
+    if fmt == "binary":
+        dtype = np.dtype(ast.literal_eval(headers["x-record-dtype"]))
+        return lambda body: np.frombuffer(body, dtype=dtype)
+    return orjson.loads
+
+
+def _cases(rows: int) -> Dict[str, Tuple[str, str, Dict, Tuple[str, ...]]]:
+    """name -> (method, url, request arguments, formats)"""
+    starts = _timestamps(rows, 1)
+    ends = _timestamps(rows, 2)
+    return {
+        "GET /convert": ("GET", "/convert", {"params": {
+            "date": "2024-05-28", "time": "15:00:00", "from_timezone": "America/Bogota", "to_timezone": "Europe/Madrid"
+        }}, ("json", "msgpack")),
+        "GET /difference": ("GET", "/difference/", {"params": {
+            "start_date": "2021-05-31", "start_time": "00:00:00", "end_date": "2021-06-01", "end_time": "01:02:03"
+        }}, ("json", "msgpack")),
+        "GET /format-datetime": ("GET", "/format-datetime/", {"params": {
+            "date": "2024-03-10", "time": "02:30:00", "timezone": "America/New_York"
+        }}, ("json", "msgpack")),
+        f"POST /difference x{rows}": ("POST", "/difference/", {"json": {"starts": starts, "ends": ends}},
+                                      ("json", "msgpack", "binary")),
+        f"POST /format-datetime x{rows}": ("POST", "/format-datetime/", {"json": {
+            "timestamps": starts, "timezone": "Europe/Madrid"
+        }}, ("json", "msgpack", "binary")),
+    }
+
+
+def _per_call_us(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=10000)
+    args = parser.parse_args()
+
+    from main import app
+    client = TestClient(app)
+
+    print(f"{'case':<30} {'format':<8} {'bytes':>10} {'size %':>7} {'encode us':>10} {'decode us':>10} {'request us':>11}")
+    for name, (method, url, kwargs, formats) in _cases(args.rows).items():
+        number = max(args.number // 50, 5) if method == "POST" else args.number
+        json_size = None
+        for fmt in formats:
+            request_url = f"{url}?format=binary" if fmt == "binary" else url
+            headers = {"accept": ACCEPT[fmt]}
+
+            def request():
+                response = client.request(method, request_url, headers=headers, **kwargs)
+                return decode(response.content)
+
+            response = client.request(method, request_url, headers=headers, **kwargs)
+            assert response.status_code == 200, response.text
+            decode = _decoder(fmt, response.headers)
+            body = response.content
+            json_size = json_size or len(body)
+
+            if fmt == "binary":
+                encode_us = float("nan")
+            else:
+                payload = _decoder(fmt, response.headers)(body)
+                encode_us = _per_call_us(lambda: negotiation.dumps(payload, fmt), number)
+            decode_us = _per_call_us(lambda: decode(body), number)
+            request_us = _per_call_us(request, max(number // 10, 3))
+            print(f"{name:<30} {fmt:<8} {len(body):>10} {len(body) / json_size * 100:>6.1f}% "
+                  f"{encode_us:>10.2f} {decode_us:>10.2f} {request_us:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+"""
+Benchmark and load-test suite for every router.
+
+Two layers are measured:
+- micro: each handler function called directly (no HTTP, no middleware);
+- load: the full `main:app` driven in-process through an ASGI client with
+  a fixed concurrency, reporting p50/p95/p99 latency and requests/second
+  per endpoint.
+
+Results are written as JSON. When a baseline file is given, every metric is
+compared against it and the run fails (exit code 1) if any metric is worse
+by more than the threshold.
+
+Usage:
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --baseline bench.json --threshold 0.15
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List
+
+import httpx
+
+from core import settings
+
+BATCH_ROWS = 100
+BULK_ROWS = 1000
+
+# Métricas donde un valor más alto es peor; en "rps" un valor más bajo es peor
+HIGHER_IS_WORSE = ("us_per_call", "p50_ms", "p95_ms", "p99_ms")
+LOWER_IS_WORSE = ("rps",)
+
+MSGPACK = {"accept": "application/msgpack"}
+NDJSON = {"content-type": "application/x-ndjson"}
+ARROW = {"content-type": "application/vnd.apache.arrow.stream"}
+
+# Rutas que no se miden: documentación, índice y endpoints de operación que
+# informan sobre los demás
+EXCLUDED_ROUTES = {
+    ("GET", "/"), ("GET", "/openapi.json"), ("GET", "/docs"), ("GET", "/redoc"),
+    ("GET", "/cache/stats/"), ("GET", "/metrics"), ("GET", "/metrics/profiler"),
+    ("POST", "/metrics/profiler/start"), ("POST", "/metrics/profiler/stop"),
+}
+
+
+def _timestamps(rows: int, step_minutes: int, first_minute: int = 0) -> List[str]:
+    base = datetime(2024, 1, 1)
+    return [(base + timedelta(minutes=first_minute + step_minutes * row)).isoformat() for row in range(rows)]
+
+
+# Intervalos de 90 minutos cada hora: cada uno solapa con el siguiente
+INTERVALS = {"starts": _timestamps(BULK_ROWS, 60), "ends": _timestamps(BULK_ROWS, 60, 90)}
+EXPRESSION = "last business day of next month"
+
+LOAD_CASES = [
+    {"name": "addsubtract", "method": "GET", "url": "/addsubtract/",
+     "params": {"date_str": "2021-05-31", "amount": 5, "unit": "days", "operation": "add"}},
+    {"name": "convert", "method": "GET", "url": "/convert",
+     "params": {"date": "2024-05-28", "time": "15:00:00", "from_timezone": "America/Bogota",
+                "to_timezone": "America/Argentina/Buenos_Aires"}},
+    {"name": "format-datetime", "method": "GET", "url": "/format-datetime/",
+     "params": {"date": "2024-05-29", "time": "12:00:00"}},
+    {"name": "dayofweek", "method": "GET", "url": "/dayofweek/",
+     "params": {"date_str": "2024-05-28", "language": "es"}},
+    {"name": "difference", "method": "GET", "url": "/difference/",
+     "params": {"start_date": "2021-05-31", "start_time": "00:00:00",
+                "end_date": "2021-06-01", "end_time": "01:02:03"}},
+    {"name": "weeknumber_iso", "method": "GET", "url": "/weeknumber_iso/",
+     "params": {"date_str": "2021-05-31"}},
+    {"name": "timezones", "method": "GET", "url": "/timezones/", "params": {"prefix": "America/"}},
+    {"name": "calendar-weekdays", "method": "GET", "url": "/calendar/weekdays/",
+     "params": {"start_date": "2024-01-01", "end_date": "2024-12-31", "weekday": 0}},
+    {"name": f"convert-batch-x{BATCH_ROWS}", "method": "POST", "url": "/convert",
+     "json": {"timestamps": ["2024-05-28T15:00:00"] * BATCH_ROWS,
+              "from_timezone": "America/Bogota", "to_timezone": "Europe/Madrid"}},
+    {"name": f"difference-bulk-x{BULK_ROWS}", "method": "POST", "url": "/difference/",
+     "json": {"starts": ["2021-05-31T00:00:00"] * BULK_ROWS, "ends": ["2021-06-01T01:02:03"] * BULK_ROWS}},
+    {"name": f"dayofweek-stream-x{BATCH_ROWS}", "method": "POST", "url": "/dayofweek/stream",
+     "content": b'{"date_str": "2024-05-28", "language": "es"}\n' * BATCH_ROWS, "headers": NDJSON},
+    {"name": "convert-multi", "method": "GET", "url": "/convert/multi",
+     "params": {"date": "2024-05-28", "time": "15:00:00", "from_timezone": "America/Bogota",
+                "to_timezones": "Europe/Madrid,Asia/Tokyo,America/New_York"}},
+    {"name": "timezones-groups", "method": "GET", "url": "/timezones/groups/"},
+    {"name": "calendar-isoweek", "method": "GET", "url": "/calendar/isoweek/",
+     "params": {"iso_year": 2024, "iso_week": 22}},
+    {"name": "calendar-holidays", "method": "GET", "url": "/calendar/holidays/"},
+    {"name": "evaluate", "method": "GET", "url": "/evaluate/",
+     "params": {"expression": EXPRESSION, "anchor": "2024-05-28"}},
+    {"name": "series-x744", "method": "GET", "url": "/series/",
+     "params": {"start": "2024-01-01T00:00:00", "end": "2024-01-31T23:00:00", "unit": "hours",
+                "timezone": "Europe/Madrid"}},
+    {"name": f"format-datetime-bulk-x{BULK_ROWS}", "method": "POST", "url": "/format-datetime/",
+     "json": {"timestamps": _timestamps(BULK_ROWS, 60), "timezone": "America/New_York"}},
+    {"name": f"evaluate-bulk-x{BULK_ROWS}", "method": "POST", "url": "/evaluate/",
+     "json": {"expression": EXPRESSION, "anchors": [day[:10] for day in _timestamps(BULK_ROWS, 1440)]}},
+    {"name": f"convert-stream-x{BATCH_ROWS}", "method": "POST", "url": "/convert/stream",
+     "content": b'{"date": "2024-05-28", "time": "15:00:00", "from_timezone": "America/Bogota", '
+                b'"to_timezone": "Europe/Madrid"}\n' * BATCH_ROWS, "headers": NDJSON},
+    {"name": f"addsubtract-stream-x{BATCH_ROWS}", "method": "POST", "url": "/addsubtract/stream",
+     "content": b'{"date_str": "2021-05-31", "amount": 5, "unit": "days", "operation": "add"}\n' * BATCH_ROWS,
+     "headers": NDJSON},
+    {"name": f"difference-stream-x{BATCH_ROWS}", "method": "POST", "url": "/difference/stream",
+     "content": b'{"start_date": "2021-05-31", "start_time": "00:00:00", "end_date": "2021-06-01", '
+                b'"end_time": "01:02:03"}\n' * BATCH_ROWS, "headers": NDJSON},
+    {"name": f"weeknumber_iso-stream-x{BATCH_ROWS}", "method": "POST", "url": "/weeknumber_iso/stream",
+     "content": b'{"date_str": "2021-05-31"}\n' * BATCH_ROWS, "headers": NDJSON},
+    {"name": f"intervals-summary-x{BULK_ROWS}", "method": "POST", "url": "/intervals/summary", "json": INTERVALS},
+    {"name": f"intervals-merge-x{BULK_ROWS}", "method": "POST", "url": "/intervals/merge", "json": INTERVALS},
+    {"name": f"intervals-gaps-x{BULK_ROWS}", "method": "POST", "url": "/intervals/gaps", "json": INTERVALS},
+    {"name": f"intervals-overlaps-x{BULK_ROWS}", "method": "POST", "url": "/intervals/overlaps", "json": INTERVALS},
+    {"name": f"intervals-pairs-x{BULK_ROWS}", "method": "POST", "url": "/intervals/overlaps",
+     "params": {"pairs": "true"}, "json": INTERVALS},
+    # Mismas peticiones con la respuesta en MessagePack
+    {"name": "convert-msgpack", "method": "GET", "url": "/convert", "headers": MSGPACK,
+     "params": {"date": "2024-05-28", "time": "15:00:00", "from_timezone": "America/Bogota",
+                "to_timezone": "America/Argentina/Buenos_Aires"}},
+    {"name": f"convert-batch-msgpack-x{BATCH_ROWS}", "method": "POST", "url": "/convert", "headers": MSGPACK,
+     "json": {"timestamps": ["2024-05-28T15:00:00"] * BATCH_ROWS,
+              "from_timezone": "America/Bogota", "to_timezone": "Europe/Madrid"}},
+    {"name": f"difference-bulk-msgpack-x{BULK_ROWS}", "method": "POST", "url": "/difference/", "headers": MSGPACK,
+     "json": {"starts": ["2021-05-31T00:00:00"] * BULK_ROWS, "ends": ["2021-06-01T01:02:03"] * BULK_ROWS}},
+    {"name": "series-msgpack-x744", "method": "GET", "url": "/series/", "headers": MSGPACK,
+     "params": {"start": "2024-01-01T00:00:00", "end": "2024-01-31T23:00:00", "unit": "hours",
+                "timezone": "Europe/Madrid"}},
+    {"name": f"dayofweek-stream-msgpack-x{BATCH_ROWS}", "method": "POST", "url": "/dayofweek/stream",
+     "content": b'{"date_str": "2024-05-28", "language": "es"}\n' * BATCH_ROWS, "headers": {**NDJSON, **MSGPACK}},
+    {"name": f"intervals-merge-msgpack-x{BULK_ROWS}", "method": "POST", "url": "/intervals/merge",
+     "headers": MSGPACK, "json": INTERVALS},
+]
+
+
+def _arrow_tables() -> Dict:
+    """Input tables of the Arrow endpoints (pyarrow is imported here, on first use)."""
+    import pyarrow as pa
+
+    timestamps = [datetime(2024, 1, 1) + timedelta(hours=row) for row in range(BULK_ROWS)]
+    dates = [date(2024, 1, 1) + timedelta(days=row) for row in range(BULK_ROWS)]
+    return {
+        "convert": pa.table({"timestamp": pa.array(timestamps, pa.timestamp("s"))}),
+        "dayofweek": pa.table({"date": pa.array(dates, pa.date32())}),
+        "weeknumber_iso": pa.table({"date": pa.array(dates, pa.date32())}),
+        "difference": pa.table({"start": pa.array(timestamps, pa.timestamp("s")),
+                                "end": pa.array(timestamps[1:] + timestamps[:1], pa.timestamp("s"))}),
+    }
+
+
+def _arrow_stream(table) -> bytes:
+    import pyarrow as pa
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def load_cases() -> List[Dict]:
+    """LOAD_CASES plus the Arrow IPC cases, whose bodies are built with pyarrow."""
+    tables = _arrow_tables()
+    params = {"convert": {"from_timezone": "America/Bogota", "to_timezone": "Europe/Madrid"},
+              "dayofweek": {"language": "es"}}
+    return LOAD_CASES + [
+        {"name": f"{name}-arrow-x{BULK_ROWS}", "method": "POST", "url": f"/{name}/arrow",
+         "params": params.get(name, {}), "content": _arrow_stream(table), "headers": ARROW}
+        for name, table in tables.items()
+    ]
+
+
+def uncovered_routes(app, cases: List[Dict]) -> List[str]:
+    """Routes of `app` (outside EXCLUDED_ROUTES) that no load case requests."""
+    covered = {(case["method"], case["url"]) for case in cases}
+    return [
+        f"{method} {route.path}"
+        for route in app.routes
+        for method in sorted(getattr(route, "methods", None) or ())
+        if method != "HEAD" and (method, route.path) not in covered | EXCLUDED_ROUTES
+    ]
+
+
+def _micro_cases() -> Dict:
+    from api import (addsubtract, calendarrange, convert, current, dayofweek, difference, evaluate, intervals,
+                     series, timezones, weeknumber)
+    from core import negotiation, vectorized
+    from core.transitions import get_table
+
+    interval_starts = vectorized.parse_timestamps(INTERVALS["starts"])[0]
+    interval_ends = vectorized.parse_timestamps(INTERVALS["ends"])[0]
+    anchors = [day[:10] for day in _timestamps(BULK_ROWS, 1440)]
+    tables = _arrow_tables()
+    madrid = get_table("Europe/Madrid")
+
+    return {
+        "addsubtract": lambda: addsubtract.add_subtract_time("2021-05-31", 5, "days", "add"),
+        "convert": lambda: convert.convert_timezone("2024-05-28", "15:00:00", "America/Bogota",
+                                                    "America/Argentina/Buenos_Aires"),
+        "format-datetime": lambda: current.format_datetime("2024-05-29", "12:00:00"),
+        "dayofweek": lambda: dayofweek.day_of_week("2024-05-28", "es"),
+        "difference": lambda: difference.calculate_datetime_difference("2021-05-31", "00:00:00",
+                                                                       "2021-06-01", "01:02:03"),
+        "weeknumber_iso": lambda: weeknumber.get_iso_week_number("2021-05-31"),
+        "timezones": lambda: timezones.list_timezones("America/"),
+        "calendar-weekdays": lambda: calendarrange.get_weekday_dates("2024-01-01", "2024-12-31", 0),
+        f"convert-batch-x{BATCH_ROWS}": lambda: _as_coroutine(convert.convert_batch_body,
+            [("2024-05-28", "15:00:00", "America/Bogota", "Europe/Madrid")] * BATCH_ROWS),
+        f"difference-bulk-x{BULK_ROWS}": lambda: _as_coroutine(difference.difference_bulk_body,
+            ["2021-05-31T00:00:00"] * BULK_ROWS, ["2021-06-01T01:02:03"] * BULK_ROWS, "json"),
+        "convert-multi": lambda: convert.convert_timezone_multi("2024-05-28", "15:00:00", "America/Bogota",
+                                                                ["Europe/Madrid,Asia/Tokyo,America/New_York"]),
+        "timezones-groups": lambda: timezones.list_zone_groups(),
+        "calendar-isoweek": lambda: calendarrange.get_iso_week_dates(2024, 22),
+        "calendar-holidays": lambda: calendarrange.list_holiday_calendars(),
+        "evaluate": lambda: evaluate.evaluate_expression(EXPRESSION, "2024-05-28"),
+        # 2024-01-01T00:00:00 en Madrid es 2023-12-31T23:00:00Z
+        "series-x744": lambda: _as_coroutine(_consume, series.iter_series(1704063600, 3600, 744, madrid)),
+        f"format-datetime-bulk-x{BULK_ROWS}": lambda: _as_coroutine(current.format_datetime_bulk_body,
+            INTERVALS["starts"], "America/New_York", 0),
+        f"evaluate-bulk-x{BULK_ROWS}": lambda: _as_coroutine(evaluate.evaluate_bulk_body, EXPRESSION, anchors, None),
+        f"intervals-summary-x{BULK_ROWS}": lambda: _as_coroutine(intervals.summary_body,
+                                                                  interval_starts, interval_ends),
+        f"intervals-merge-x{BULK_ROWS}": lambda: _as_coroutine(_consume, intervals.iter_interval_rows(
+            *intervals.merged_columns(interval_starts, interval_ends), {}, negotiation.JSON)),
+        f"intervals-pairs-x{BULK_ROWS}": lambda: _as_coroutine(_consume, intervals.iter_pair_rows(
+            *intervals.pair_columns(interval_starts, interval_ends), negotiation.JSON)),
+        f"convert-arrow-x{BULK_ROWS}": lambda: _as_coroutine(convert.convert_table, tables["convert"],
+                                                             "America/Bogota", "Europe/Madrid"),
+        f"dayofweek-arrow-x{BULK_ROWS}": lambda: _as_coroutine(dayofweek.day_of_week_table,
+                                                               tables["dayofweek"], "es"),
+        f"weeknumber_iso-arrow-x{BULK_ROWS}": lambda: _as_coroutine(weeknumber.iso_week_number_table,
+                                                                    tables["weeknumber_iso"]),
+        f"difference-arrow-x{BULK_ROWS}": lambda: _as_coroutine(difference.difference_table, tables["difference"]),
+    }
+
+
+def _consume(chunks) -> int:
+    return sum(len(chunk) for chunk in chunks)
+
+
+async def _as_coroutine(fn, *args):
+    return fn(*args)
+
+
+async def run_micro(number: int) -> Dict:
+    results = {}
+    for name, factory in _micro_cases().items():
+        calls = max(number // 50, 20) if "-x" in name else number
+        await factory()  # calentamiento (cachés, tablas precalculadas)
+        start = time.perf_counter()
+        for _ in range(calls):
+            await factory()
+        elapsed = time.perf_counter() - start
+        results[name] = {"us_per_call": round(elapsed / calls * 1e6, 3)}
+    return results
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+async def run_load(requests: int, concurrency: int) -> Dict:
+    from main import app
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for case in load_cases():
+            kwargs = {key: case[key] for key in ("params", "json", "content", "headers") if key in case}
+            total = max(requests // 10, concurrency) if "-x" in case["name"] else requests
+            await client.request(case["method"], case["url"], **kwargs)  # calentamiento
+
+            latencies: List[float] = []
+            errors = 0
+            remaining = total
+
+            async def worker() -> None:
+                nonlocal remaining, errors
+                while remaining > 0:
+                    remaining -= 1
+                    start = time.perf_counter()
+                    response = await client.request(case["method"], case["url"], **kwargs)
+                    latencies.append(time.perf_counter() - start)
+                    if response.status_code != 200:
+                        errors += 1
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+
+            latencies.sort()
+            results[case["name"]] = {
+                "requests": total,
+                "errors": errors,
+                "p50_ms": round(_percentile(latencies, 0.50) * 1e3, 3),
+                "p95_ms": round(_percentile(latencies, 0.95) * 1e3, 3),
+                "p99_ms": round(_percentile(latencies, 0.99) * 1e3, 3),
+                "rps": round(total / elapsed, 1),
+            }
+    return results
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Return one line per metric that regressed by more than `threshold`."""
+    regressions = []
+    for layer in ("micro", "load"):
+        for name, metrics in results.get(layer, {}).items():
+            previous = baseline.get(layer, {}).get(name)
+            if not previous:
+                continue
+            for metric, value in metrics.items():
+                old = previous.get(metric)
+                if not old:
+                    continue
+                if metric in HIGHER_IS_WORSE:
+                    change = value / old - 1
+                elif metric in LOWER_IS_WORSE:
+                    change = old / value - 1 if value else float("inf")
+                else:
+                    continue
+                if change > threshold:
+                    regressions.append(f"{layer}/{name} {metric}: {old} -> {value} ({change:+.1%} worse)")
+    return regressions
+
+
+def _print_table(results: Dict) -> None:
+    print(f"{'micro':<26} {'us/call':>10}")
+    for name, metrics in results["micro"].items():
+        print(f"{name:<26} {metrics['us_per_call']:>10.2f}")
+    print()
+    print(f"{'load':<26} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>9} {'errors':>7}")
+    for name, metrics in results["load"].items():
+        print(f"{name:<26} {metrics['p50_ms']:>8.2f} {metrics['p95_ms']:>8.2f} "
+              f"{metrics['p99_ms']:>8.2f} {metrics['rps']:>9.1f} {metrics['errors']:>7}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=5000, help="direct calls per handler (micro layer)")
+    parser.add_argument("--requests", type=int, default=2000, help="HTTP requests per endpoint (load layer)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--with-cache", action="store_true",
+                        help="keep the response cache on (off by default so handlers are measured)")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed relative slowdown before a metric counts as a regression")
+    args = parser.parse_args()
+
+    settings.CACHE_ENABLED = args.with_cache
+    from main import app
+    uncovered = uncovered_routes(app, load_cases())
+    if uncovered:
+        print(f"Routes without a load case: {', '.join(uncovered)}\n")
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "cache": args.with_cache,
+        },
+        "micro": asyncio.run(run_micro(args.number)),
+        "load": asyncio.run(run_load(args.requests, args.concurrency)),
+    }
+
+    from core import executor
+    executor.shutdown()
+
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(results, handle, indent=2)
+    _print_table(results)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            regressions = compare(results, json.load(handle), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions over {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
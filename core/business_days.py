@@ -0,0 +1,132 @@
+"""
+Business-day arithmetic over pluggable holiday calendars.
+
+A calendar is a sorted array of the ordinals of its weekday holidays
+(holidays on a weekend do not change any count). The number of business
+days before an ordinal is then a closed-form weekday count minus one
+bisect into that array, so counting is O(log h) and adding N business
+days is a binary search over that count instead of a day-by-day walk.
+
+Calendars are read from DATETIME_HOLIDAY_CALENDAR_DIR, one '<name>.txt'
+file per calendar with one 'YYYY-MM-DD' date per line ('#' starts a
+comment). Without a calendar only weekends are skipped.
+"""
+import os
+from array import array
+from bisect import bisect_left
+from datetime import date
+from functools import lru_cache
+from typing import FrozenSet, Iterable, Optional
+
+from core import settings
+from core.parsing import parse_date
+
+_MAX_ORDINAL = date.max.toordinal()
+
+
+class HolidayCalendar:
+    def __init__(self, name: str, holidays: Iterable[int]):
+        self.name = name
+        # La ordinal 1 es lunes: (ordinal - 1) % 7 < 5 -> lunes a viernes
+        self.holidays = array("q", sorted({ordinal for ordinal in holidays if (ordinal - 1) % 7 < 5}))
+
+    def business_days_before(self, ordinal: int) -> int:
+        """Number of business days in [0001-01-01, ordinal)."""
+        weeks, remainder = divmod(ordinal - 1, 7)
+        return weeks * 5 + min(remainder, 5) - bisect_left(self.holidays, ordinal)
+
+    def is_business_day(self, value: date) -> bool:
+        ordinal = value.toordinal()
+        return self.business_days_before(ordinal + 1) > self.business_days_before(ordinal)
+
+    def count(self, start: date, end: date) -> int:
+        """Number of business days in [start, end); negative if end < start."""
+        return self.business_days_before(end.toordinal()) - self.business_days_before(start.toordinal())
+
+    def add(self, start: date, amount: int) -> date:
+        """
+        Move `amount` business days forward (or backward if negative).
+
+        The result is always a business day; 0 returns `start` unchanged.
+
+        Raises:
+            ValueError: If the result falls outside the supported date range.
+        """
+        return date.fromordinal(self.add_ordinal(start.toordinal(), amount))
+
+    def add_ordinal(self, ordinal: int, amount: int) -> int:
+        """Same as `add`, on proleptic Gregorian ordinals."""
+        if amount == 0:
+            return ordinal
+        # Cota superior de la búsqueda: N días hábiles caben en 7 * ceil((N + feriados) / 5) + 7 días
+        span = 7 * ((abs(amount) + len(self.holidays)) // 5 + 2)
+
+        if amount > 0:
+            # Menor x > start con amount días hábiles en (start, x]
+            target = self.business_days_before(ordinal + 1) + amount
+            low, high = ordinal + 1, min(ordinal + span, _MAX_ORDINAL)
+            if self.business_days_before(high + 1) < target:
+                raise ValueError("Result out of range")
+            while low < high:
+                middle = (low + high) // 2
+                if self.business_days_before(middle + 1) >= target:
+                    high = middle
+                else:
+                    low = middle + 1
+            return low
+
+        # Mayor x < start con -amount días hábiles en [x, start)
+        target = self.business_days_before(ordinal) + amount
+        low, high = max(ordinal - span, 1), ordinal - 1
+        if target < 0 or self.business_days_before(low) > target:
+            raise ValueError("Result out of range")
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.business_days_before(middle) <= target:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+
+WEEKENDS_ONLY = HolidayCalendar("weekends", ())
+
+
+@lru_cache(maxsize=None)
+def available_calendars() -> FrozenSet[str]:
+    """
+    Names of the holiday calendars found in DATETIME_HOLIDAY_CALENDAR_DIR.
+
+    The directory is listed once per process, like the files are read once;
+    new files are picked up on restart.
+    """
+    try:
+        files = os.listdir(settings.HOLIDAY_CALENDAR_DIR)
+    except FileNotFoundError:
+        return frozenset()
+    return frozenset(name[:-4] for name in files if name.endswith(".txt"))
+
+
+@lru_cache(maxsize=None)
+def _load_calendar(name: str) -> HolidayCalendar:
+    ordinals = []
+    with open(os.path.join(settings.HOLIDAY_CALENDAR_DIR, f"{name}.txt"), encoding="utf-8") as handle:
+        for line in handle:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                ordinals.append(parse_date(line).toordinal())
+    return HolidayCalendar(name, ordinals)
+
+
+def get_calendar(name: Optional[str] = None) -> HolidayCalendar:
+    """
+    Return the named holiday calendar (weekends only if `name` is None).
+
+    Raises:
+        ValueError: If there is no such calendar.
+    """
+    if name is None:
+        return WEEKENDS_ONLY
+    if name not in available_calendars():
+        raise ValueError(f"Unknown holiday calendar: {name!r}")
+    return _load_calendar(name)
@@ -0,0 +1,225 @@
+"""
+Response cache for the deterministic GET endpoints.
+
+ResponseCacheMiddleware sits in front of the routers: a successful response
+is stored under its path and normalized query string, and repeated requests
+are answered from the cache without reaching the handler. Every cacheable
+response carries an ETag and a Cache-Control header, and a matching
+If-None-Match gets a 304.
+
+Entries live in a size-bounded LRU in process memory by default. Another
+store (e.g. a shared cache service) can be plugged in by pointing
+DATETIME_CACHE_BACKEND at a 'module:Class' implementing CacheBackend;
+DATETIME_CACHE_BACKEND=dict selects DictBackend, a local stand-in for such
+a store that needs no service.
+"""
+import hashlib
+import importlib
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from core import negotiation, settings
+
+
+class CacheBackend:
+    """Storage interface: opaque byte values with a time to live."""
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return 0
+
+
+class MemoryBackend(CacheBackend):
+    """LRU dictionary bounded to `max_entries`, with per-entry expiry."""
+
+    def __init__(self, max_entries: int, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < self.clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._entries[key] = (self.clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DictBackend(CacheBackend):
+    """
+    Stand-in for an external store: a plain dict of (expiry, value) with no
+    size bound and no LRU order, holding copies of the bytes it is given,
+    as a cache service would. Used to exercise the pluggable-backend path
+    locally and in tests.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.store: Dict[str, Tuple[float, bytes]] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self.store.get(key)
+        if entry is None or entry[0] < self.clock():
+            self.store.pop(key, None)
+            return None
+        return bytes(entry[1])
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        self.store[key] = (self.clock() + ttl, bytes(value))
+
+    def clear(self) -> None:
+        self.store.clear()
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+
+# Nombres cortos aceptados en DATETIME_CACHE_BACKEND
+BACKENDS = {"memory": lambda: MemoryBackend(settings.CACHE_MAX_ENTRIES), "dict": DictBackend}
+
+
+def _load_backend() -> CacheBackend:
+    if not settings.CACHE_BACKEND:
+        return MemoryBackend(settings.CACHE_MAX_ENTRIES)
+    if settings.CACHE_BACKEND in BACKENDS:
+        return BACKENDS[settings.CACHE_BACKEND]()
+    module_name, _, class_name = settings.CACHE_BACKEND.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Tuple[bytes, bytes]]:
+        """Return (content_type, body) for a cached key, counting the hit or miss."""
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        content_type, _, body = value.partition(b"\n")
+        return content_type, body
+
+    def set(self, key: str, content_type: bytes, body: bytes) -> None:
+        self.backend.set(key, content_type + b"\n" + body, self.ttl)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": settings.CACHE_ENABLED,
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "max_entries": getattr(self.backend, "max_entries", None),
+            "evictions": getattr(self.backend, "evictions", None),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 6) if lookups else 0.0,
+        }
+
+
+response_cache = ResponseCache(_load_backend(), settings.CACHE_TTL_SECONDS)
+
+
+def cache_key(path: str, query_string: bytes, wire_format: str = negotiation.JSON) -> str:
+    # Ordenar por nombre de parámetro manteniendo el orden de los repetidos
+    query = parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)
+    key = f"{path}?{urlencode(sorted(query, key=lambda item: item[0]))}"
+    # El formato negociado a partir de Accept (no la cabecera literal) separa las variantes
+    return key if wire_format == negotiation.JSON else f"{key}#{wire_format}"
+
+
+def etag_for(body: bytes) -> bytes:
+    return b'"' + hashlib.blake2b(body, digest_size=12).hexdigest().encode() + b'"'
+
+
+class ResponseCacheMiddleware:
+    def __init__(self, app, cache: ResponseCache, paths: Iterable[str]):
+        self.app = app
+        self.cache = cache
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if (scope["type"] != "http" or scope["method"] != "GET"
+                or scope["path"] not in self.paths or not settings.CACHE_ENABLED):
+            await self.app(scope, receive, send)
+            return
+
+        key = cache_key(scope["path"], scope["query_string"], negotiation.current())
+        if_none_match = dict(scope["headers"]).get(b"if-none-match")
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            content_type, body = cached
+            await self._send(send, 200, content_type, body, if_none_match, b"HIT")
+            return
+
+        start = {}
+        chunks = []
+
+        async def capture(message) -> None:
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+
+        body = b"".join(chunks)
+        content_type = dict(start.get("headers", [])).get(b"content-type", b"application/json")
+        if start.get("status") != 200:
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        self.cache.set(key, content_type, body)
+        await self._send(send, 200, content_type, body, if_none_match, b"MISS")
+
+    async def _send(self, send, status: int, content_type: bytes, body: bytes,
+                    if_none_match: Optional[bytes], cache_status: bytes) -> None:
+        etag = etag_for(body)
+        headers = [
+            (b"etag", etag),
+            (b"cache-control", f"public, max-age={self.cache.ttl}".encode()),
+            (b"x-cache", cache_status),
+        ]
+        if if_none_match is not None and etag in (tag.strip() for tag in if_none_match.split(b",")):
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        headers += [(b"content-type", content_type), (b"content-length", str(len(body)).encode())]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,109 @@
+"""
+Precomputed calendar table.
+
+For every day in [DATETIME_CALENDAR_FIRST_YEAR, DATETIME_CALENDAR_LAST_YEAR]
+the weekday, ISO year, ISO week and ISO weekday are stored in compact
+arrays indexed by the day's offset from the first ordinal. Dates outside
+the range fall back to the datetime methods.
+"""
+from array import array
+from datetime import date
+from functools import lru_cache
+from typing import Iterator, Tuple
+
+from core import settings
+
+DAYS_EN = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+DAYS_ES = ("Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo")
+
+
+def _jan1_ordinal(year: int) -> int:
+    previous = year - 1
+    return previous * 365 + previous // 4 - previous // 100 + previous // 400 + 1
+
+
+def iso_week1_monday(iso_year: int) -> int:
+    """Ordinal of the Monday that starts ISO week 1 of `iso_year`."""
+    jan4 = _jan1_ordinal(iso_year) + 3
+    return jan4 - (jan4 - 1) % 7
+
+
+class CalendarIndex:
+    def __init__(self, first_year: int, last_year: int):
+        self.first_ordinal = _jan1_ordinal(first_year)
+        self.last_ordinal = _jan1_ordinal(last_year + 1) - 1
+        size = self.last_ordinal - self.first_ordinal + 1
+
+        # La ordinal 1 (0001-01-01) es lunes
+        start_weekday = (self.first_ordinal - 1) % 7
+        self.weekday = array("B", ((start_weekday + offset) % 7 for offset in range(size)))
+        self.iso_year = array("H")
+        self.iso_week = array("B")
+        self.iso_day = array("B")
+
+        # Recorrer los años ISO que se solapan con el rango
+        iso_year = first_year - 1
+        while iso_week1_monday(iso_year + 1) <= self.first_ordinal:
+            iso_year += 1
+        ordinal = self.first_ordinal
+        while ordinal <= self.last_ordinal:
+            year_start = iso_week1_monday(iso_year)
+            year_end = min(iso_week1_monday(iso_year + 1), self.last_ordinal + 1)
+            days = range(ordinal - year_start, year_end - year_start)
+            self.iso_year.extend([iso_year] * len(days))
+            self.iso_week.extend(day // 7 + 1 for day in days)
+            self.iso_day.extend(day % 7 + 1 for day in days)
+            ordinal = year_end
+            iso_year += 1
+
+    def lookup(self, value: date) -> Tuple[int, int, int, int]:
+        """Return (weekday, iso_year, iso_week, iso_day) for a date."""
+        offset = value.toordinal() - self.first_ordinal
+        if 0 <= offset < len(self.weekday):
+            return self.weekday[offset], self.iso_year[offset], self.iso_week[offset], self.iso_day[offset]
+        iso_year, iso_week, iso_day = value.isocalendar()
+        return value.weekday(), iso_year, iso_week, iso_day
+
+    def weekday_of(self, value: date) -> int:
+        offset = value.toordinal() - self.first_ordinal
+        if 0 <= offset < len(self.weekday):
+            return self.weekday[offset]
+        return value.weekday()
+
+
+@lru_cache(maxsize=None)
+def get_index() -> CalendarIndex:
+    """Build (once) the table for the configured year range."""
+    return CalendarIndex(settings.CALENDAR_FIRST_YEAR, settings.CALENDAR_LAST_YEAR)
+
+
+def weeks_in_iso_year(iso_year: int) -> int:
+    return (iso_week1_monday(iso_year + 1) - iso_week1_monday(iso_year)) // 7
+
+
+def iso_week_dates(iso_year: int, iso_week: int) -> Iterator[date]:
+    """
+    Yield the seven dates (Monday to Sunday) of an ISO week.
+
+    Raises:
+        ValueError: If the week does not exist in that ISO year.
+    """
+    if not 1 <= iso_year <= 9999 or not 1 <= iso_week <= weeks_in_iso_year(iso_year):
+        raise ValueError(f"ISO year {iso_year} has no week {iso_week}")
+    monday = iso_week1_monday(iso_year) + (iso_week - 1) * 7
+    # Evitar salir del rango de datetime en la última semana del año 9999
+    for ordinal in range(max(monday, 1), min(monday + 7, date.max.toordinal() + 1)):
+        yield date.fromordinal(ordinal)
+
+
+def count_weekday(start: date, end: date, weekday: int) -> int:
+    """Number of dates with the given weekday (0=Monday) in [start, end]."""
+    first = start.toordinal() + (weekday - get_index().weekday_of(start)) % 7
+    return len(range(first, end.toordinal() + 1, 7))
+
+
+def weekday_dates(start: date, end: date, weekday: int) -> Iterator[date]:
+    """Yield every date with the given weekday (0=Monday) in [start, end]."""
+    first = start.toordinal() + (weekday - get_index().weekday_of(start)) % 7
+    for ordinal in range(first, end.toordinal() + 1, 7):
+        yield date.fromordinal(ordinal)
@@ -0,0 +1,162 @@
+"""
+Calendar arithmetic on plain integers.
+
+A datetime is handled as microseconds since 1970-01-01T00:00:00 (local or
+UTC, depending on the caller) and a date as its proleptic Gregorian ordinal,
+so adding any unit is a handful of integer operations: fixed units are a
+multiplication, and months/years convert the ordinal to (year, month, day),
+move the month count and convert back, with no date objects in between.
+
+When the day does not exist in the target month (January 31 + 1 month) the
+overflow policy decides: CLAMP moves it to the last day of the month,
+OVERFLOW carries the extra days into the next month and ERROR rejects it.
+"""
+from datetime import datetime, timedelta
+from typing import Tuple
+
+CLAMP = "clamp"
+OVERFLOW = "overflow"
+ERROR = "error"
+POLICIES = (CLAMP, OVERFLOW, ERROR)
+
+MICROSECONDS_PER_DAY = 86400 * 1000000
+# Unidades de duración fija, en microsegundos
+FIXED_UNITS = {
+    "seconds": 1000000,
+    "minutes": 60 * 1000000,
+    "hours": 3600 * 1000000,
+    "days": MICROSECONDS_PER_DAY,
+    "weeks": 7 * MICROSECONDS_PER_DAY,
+}
+MONTH_UNITS = {"months": 1, "years": 12}
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+EPOCH_ORDINAL = 719163  # date(1970, 1, 1).toordinal()
+MAX_ORDINAL = 3652059  # date(9999, 12, 31).toordinal()
+
+
+
+class MissingDayError(ValueError):
+    """The day of the month does not exist in the target month (ERROR policy)."""
+
+
+_DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+_DAYS_BEFORE_MONTH = (0, 0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+
+_DAYS_IN_400_YEARS = 146097
+_DAYS_IN_100_YEARS = 36524
+_DAYS_IN_4_YEARS = 1461
+
+
+def is_leap(year: int) -> bool:
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def days_in_month(year: int, month: int) -> int:
+    if month == 2 and is_leap(year):
+        return 29
+    return _DAYS_IN_MONTH[month]
+
+
+def to_ordinal(year: int, month: int, day: int) -> int:
+    """Proleptic Gregorian ordinal of a date (0001-01-01 is 1)."""
+    previous = year - 1
+    days = previous * 365 + previous // 4 - previous // 100 + previous // 400
+    days += _DAYS_BEFORE_MONTH[month] + (month > 2 and is_leap(year))
+    return days + day
+
+
+def from_ordinal(ordinal: int) -> Tuple[int, int, int]:
+    """Return (year, month, day) for a proleptic Gregorian ordinal."""
+    days = ordinal - 1
+    cycles400, days = divmod(days, _DAYS_IN_400_YEARS)
+    cycles100, days = divmod(days, _DAYS_IN_100_YEARS)
+    cycles4, days = divmod(days, _DAYS_IN_4_YEARS)
+    years, days = divmod(days, 365)
+    year = cycles400 * 400 + cycles100 * 100 + cycles4 * 4 + years + 1
+    if years == 4 or cycles100 == 4:
+        # 31 de diciembre del último año bisiesto del ciclo
+        return year - 1, 12, 31
+
+    leap = years == 3 and (cycles4 != 24 or cycles100 == 3)
+    month = (days + 50) >> 5
+    before = _DAYS_BEFORE_MONTH[month] + (month > 2 and leap)
+    if before > days:
+        month -= 1
+        before = _DAYS_BEFORE_MONTH[month] + (month > 2 and leap)
+    return year, month, days - before + 1
+
+
+def add_months(ordinal: int, months: int, policy: str = CLAMP) -> int:
+    """
+    Move a date by a whole number of months, keeping its day of the month.
+
+    Raises:
+        MissingDayError: If the day does not exist in the target month and
+        the policy is ERROR.
+        ValueError: If the result is outside years 1-9999.
+    """
+    year, month, day = from_ordinal(ordinal)
+    year, month = divmod(year * 12 + month - 1 + months, 12)
+    month += 1
+    if not 1 <= year <= 9999:
+        raise ValueError("Result outside the supported date range.")
+
+    last_day = _DAYS_IN_MONTH[month]
+    if day > last_day and month == 2 and is_leap(year):
+        last_day = 29
+    if day > last_day:
+        if policy == ERROR:
+            raise MissingDayError(f"Day {day} does not exist in {year:04d}-{month:02d}.")
+        if policy == CLAMP:
+            day = last_day
+        # OVERFLOW: los días sobrantes pasan al mes siguiente a través del ordinal
+    result = to_ordinal(year, month, 1) + day - 1
+    if result > MAX_ORDINAL:
+        raise ValueError("Result outside the supported date range.")
+    return result
+
+
+def shift(microseconds: int, amount: int, unit: str, policy: str = CLAMP) -> int:
+    """
+    Add `amount` units to a datetime given in microseconds since the epoch.
+
+    `amount` is a whole number of months for 'months' and 'years' (years are
+    converted to months), and a number of microseconds-rounded units for
+    the fixed units.
+
+    Raises:
+        ValueError: For an unknown unit, a day missing under the ERROR
+        policy, or a result outside years 1-9999.
+    """
+    if unit in FIXED_UNITS:
+        result = microseconds + amount
+    elif unit in MONTH_UNITS:
+        days, time_of_day = divmod(microseconds, MICROSECONDS_PER_DAY)
+        ordinal = add_months(days + EPOCH_ORDINAL, amount, policy)
+        result = (ordinal - EPOCH_ORDINAL) * MICROSECONDS_PER_DAY + time_of_day
+    else:
+        raise ValueError(f"Unknown unit: {unit!r}")
+
+    if not in_range(result):
+        raise ValueError("Result outside the supported date range.")
+    return result
+
+
+def in_range(microseconds: int) -> bool:
+    """Whether a datetime in microseconds since the epoch falls in years 1-9999."""
+    return 1 <= microseconds // MICROSECONDS_PER_DAY + EPOCH_ORDINAL <= MAX_ORDINAL
+
+
+def to_microseconds(year: int, month: int, day: int, hour: int = 0, minute: int = 0,
+                    second: int = 0, microsecond: int = 0) -> int:
+    """Microseconds since 1970-01-01T00:00:00 for a broken-down datetime."""
+    days = to_ordinal(year, month, day) - EPOCH_ORDINAL
+    return ((days * 24 + hour) * 60 + minute) * 60000000 + second * 1000000 + microsecond
+
+
+def isoformat(microseconds: int) -> str:
+    """Render microseconds since the epoch like datetime.isoformat()."""
+    # Un único datetime al final: su isoformat en C es más rápido que formatear a mano
+    return (EPOCH + MICROSECOND * microseconds).isoformat()
@@ -0,0 +1,116 @@
+"""
+Request coalescing for traffic spikes.
+
+SingleFlightMiddleware: while a GET request is being computed, identical
+requests (same path, normalized query string and wire format) wait for it
+and get a copy of its response instead of running the handler again.
+
+MicroBatcher: single-item handlers submit their already validated input and
+wait; the items that arrive within DATETIME_MICRO_BATCH_WINDOW_MS of the
+first one (or until DATETIME_MICRO_BATCH_MAX_SIZE of them) are computed in
+one vectorized call. With the window at 0 each item is computed on its own,
+exactly as before.
+
+Both run on the event loop, so the shared state needs no locking. The
+number of requests served by another request's work is exported on /metrics.
+"""
+import asyncio
+from typing import Callable, Dict, Generic, Iterable, List, Tuple, TypeVar
+
+from core import metrics, negotiation, settings
+from core.cache import cache_key
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class SingleFlightMiddleware:
+    def __init__(self, app, paths: Iterable[str]):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.flights: Dict[str, asyncio.Future] = {}
+
+    async def __call__(self, scope, receive, send) -> None:
+        if (scope["type"] != "http" or scope["method"] != "GET"
+                or scope["path"] not in self.paths or not settings.SINGLE_FLIGHT_ENABLED):
+            await self.app(scope, receive, send)
+            return
+
+        key = cache_key(scope["path"], scope["query_string"], negotiation.current())
+        flight = self.flights.get(key)
+        if flight is not None:
+            # shield: si este cliente se va, la petición que calcula no se cancela
+            messages = await asyncio.shield(flight)
+            if messages is not None:
+                metrics.coalesced_total[scope["path"]] += 1
+                for message in messages:
+                    await send(message)
+                return
+            # La petición que calculaba falló: esta lo intenta por su cuenta
+            await self.app(scope, receive, send)
+            return
+
+        flight = self.flights[key] = asyncio.get_running_loop().create_future()
+        messages = []
+
+        async def record(message) -> None:
+            messages.append(message)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, record)
+        finally:
+            del self.flights[key]
+            flight.set_result(messages if messages and messages[-1].get("more_body") is not True else None)
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Group single items submitted close together into one `compute_many` call.
+
+    `compute_one(item)` returns the result of one item; `compute_many(items)`
+    returns one result per item, where an Exception instance is raised to
+    that item's caller only.
+    """
+
+    def __init__(self, endpoint: str, compute_one: Callable[[T], R],
+                 compute_many: Callable[[List[T]], List[R]]):
+        self.endpoint = endpoint
+        self.compute_one = compute_one
+        self.compute_many = compute_many
+        self.pending: List[Tuple[T, asyncio.Future]] = []
+        self.timer = None
+
+    async def submit(self, item: T) -> R:
+        if settings.MICRO_BATCH_WINDOW_MS <= 0:
+            return self.compute_one(item)
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((item, future))
+        if len(self.pending) >= settings.MICRO_BATCH_MAX_SIZE:
+            self.flush()
+        elif self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(settings.MICRO_BATCH_WINDOW_MS / 1000, self.flush)
+        return await future
+
+    def flush(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+
+        metrics.micro_batches_total[self.endpoint] += 1
+        metrics.micro_batch_items_total[self.endpoint] += len(batch)
+        try:
+            results = self.compute_many([item for item, _ in batch])
+        except Exception as exc:
+            results = [exc] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,223 @@
+"""
+Apache Arrow / Parquet bodies for the /<endpoint>/arrow routes.
+
+The request body is wrapped in an Arrow buffer without copying and read as
+an IPC stream or a Parquet file. Input columns are exposed to NumPy as views
+over their Arrow data buffers, the endpoint computes whole columns at once,
+and the result columns are wrapped back into an Arrow table that is written
+in the format the client asked for. pyarrow is imported on first use, so
+the rest of the API does not pay for it.
+"""
+from typing import Callable, Dict, Tuple
+
+from fastapi import HTTPException, Request, Response
+
+from core.executor import run_bulk
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+FORMATS = {ARROW_STREAM_MEDIA_TYPE: "arrow", PARQUET_MEDIA_TYPE: "parquet"}
+
+# Documentación OpenAPI del cuerpo aceptado por los endpoints columnares
+COLUMNAR_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            ARROW_STREAM_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+            PARQUET_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
+
+COLUMNAR_RESPONSES = {
+    200: {
+        "description": "The result table, as an Arrow IPC stream or a Parquet file (see the Accept "
+                       "header; by default the format of the request). Rows that fail are null.",
+        "content": {ARROW_STREAM_MEDIA_TYPE: {}, PARQUET_MEDIA_TYPE: {}},
+    },
+    422: {
+        "description": "Validation Error",
+        "content": {"application/json": {"example": {"detail": "Missing column 'date'."}}},
+    },
+}
+
+# Unidades de un timestamp de Arrow por segundo
+UNITS_PER_SECOND = {"s": 1, "ms": 1000, "us": 1000000, "ns": 1000000000}
+
+
+class ColumnarError(ValueError):
+    """The body or one of its columns cannot be used (reported as a 422)."""
+
+
+def negotiate(content_type: str, accept: str) -> Tuple[str, str]:
+    """
+    Return (input format, output media type) from the request headers.
+
+    Raises:
+        ColumnarError: If the body is neither an Arrow stream nor Parquet.
+    """
+    input_format = FORMATS.get(content_type.split(";")[0].strip())
+    if input_format is None:
+        raise ColumnarError(f"Content-Type must be '{ARROW_STREAM_MEDIA_TYPE}' or '{PARQUET_MEDIA_TYPE}'.")
+    for media_type in FORMATS:
+        if media_type in accept:
+            return input_format, media_type
+    return input_format, content_type.split(";")[0].strip()
+
+
+def read_table(body: bytes, input_format: str):
+    """Read an Arrow IPC stream or Parquet file from the body without copying it."""
+    import pyarrow as pa
+
+    buffer = pa.py_buffer(body)
+    try:
+        if input_format == "parquet":
+            import pyarrow.parquet as pq
+            return pq.read_table(pa.BufferReader(buffer))
+        return pa.ipc.open_stream(buffer).read_all()
+    except (pa.ArrowInvalid, OSError):
+        raise ColumnarError(f"The body is not a valid {'Parquet file' if input_format == 'parquet' else 'Arrow IPC stream'}.")
+
+
+def write_table(table, media_type: str):
+    """Serialize a table; returns an Arrow buffer."""
+    import pyarrow as pa
+
+    sink = pa.BufferOutputStream()
+    if FORMATS[media_type] == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue()
+
+
+def column(table, name: str):
+    """
+    Return a table column as a single Arrow array.
+
+    Raises:
+        ColumnarError: If the column is missing.
+    """
+    if name not in table.column_names:
+        raise ColumnarError(f"Missing column '{name}'.")
+    chunked = table.column(name)
+    # Con un único chunk no se copia nada
+    return chunked.chunk(0) if chunked.num_chunks == 1 else chunked.combine_chunks()
+
+
+def int_view(array, dtype: str):
+    """
+    NumPy view over the data buffer of a fixed-width array. Null slots are
+    set to 0 (which needs a copy, so only columns with nulls pay for it).
+    """
+    import numpy as np
+
+    data = array.buffers()[1]
+    values = np.frombuffer(data, dtype=dtype)[array.offset:array.offset + len(array)]
+    if array.null_count:
+        values = np.where(valid_mask(array), values, 0)
+    return values
+
+
+def valid_mask(array):
+    import numpy as np
+
+    if array.null_count == 0:
+        return np.ones(len(array), dtype=bool)
+    return array.is_valid().to_numpy(zero_copy_only=False)
+
+
+def timestamp_values(array, name: str) -> Tuple[object, int, str]:
+    """
+    Return (int64 view, units per second, timezone or '') of a timestamp column.
+
+    Raises:
+        ColumnarError: If the column is not a timestamp.
+    """
+    import pyarrow as pa
+
+    if not pa.types.is_timestamp(array.type):
+        raise ColumnarError(f"Column '{name}' must be a timestamp column.")
+    return int_view(array, "<i8"), UNITS_PER_SECOND[array.type.unit], array.type.tz or ""
+
+
+def epoch_days(array, name: str):
+    """
+    Days since 1970-01-01 of a date32, date64 or timestamp column (wall-clock
+    date; timestamps with a time zone are taken in that zone).
+
+    Raises:
+        ColumnarError: If the column is not a date or timestamp.
+    """
+    import numpy as np
+    import pyarrow as pa
+
+    if pa.types.is_date32(array.type):
+        return int_view(array, "<i4").astype(np.int64)
+    if pa.types.is_date64(array.type):
+        return int_view(array, "<i8") // 86400000
+    if pa.types.is_timestamp(array.type):
+        values, per_second, zone = timestamp_values(array, name)
+        seconds = values // per_second
+        if zone:
+            seconds = local_seconds(seconds, zone)
+        return seconds // 86400
+    raise ColumnarError(f"Column '{name}' must be a date or timestamp column.")
+
+
+def local_seconds(utc_seconds, zone: str):
+    """Wall-clock seconds in `zone` for UTC seconds, through the zone's transition table."""
+    from core import vectorized
+    from core.transitions import get_table
+
+    try:
+        table = get_table(zone)
+    except ValueError:
+        raise ColumnarError(f"Unknown time zone in column type: {zone!r}.")
+    return utc_seconds + vectorized.offsets_at(utc_seconds, table)
+
+
+def table_from_columns(columns: Dict[str, object], valid) -> object:
+    """Build the result table from NumPy columns, with nulls where `valid` is False."""
+    import pyarrow as pa
+
+    mask = None if valid.all() else ~valid
+    arrays = {}
+    for name, values in columns.items():
+        if isinstance(values, pa.Array):
+            arrays[name] = values
+        else:
+            arrays[name] = pa.array(values, mask=mask)
+    return pa.table(arrays)
+
+
+def _process(compute: Callable, body: bytes, input_format: str, media_type: str, *args):
+    table = read_table(body, input_format)
+    try:
+        result = compute(table, *args)
+    except OverflowError:
+        raise ColumnarError("Timestamps outside the supported range (years 1-9999).")
+    # Una sola copia, a bytes, que es lo que acepta la respuesta ASGI (y lo
+    # que viaja de vuelta desde el pool de procesos)
+    return write_table(result, media_type).to_pybytes()
+
+
+async def columnar_response(request: Request, compute: Callable, *args) -> Response:
+    """
+    Run `compute(table, *args) -> table` on the Arrow/Parquet body in the
+    bulk pool and return the result table.
+
+    Raises:
+        HTTPException: If the body or its columns cannot be used (422), or
+        the bulk pool is full (503).
+    """
+    try:
+        input_format, media_type = negotiate(request.headers.get("content-type", ""),
+                                             request.headers.get("accept", ""))
+        body = await request.body()
+        result = await run_bulk(_process, compute, body, input_format, media_type, *args)
+    except ColumnarError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return Response(content=result, media_type=media_type)
@@ -0,0 +1,79 @@
+"""
+Process pool for heavy bulk operations.
+
+Single-item handlers run inline on the event loop; batch and bulk work is
+sent here so large requests use every core without blocking the loop.
+At most DATETIME_BULK_WORKERS jobs run at once and DATETIME_BULK_QUEUE_DEPTH
+more may wait; beyond that new jobs are rejected with a 503 so clients back
+off instead of piling up. With DATETIME_BULK_WORKERS=0 jobs run in a thread
+of the server process instead.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Optional, TypeVar
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from core import settings
+
+T = TypeVar("T")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pending = 0
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # 'spawn' evita heredar hilos y estado del servidor en los procesos hijos
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.BULK_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def pending_jobs() -> int:
+    return _pending
+
+
+def capacity() -> int:
+    return max(settings.BULK_WORKERS, 1) + settings.BULK_QUEUE_DEPTH
+
+
+async def run_bulk(fn: Callable[..., T], *args) -> T:
+    """
+    Run `fn(*args)` in the process pool and wait for the result.
+
+    `fn` and its arguments must be picklable (module-level functions and
+    plain data).
+
+    Raises:
+        HTTPException: 503 if the pool and its queue are full.
+    """
+    global _pending
+    if _pending >= capacity():
+        raise HTTPException(
+            status_code=503,
+            detail="Server busy: too many bulk requests in progress. Retry later.",
+            headers={"Retry-After": "1"}
+        )
+
+    _pending += 1
+    try:
+        if settings.BULK_WORKERS <= 0:
+            return await run_in_threadpool(fn, *args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_pool(), partial(fn, *args))
+    finally:
+        _pending -= 1
+
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
@@ -0,0 +1,355 @@
+"""
+Relative date expressions: "last business day of next month", "third Tuesday
+of 2025-11", "3 business days after today".
+
+An expression is parsed once into a plan, a tree of small functions over
+proleptic Gregorian ordinals that only needs the anchor date and the holiday
+calendar to produce a date. Plans are kept in an LRU cache keyed by the
+normalized expression text (DATETIME_EXPRESSION_CACHE_SIZE entries), so a
+repeated expression skips the parser and a batch evaluates one plan against
+every anchor.
+
+Grammar (case-insensitive; words separated by spaces, 'the' is optional):
+
+    expression := term (("+" | "-") quantity)*
+    term       := quantity ("after" | "before" | "from") expression
+                | quantity "ago" | "in" quantity
+                | ("first" | "last") ["business"] "day" "of" period
+                | ("start" | "end") "of" period
+                | ordinal weekday "of" period
+                | ("next" | "last" | "this") weekday
+                | "today" | "tomorrow" | "yesterday" | YYYY-MM-DD
+    quantity   := INTEGER unit        day, week, month, year or business day (or plural)
+    period     := ("this" | "next" | "last") ("week" | "month" | "year")
+                | month-name [YYYY] | YYYY-MM | YYYY
+    ordinal    := first ... fifth | 1st ... 5th | last
+
+Weeks are ISO weeks (Monday to Sunday). "next friday" is the first Friday
+after the anchor and "last friday" the last one before it. Months and years
+are added with the DATETIME_MONTH_OVERFLOW_POLICY rule of /addsubtract.
+"""
+import re
+from datetime import date
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+from core import calendar_math, settings
+from core.business_days import WEEKENDS_ONLY, HolidayCalendar
+from core.calendar_index import DAYS_EN
+from core.parsing import parse_date
+
+# Una fecha se evalúa como ordinal: (ordinal del ancla, calendario) -> ordinal
+DateFn = Callable[[int, HolidayCalendar], int]
+# Un periodo, como ordinales del primer y el último día (inclusive)
+PeriodFn = Callable[[int, HolidayCalendar], Tuple[int, int]]
+
+WEEKDAYS = {
+    "monday": 0, "mon": 0, "tuesday": 1, "tue": 1, "tues": 1, "wednesday": 2, "wed": 2,
+    "thursday": 3, "thu": 3, "thur": 3, "thurs": 3, "friday": 4, "fri": 4,
+    "saturday": 5, "sat": 5, "sunday": 6, "sun": 6,
+}
+MONTHS = {
+    "january": 1, "jan": 1, "february": 2, "feb": 2, "march": 3, "mar": 3, "april": 4, "apr": 4,
+    "may": 5, "june": 6, "jun": 6, "july": 7, "jul": 7, "august": 8, "aug": 8,
+    "september": 9, "sep": 9, "sept": 9, "october": 10, "oct": 10, "november": 11, "nov": 11,
+    "december": 12, "dec": 12,
+}
+ORDINALS = {
+    "first": 1, "1st": 1, "second": 2, "2nd": 2, "third": 3, "3rd": 3,
+    "fourth": 4, "4th": 4, "fifth": 5, "5th": 5,
+}
+# Unidad -> (unidad de cálculo, multiplicador)
+UNITS = {
+    "day": ("days", 1), "days": ("days", 1), "week": ("days", 7), "weeks": ("days", 7),
+    "month": ("months", 1), "months": ("months", 1), "year": ("months", 12), "years": ("months", 12),
+}
+RELATIVE = {"last": -1, "this": 0, "next": 1}
+_ORDINAL_NAMES = ("", "first", "second", "third", "fourth", "fifth")
+
+_TOKEN = re.compile(r"\s*(?:(\d{4}-\d{2}-\d{2}|\d{4}-\d{2}|\d+(?:st|nd|rd|th)?|[a-z]+|[+-])|(\S))")
+
+
+class ExpressionSyntaxError(ValueError):
+    """The expression does not follow the grammar (reported as a 422)."""
+
+
+def weekday(ordinal: int) -> int:
+    """0=Monday ... 6=Sunday (the ordinal 1, 0001-01-01, is a Monday)."""
+    return (ordinal - 1) % 7
+
+
+def _month_bounds(year: int, month: int) -> Tuple[int, int]:
+    first = calendar_math.to_ordinal(year, month, 1)
+    return first, first + calendar_math.days_in_month(year, month) - 1
+
+
+def _year_bounds(year: int) -> Tuple[int, int]:
+    return calendar_math.to_ordinal(year, 1, 1), calendar_math.to_ordinal(year, 12, 31)
+
+
+def _check_year(year: int) -> int:
+    if not 1 <= year <= 9999:
+        raise ValueError("Result outside the supported date range.")
+    return year
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split an expression into lowercase words, numbers, dates and signs.
+
+    Raises:
+        ExpressionSyntaxError: If the text has a character outside the grammar.
+    """
+    tokens = []
+    for match in _TOKEN.finditer(text.lower()):
+        if match.group(2) is not None:
+            raise ExpressionSyntaxError(f"Unexpected character {match.group(2)!r} at position {match.start(2)}.")
+        tokens.append(match.group(1))
+    return tokens
+
+
+class Plan:
+    """A compiled expression, ready to be evaluated against any anchor date."""
+
+    __slots__ = ("text", "_evaluate")
+
+    def __init__(self, text: str, evaluate: DateFn):
+        self.text = text
+        self._evaluate = evaluate
+
+    def evaluate(self, anchor: date, calendar: HolidayCalendar = WEEKENDS_ONLY) -> date:
+        """
+        Evaluate the plan relative to `anchor`.
+
+        Raises:
+            ValueError: If the result does not exist (e.g. a fifth Tuesday)
+            or falls outside years 1-9999.
+        """
+        ordinal = self._evaluate(anchor.toordinal(), calendar)
+        if not 1 <= ordinal <= calendar_math.MAX_ORDINAL:
+            raise ValueError("Result outside the supported date range.")
+        return date.fromordinal(ordinal)
+
+
+class _Parser:
+    def __init__(self, tokens: List[str]):
+        self.tokens = tokens
+        self.position = 0
+        self.policy = settings.MONTH_OVERFLOW_POLICY
+
+    # -- tokens --------------------------------------------------------
+
+    def peek(self, offset: int = 0) -> Optional[str]:
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def take(self) -> str:
+        token = self.peek()
+        if token is None:
+            raise ExpressionSyntaxError("Unexpected end of expression.")
+        self.position += 1
+        return token
+
+    def expect(self, *words: str) -> str:
+        token = self.take()
+        if token not in words:
+            self.fail(token, " or ".join(repr(word) for word in words))
+        return token
+
+    def skip_article(self) -> None:
+        if self.peek() == "the":
+            self.position += 1
+
+    def fail(self, token: str, expected: str):
+        # position ya apunta después de la palabra que falló (numeradas desde 1)
+        raise ExpressionSyntaxError(f"Unexpected {token!r} at word {self.position}; expected {expected}.")
+
+    # -- grammar -------------------------------------------------------
+
+    def parse(self) -> DateFn:
+        result = self.expression()
+        if self.peek() is not None:
+            self.fail(self.take(), "'+', '-' or the end of the expression")
+        return result
+
+    def expression(self) -> DateFn:
+        result = self.term()
+        while self.peek() in ("+", "-"):
+            sign = 1 if self.take() == "+" else -1
+            result = self.shifted(result, self.quantity(), sign)
+        return result
+
+    def term(self) -> DateFn:
+        self.skip_article()
+        token = self.peek()
+        if token is None:
+            raise ExpressionSyntaxError("Unexpected end of expression.")
+
+        if token.isdigit() and (self.peek(1) in UNITS or self.peek(1) == "business"):
+            quantity = self.quantity()
+            direction = self.expect("after", "from", "before", "ago")
+            if direction == "ago":
+                return self.shifted(lambda anchor, calendar: anchor, quantity, -1)
+            return self.shifted(self.expression(), quantity, -1 if direction == "before" else 1)
+        if token == "in":
+            self.take()
+            return self.shifted(lambda anchor, calendar: anchor, self.quantity(), 1)
+
+        self.take()
+        if token in ("today", "tomorrow", "yesterday"):
+            days = {"today": 0, "tomorrow": 1, "yesterday": -1}[token]
+            return lambda anchor, calendar: anchor + days
+        if len(token) == 10 and token[4] == "-":
+            try:
+                ordinal = parse_date(token).toordinal()
+            except ValueError:
+                raise ExpressionSyntaxError(f"Invalid date {token!r}.")
+            return lambda anchor, calendar: ordinal
+        if token in ("start", "end"):
+            self.expect("of")
+            return self.day_of(self.period(), token == "end", False)
+        if token in ("first", "last") and self.peek() in ("day", "business"):
+            business = self.take() == "business"
+            if business:
+                self.expect("day")
+            self.expect("of")
+            return self.day_of(self.period(), token == "last", business)
+        if token in ORDINALS or token == "last":
+            if self.peek() in WEEKDAYS and (self.peek(1) == "of" or token != "last"):
+                day = WEEKDAYS[self.take()]
+                self.expect("of")
+                return self.nth_weekday(self.period(), ORDINALS.get(token, -1), day)
+        if token in RELATIVE and self.peek() in WEEKDAYS:
+            return self.relative_weekday(RELATIVE[token], WEEKDAYS[self.take()])
+        self.fail(token, "a date, 'today', a quantity or a day selector")
+
+    def quantity(self) -> Tuple[str, int]:
+        token = self.take()
+        if not token.isdigit():
+            self.fail(token, "a number")
+        amount = int(token)
+        unit = self.take()
+        if unit == "business":
+            self.expect("day", "days")
+            return "business_days", amount
+        if unit not in UNITS:
+            self.fail(unit, "day, week, month, year or business day")
+        unit, factor = UNITS[unit]
+        return unit, amount * factor
+
+    def period(self) -> PeriodFn:
+        self.skip_article()
+        token = self.take()
+        if token in RELATIVE:
+            step = RELATIVE[token]
+            kind = self.expect("week", "month", "year")
+            if kind == "week":
+                def week(anchor: int, calendar: HolidayCalendar) -> Tuple[int, int]:
+                    monday = anchor - weekday(anchor) + 7 * step
+                    return monday, monday + 6
+                return week
+            if kind == "month":
+                def month(anchor: int, calendar: HolidayCalendar) -> Tuple[int, int]:
+                    year, month_number, _ = calendar_math.from_ordinal(anchor)
+                    year, month_number = divmod(year * 12 + month_number - 1 + step, 12)
+                    return _month_bounds(_check_year(year), month_number + 1)
+                return month
+
+            def year(anchor: int, calendar: HolidayCalendar) -> Tuple[int, int]:
+                return _year_bounds(_check_year(calendar_math.from_ordinal(anchor)[0] + step))
+            return year
+
+        if token in MONTHS:
+            month_number = MONTHS[token]
+            if self.peek() is not None and len(self.peek()) == 4 and self.peek().isdigit():
+                bounds = _month_bounds(self.year(self.take()), month_number)
+                return lambda anchor, calendar: bounds
+            return lambda anchor, calendar: _month_bounds(calendar_math.from_ordinal(anchor)[0], month_number)
+        if len(token) == 7 and token[4] == "-":
+            month_number = int(token[5:])
+            if not 1 <= month_number <= 12:
+                raise ExpressionSyntaxError(f"Invalid month {token!r}.")
+            bounds = _month_bounds(self.year(token[:4]), month_number)
+            return lambda anchor, calendar: bounds
+        if len(token) == 4 and token.isdigit():
+            bounds = _year_bounds(self.year(token))
+            return lambda anchor, calendar: bounds
+        self.fail(token, "a week, month or year")
+
+    def year(self, token: str) -> int:
+        year = int(token)
+        if not 1 <= year <= 9999:
+            raise ExpressionSyntaxError(f"Invalid year {token!r}.")
+        return year
+
+    # -- plan nodes ----------------------------------------------------
+
+    def shifted(self, base: DateFn, quantity: Tuple[str, int], sign: int) -> DateFn:
+        unit, amount = quantity
+        amount *= sign
+        if unit == "days":
+            return lambda anchor, calendar: base(anchor, calendar) + amount
+        if unit == "months":
+            policy = self.policy
+            return lambda anchor, calendar: calendar_math.add_months(base(anchor, calendar), amount, policy)
+        return lambda anchor, calendar: calendar.add_ordinal(base(anchor, calendar), amount)
+
+    @staticmethod
+    def day_of(period: PeriodFn, last: bool, business: bool) -> DateFn:
+        if not business:
+            return lambda anchor, calendar: period(anchor, calendar)[1 if last else 0]
+
+        def business_day(anchor: int, calendar: HolidayCalendar) -> int:
+            first, final = period(anchor, calendar)
+            # Primer día hábil desde el inicio del periodo, o último hasta su final
+            result = calendar.add_ordinal(final + 1, -1) if last else calendar.add_ordinal(first - 1, 1)
+            if not first <= result <= final:
+                raise ValueError("There is no business day in that period.")
+            return result
+        return business_day
+
+    @staticmethod
+    def nth_weekday(period: PeriodFn, nth: int, day: int) -> DateFn:
+        def select(anchor: int, calendar: HolidayCalendar) -> int:
+            first, final = period(anchor, calendar)
+            if nth < 0:
+                return final - (weekday(final) - day) % 7
+            result = first + (day - weekday(first)) % 7 + 7 * (nth - 1)
+            if result > final:
+                raise ValueError(f"There is no {_ORDINAL_NAMES[nth]} {DAYS_EN[day]} in that period.")
+            return result
+        return select
+
+    @staticmethod
+    def relative_weekday(step: int, day: int) -> DateFn:
+        if step > 0:
+            return lambda anchor, calendar: anchor + (day - weekday(anchor) - 1) % 7 + 1
+        if step < 0:
+            return lambda anchor, calendar: anchor - (weekday(anchor) - day - 1) % 7 - 1
+        return lambda anchor, calendar: anchor - weekday(anchor) + day
+
+
+@lru_cache(maxsize=settings.EXPRESSION_CACHE_SIZE)
+def _compile(normalized: str) -> Plan:
+    return Plan(normalized, _Parser(normalized.split(" ")).parse())
+
+
+@lru_cache(maxsize=settings.EXPRESSION_CACHE_SIZE)
+def compile_expression(text: str) -> Plan:
+    """
+    Return the plan of an expression. The exact text is looked up first, so
+    a repeated expression is not even tokenized; spellings that normalize to
+    the same words (case, spaces) share one plan.
+
+    Raises:
+        ExpressionSyntaxError: If the expression does not follow the grammar.
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        raise ExpressionSyntaxError("The expression is empty.")
+    return _compile(" ".join(tokens))
+
+
+def cache_info():
+    """Hits, misses and size of the compiled-plan cache (by exact expression text)."""
+    return compile_expression.cache_info()
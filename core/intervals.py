@@ -0,0 +1,256 @@
+"""
+Sort-then-sweep operations over sets of [start, end) intervals.
+
+Intervals are int64 seconds since 1970-01-01 (as parsed by
+core.vectorized), half-open: an interval that ends when another starts
+touches it but does not overlap it. Empty intervals (start == end) cover
+nothing and are dropped before any operation. Every operation sorts once
+(O(n log n)) and then sweeps with NumPy array operations, so memory stays
+at a few int64 arrays of the input size. NumPy is imported on first use.
+
+read_intervals() reads the request body: JSON {"starts": [...], "ends": [...]}
+or an NDJSON/CSV upload of {"start", "end"} records, which is read and
+parsed in chunks so only the parsed int64 columns are kept.
+"""
+from typing import TYPE_CHECKING, Dict, Iterator, List, Tuple
+
+import orjson
+from fastapi import HTTPException, Request
+
+from core import settings
+from core.streaming import CSV_MEDIA_TYPE, NDJSON_MEDIA_TYPE, iter_lines, iter_records
+
+if TYPE_CHECKING:
+    import numpy as np
+
+INVALID_TIMESTAMP_MSG = "Invalid datetime format. Expected 'YYYY-MM-DDTHH:MM:SS'."
+NEGATIVE_INTERVAL_MSG = "End datetime must be greater than or equal to start datetime"
+
+# Filas que se acumulan como texto antes de convertirlas a int64
+PARSE_CHUNK_ROWS = 65536
+# Errores de entrada que se devuelven como máximo en un 422
+MAX_REPORTED_ERRORS = 20
+
+
+def _too_many(count: int) -> HTTPException:
+    return HTTPException(
+        status_code=422,
+        detail=f"The request has {count} intervals; the maximum is {settings.INTERVALS_MAX_COUNT}."
+    )
+
+
+class _Collector:
+    """Parse text columns chunk by chunk into int64 arrays, keeping the first input errors."""
+
+    def __init__(self):
+        self.starts: List["np.ndarray"] = []
+        self.ends: List["np.ndarray"] = []
+        self.errors: List[Dict] = []
+
+    def add(self, starts: List[str], ends: List[str], locations: List[Tuple[list, list]]) -> None:
+        import numpy as np
+        from core import vectorized
+
+        start_seconds, start_valid = vectorized.parse_timestamps(starts)
+        end_seconds, end_valid = vectorized.parse_timestamps(ends)
+        negative = start_valid & end_valid & (end_seconds < start_seconds)
+        bad = ~(start_valid & end_valid) | negative
+        for index in np.flatnonzero(bad).tolist():
+            if len(self.errors) >= MAX_REPORTED_ERRORS:
+                break
+            start_loc, end_loc = locations[index]
+            if negative[index]:
+                self.errors.append({"loc": end_loc, "msg": NEGATIVE_INTERVAL_MSG, "type": "value_error"})
+                continue
+            if not start_valid[index]:
+                self.errors.append({"loc": start_loc, "msg": INVALID_TIMESTAMP_MSG, "type": "value_error"})
+            if not end_valid[index]:
+                self.errors.append({"loc": end_loc, "msg": INVALID_TIMESTAMP_MSG, "type": "value_error"})
+        if bad.any():
+            # Basta con que haya un error para rechazar la petición; no se guarda nada más
+            self.starts.clear()
+            self.ends.clear()
+        if not self.errors:
+            self.starts.append(start_seconds)
+            self.ends.append(end_seconds)
+
+    def result(self) -> Tuple["np.ndarray", "np.ndarray"]:
+        import numpy as np
+
+        if self.errors:
+            raise HTTPException(status_code=422, detail=self.errors)
+        if not self.starts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(self.starts), np.concatenate(self.ends)
+
+
+async def read_intervals(request: Request) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Read the intervals of the request body.
+
+    Returns:
+        (starts, ends): int64 seconds since the epoch, in input order.
+
+    Raises:
+        HTTPException: 422 if the body is malformed, a datetime is invalid, an
+        interval ends before it starts, or there are more than
+        DATETIME_INTERVALS_MAX_COUNT intervals.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    collector = _Collector()
+
+    if content_type in (NDJSON_MEDIA_TYPE, CSV_MEDIA_TYPE):
+        starts, ends, locations = [], [], []
+        count = 0
+        try:
+            async for line_number, record, error in iter_records(
+                    iter_lines(request.stream()), content_type == CSV_MEDIA_TYPE):
+                if error is not None:
+                    collector.errors.append({"loc": ["body", line_number], "msg": error, "type": "value_error"})
+                    if len(collector.errors) >= MAX_REPORTED_ERRORS:
+                        break
+                    continue
+                count += 1
+                if count > settings.INTERVALS_MAX_COUNT:
+                    raise _too_many(count)
+                starts.append(str(record.get("start", "")))
+                ends.append(str(record.get("end", "")))
+                locations.append((["body", line_number, "start"], ["body", line_number, "end"]))
+                if len(starts) == PARSE_CHUNK_ROWS:
+                    collector.add(starts, ends, locations)
+                    starts, ends, locations = [], [], []
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+        if starts:
+            collector.add(starts, ends, locations)
+        return collector.result()
+
+    try:
+        payload = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=422, detail="The body is not valid JSON.")
+    if (not isinstance(payload, dict) or not isinstance(payload.get("starts"), list)
+            or not isinstance(payload.get("ends"), list)):
+        raise HTTPException(status_code=422, detail="The body must be an object with 'starts' and 'ends' lists.")
+    starts, ends = payload["starts"], payload["ends"]
+    if len(starts) != len(ends):
+        raise HTTPException(status_code=422, detail="'starts' and 'ends' must have the same length.")
+    if len(starts) > settings.INTERVALS_MAX_COUNT:
+        raise _too_many(len(starts))
+
+    for offset in range(0, len(starts), PARSE_CHUNK_ROWS):
+        rows = range(offset, min(offset + PARSE_CHUNK_ROWS, len(starts)))
+        collector.add(
+            [str(starts[index]) for index in rows],
+            [str(ends[index]) for index in rows],
+            [(["body", "starts", index], ["body", "ends", index]) for index in rows]
+        )
+        if collector.errors:
+            break
+    return collector.result()
+
+
+def sort_intervals(starts: "np.ndarray", ends: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    Drop the empty intervals and sort the rest by start.
+
+    Returns:
+        (order, starts, ends): input positions of the sorted intervals and their bounds.
+    """
+    import numpy as np
+
+    order = np.flatnonzero(ends > starts)
+    order = order[np.argsort(starts[order], kind="stable")]
+    return order, starts[order], ends[order]
+
+
+def merge(starts: "np.ndarray", ends: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Union of intervals already sorted by start: overlapping and touching
+    intervals are joined. The result is sorted and disjoint.
+    """
+    import numpy as np
+
+    if starts.size == 0:
+        return starts, ends
+    reach = np.maximum.accumulate(ends)
+    # Empieza un grupo nuevo cuando el intervalo arranca después de todo lo anterior
+    first = np.flatnonzero(np.concatenate(([True], starts[1:] > reach[:-1])))
+    return starts[first], np.maximum.reduceat(ends, first)
+
+
+def gaps(merged_starts: "np.ndarray", merged_ends: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """Uncovered stretches between consecutive merged intervals."""
+    return merged_ends[:-1], merged_starts[1:]
+
+
+def depth_regions(starts: "np.ndarray", ends: "np.ndarray",
+                  min_depth: int = 2) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray", int]:
+    """
+    Regions covered by at least `min_depth` intervals at once.
+
+    Sweeps the sorted start (+1) and end (-1) events; at equal times ends
+    come first, so touching intervals never count as concurrent.
+
+    Returns:
+        (region_starts, region_ends, region_max_depth, max_depth): disjoint,
+        sorted regions, the highest depth reached inside each one, and the
+        highest depth overall.
+    """
+    import numpy as np
+
+    if starts.size == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=np.int32), 0
+
+    times = np.concatenate((starts, ends))
+    deltas = np.concatenate((np.ones(starts.size, dtype=np.int8), np.full(ends.size, -1, dtype=np.int8)))
+    order = np.lexsort((deltas, times))
+    times = times[order]
+    depth = np.cumsum(deltas[order], dtype=np.int32)
+    del order, deltas
+
+    # Tramo k: de times[k] a times[k + 1] con profundidad depth[k]
+    keep = np.flatnonzero((depth[:-1] >= min_depth) & (times[1:] > times[:-1]))
+    segment_starts = times[keep]
+    segment_ends = times[keep + 1]
+    segment_depth = depth[keep]
+    max_depth = int(depth.max())
+    if keep.size == 0:
+        return segment_starts, segment_ends, segment_depth, max_depth
+
+    # Tramos contiguos forman una sola región
+    first = np.flatnonzero(np.concatenate(([True], segment_starts[1:] != segment_ends[:-1])))
+    last = np.concatenate((first[1:], [keep.size])) - 1
+    return segment_starts[first], segment_ends[last], np.maximum.reduceat(segment_depth, first), max_depth
+
+
+def pair_counts(starts: "np.ndarray", ends: "np.ndarray") -> "np.ndarray":
+    """
+    For intervals sorted by start, the number of later intervals each one
+    overlaps: those that start before it ends.
+    """
+    import numpy as np
+
+    return np.searchsorted(starts, ends, side="left") - np.arange(1, starts.size + 1)
+
+
+def iter_pairs(order: "np.ndarray", starts: "np.ndarray", ends: "np.ndarray", counts: "np.ndarray",
+               chunk: int) -> Iterator[Tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]]:
+    """
+    Generate every overlapping pair, `chunk` pairs at a time, without ever
+    materializing the full list.
+
+    Yields:
+        (first, second, overlap_starts, overlap_ends): input positions of the
+        two intervals (first starts no later than second) and their overlap.
+    """
+    import numpy as np
+
+    cumulative = np.cumsum(counts)
+    total = int(cumulative[-1]) if cumulative.size else 0
+    for offset in range(0, total, chunk):
+        pair = np.arange(offset, min(offset + chunk, total))
+        left = np.searchsorted(cumulative, pair, side="right")
+        right = left + 1 + pair - (cumulative[left] - counts[left])
+        yield order[left], order[right], starts[right], np.minimum(ends[left], ends[right])
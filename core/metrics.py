@@ -0,0 +1,229 @@
+"""
+In-process request metrics, exported in the Prometheus text format.
+
+MetricsMiddleware records, per route: request counts by status, a latency
+histogram and the number of requests in flight. Handlers time their own
+parse and compute phases with PhaseTimer. Everything is kept in plain
+dictionaries; the event loop is single-threaded so no locking is needed.
+"""
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Logger que uvicorn ya muestra en consola
+logger = logging.getLogger("uvicorn.error")
+
+# Límites (en segundos) de los histogramas de latencia
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.total += value
+        self.count += 1
+        for index, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+    def lines(self, name: str, labels: str) -> List[str]:
+        result = []
+        cumulative = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            cumulative += count
+            result.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        result.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        result.append(f"{name}_sum{{{labels}}} {self.total}")
+        result.append(f"{name}_count{{{labels}}} {self.count}")
+        return result
+
+
+requests_total: Dict[Tuple[str, str, int], int] = defaultdict(int)
+request_duration: Dict[Tuple[str, str], Histogram] = defaultdict(Histogram)
+phase_duration: Dict[Tuple[str, str], Histogram] = defaultdict(Histogram)
+in_flight: Dict[str, int] = defaultdict(int)
+# Coalescencia (core.coalescing): respuestas copiadas de otra petición idéntica,
+# y grupos de peticiones individuales calculados en una sola llamada
+coalesced_total: Dict[str, int] = defaultdict(int)
+micro_batches_total: Dict[str, int] = defaultdict(int)
+micro_batch_items_total: Dict[str, int] = defaultdict(int)
+
+# Arranque en frío, medido desde que empieza la importación de main
+startup: Dict[str, Optional[float]] = {"started": None, "import_seconds": None, "first_request_seconds": None}
+
+
+def record_import(started: float) -> None:
+    """Record the import time of the app; `started` is a perf_counter() taken before importing."""
+    startup["started"] = started
+    startup["import_seconds"] = time.perf_counter() - started
+
+
+def _record_first_request() -> None:
+    startup["first_request_seconds"] = time.perf_counter() - startup["started"]
+    logger.info("Cold start: app imported in %.3fs, first request served after %.3fs",
+                startup["import_seconds"], startup["first_request_seconds"])
+
+
+class PhaseTimer:
+    """
+    Time consecutive phases of a handler.
+
+    Example:
+        phases = PhaseTimer("dayofweek")
+        date_obj = parse_date(date_str)
+        phases.mark("parse")
+        ...
+        phases.mark("compute")
+    """
+    __slots__ = ("endpoint", "last")
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.last = time.perf_counter()
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        phase_duration[(self.endpoint, phase)].observe(now - self.last)
+        self.last = now
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsMiddleware:
+    def __init__(self, app, routes: Iterable):
+        self.app = app
+        # Lista de rutas de la app: se lee al vuelo para incluir los routers añadidos después
+        self.routes = routes
+
+    def _route_label(self, scope) -> str:
+        route = scope.get("route")
+        if route is not None:
+            return route.path
+        # Respuestas servidas antes del router (p. ej. desde la caché)
+        path = scope["path"]
+        if any(getattr(route, "path", None) == path for route in self.routes):
+            return path
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        flight_key = scope["path"]
+        in_flight[flight_key] += 1
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_flight[flight_key] -= 1
+            if not in_flight[flight_key]:
+                del in_flight[flight_key]
+            route = self._route_label(scope)
+            requests_total[(route, method, status)] += 1
+            request_duration[(route, method)].observe(elapsed)
+            if startup["first_request_seconds"] is None and startup["started"] is not None:
+                _record_first_request()
+
+
+def render() -> str:
+    """Render every metric in the Prometheus text exposition format."""
+    from core import executor, expressions
+    from core.cache import response_cache
+
+    lines = [
+        "# HELP datetime_http_requests_total Requests handled, by route, method and status code.",
+        "# TYPE datetime_http_requests_total counter",
+    ]
+    for (route, method, status), count in sorted(requests_total.items()):
+        lines.append(f'datetime_http_requests_total{{route="{_escape(route)}",method="{method}",status="{status}"}} {count}')
+
+    lines += [
+        "# HELP datetime_http_errors_total Requests answered with a 4xx/5xx status, by route and status code.",
+        "# TYPE datetime_http_errors_total counter",
+    ]
+    for (route, method, status), count in sorted(requests_total.items()):
+        if status >= 400:
+            lines.append(f'datetime_http_errors_total{{route="{_escape(route)}",method="{method}",status="{status}"}} {count}')
+
+    lines += [
+        "# HELP datetime_http_request_duration_seconds Request latency, by route and method.",
+        "# TYPE datetime_http_request_duration_seconds histogram",
+    ]
+    for (route, method), histogram in sorted(request_duration.items()):
+        lines += histogram.lines("datetime_http_request_duration_seconds", f'route="{_escape(route)}",method="{method}"')
+
+    lines += [
+        "# HELP datetime_handler_phase_seconds Time spent in each handler phase (parse, compute).",
+        "# TYPE datetime_handler_phase_seconds histogram",
+    ]
+    for (endpoint, phase), histogram in sorted(phase_duration.items()):
+        lines += histogram.lines("datetime_handler_phase_seconds", f'endpoint="{endpoint}",phase="{phase}"')
+
+    lines += [
+        "# HELP datetime_http_requests_in_flight Requests currently being handled.",
+        "# TYPE datetime_http_requests_in_flight gauge",
+        f"datetime_http_requests_in_flight {sum(in_flight.values())}",
+        "# HELP datetime_cache_hits_total Response cache hits.",
+        "# TYPE datetime_cache_hits_total counter",
+        f"datetime_cache_hits_total {response_cache.hits}",
+        "# HELP datetime_cache_misses_total Response cache misses.",
+        "# TYPE datetime_cache_misses_total counter",
+        f"datetime_cache_misses_total {response_cache.misses}",
+        "# HELP datetime_expression_cache_hits_total Compiled date expressions reused from the plan cache.",
+        "# TYPE datetime_expression_cache_hits_total counter",
+        f"datetime_expression_cache_hits_total {expressions.cache_info().hits}",
+        "# HELP datetime_expression_cache_misses_total Date expressions compiled.",
+        "# TYPE datetime_expression_cache_misses_total counter",
+        f"datetime_expression_cache_misses_total {expressions.cache_info().misses}",
+        "# HELP datetime_bulk_jobs_pending Bulk jobs running or queued in the process pool.",
+        "# TYPE datetime_bulk_jobs_pending gauge",
+        f"datetime_bulk_jobs_pending {executor.pending_jobs()}",
+    ]
+    lines += [
+        "# HELP datetime_singleflight_coalesced_total Requests answered with the response of an identical request in flight.",
+        "# TYPE datetime_singleflight_coalesced_total counter",
+    ]
+    for route, count in sorted(coalesced_total.items()):
+        lines.append(f'datetime_singleflight_coalesced_total{{route="{_escape(route)}"}} {count}')
+    lines += [
+        "# HELP datetime_microbatch_batches_total Vectorized calls made by the micro-batcher.",
+        "# TYPE datetime_microbatch_batches_total counter",
+    ]
+    for endpoint, count in sorted(micro_batches_total.items()):
+        lines.append(f'datetime_microbatch_batches_total{{endpoint="{endpoint}"}} {count}')
+    lines += [
+        "# HELP datetime_microbatch_items_total Single-item requests computed by the micro-batcher.",
+        "# TYPE datetime_microbatch_items_total counter",
+    ]
+    for endpoint, count in sorted(micro_batch_items_total.items()):
+        lines.append(f'datetime_microbatch_items_total{{endpoint="{endpoint}"}} {count}')
+    for name, help_text in (("import_seconds", "Time to import the application."),
+                            ("first_request_seconds", "Time from the start of the import to the first request served.")):
+        if startup[name] is not None:
+            lines += [
+                f"# HELP datetime_startup_{name} {help_text}",
+                f"# TYPE datetime_startup_{name} gauge",
+                f"datetime_startup_{name} {startup[name]}",
+            ]
+    return "\n".join(lines) + "\n"
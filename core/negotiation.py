@@ -0,0 +1,105 @@
+"""
+Response wire format negotiation (JSON or MessagePack).
+
+NegotiationMiddleware reads the Accept header once per request and stores
+the chosen format in a context variable, and marks every response with
+'Vary: Accept'. NegotiatedResponse, the app's default response class, then
+renders the handler's result as JSON exactly as before, or as MessagePack
+when the client prefers 'application/msgpack' (or 'application/x-msgpack').
+Bulk and streaming modes pass the format on to the code that encodes their
+bodies. msgpack is imported on first use.
+"""
+from contextvars import ContextVar
+from typing import Any, Dict
+
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+JSON = "json"
+MSGPACK = "msgpack"
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+wire_format: ContextVar[str] = ContextVar("wire_format", default=JSON)
+
+
+def negotiate(accept: str) -> str:
+    """
+    Return MSGPACK if the Accept header ranks MessagePack above JSON, JSON otherwise.
+    """
+    if "msgpack" not in accept:
+        return JSON
+    msgpack_quality = json_quality = 0.0
+    for media_range in accept.split(","):
+        media_type, *params = (part.strip() for part in media_range.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type in MSGPACK_MEDIA_TYPES:
+            msgpack_quality = max(msgpack_quality, quality)
+        elif media_type in (JSON_MEDIA_TYPE, "application/*", "*/*"):
+            json_quality = max(json_quality, quality)
+    return MSGPACK if msgpack_quality > 0 and msgpack_quality >= json_quality else JSON
+
+
+def current() -> str:
+    """Wire format of the request being handled."""
+    return wire_format.get()
+
+
+def media_type(fmt: str) -> str:
+    return MSGPACK_MEDIA_TYPE if fmt == MSGPACK else JSON_MEDIA_TYPE
+
+
+def dumps(payload: Any, fmt: str) -> bytes:
+    """Encode a JSON-compatible payload in the given wire format."""
+    if fmt == MSGPACK:
+        import msgpack
+        return msgpack.packb(payload)
+    return orjson.dumps(payload)
+
+
+def encoded_response(body: bytes, fmt: str, headers: Dict[str, str] = None) -> Response:
+    """Response for a body already encoded with `dumps(payload, fmt)`."""
+    return Response(content=body, media_type=media_type(fmt), headers=headers)
+
+
+class NegotiatedResponse(ORJSONResponse):
+    """ORJSONResponse that switches to MessagePack when the request asked for it."""
+
+    def render(self, content: Any) -> bytes:
+        if wire_format.get() == MSGPACK:
+            self.media_type = MSGPACK_MEDIA_TYPE
+            return dumps(content, MSGPACK)
+        return super().render(content)
+
+
+class NegotiationMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = dict(scope["headers"]).get(b"accept", b"").decode("latin-1")
+        token = wire_format.set(negotiate(accept))
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"vary", b"Accept")]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            wire_format.reset(token)
@@ -0,0 +1,67 @@
+"""
+Pre-serialized OpenAPI document.
+
+`python -m core.openapi_static` builds the OpenAPI document of main:app and
+writes it to DATETIME_OPENAPI_STATIC_PATH. With DATETIME_OPENAPI_STATIC set,
+the API loads that file at startup and serves it as-is, so no instance ever
+walks the routes and their response examples to build the schema. Without
+it, the document is built on the first request and the serialized bytes
+are kept for every later one.
+
+Usage:
+    python -m core.openapi_static [--output PATH]
+"""
+import argparse
+import logging
+import os
+from typing import Optional
+
+import orjson
+
+from core import settings
+
+logger = logging.getLogger(__name__)
+
+_document: Optional[bytes] = None
+
+
+def render(app) -> bytes:
+    return orjson.dumps(app.openapi())
+
+
+def load(app) -> None:
+    """Load the prebuilt document (static mode), falling back to building it."""
+    global _document
+    try:
+        with open(settings.OPENAPI_STATIC_PATH, "rb") as file:
+            _document = file.read()
+    except FileNotFoundError:
+        logger.warning("%s not found; building the OpenAPI document at runtime. "
+                       "Run 'python -m core.openapi_static' during the build.", settings.OPENAPI_STATIC_PATH)
+        _document = render(app)
+
+
+def document(app) -> bytes:
+    """Return the serialized OpenAPI document, building it once if needed."""
+    global _document
+    if _document is None:
+        _document = render(app)
+    return _document
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", default=settings.OPENAPI_STATIC_PATH)
+    args = parser.parse_args()
+
+    from main import app
+
+    body = render(app)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "wb") as file:
+        file.write(body)
+    print(f"Wrote {args.output} ({len(body)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
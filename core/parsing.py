@@ -0,0 +1,70 @@
+from datetime import date, datetime, time
+from functools import lru_cache
+
+# Las mismas cadenas (fechas populares, zonas horarias de ejemplo) llegan una
+# y otra vez, así que los resultados se guardan en una caché LRU.
+PARSE_CACHE_SIZE = 4096
+
+
+def _is_digits(value: str) -> bool:
+    return value.isascii() and value.isdigit()
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_date(value: str) -> date:
+    """
+    Parse a strict 'YYYY-MM-DD' string.
+
+    Unlike strptime, unpadded fields such as '2024-5-8' are rejected.
+
+    Raises:
+        ValueError: If the value is not a valid 'YYYY-MM-DD' date.
+    """
+    if (len(value) != 10 or value[4] != "-" or value[7] != "-"
+            or not _is_digits(value[:4] + value[5:7] + value[8:])):
+        raise ValueError(f"Invalid date: {value!r}")
+    return date.fromisoformat(value)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_time(value: str) -> time:
+    """
+    Parse a strict 'HH:MM:SS' string.
+
+    Raises:
+        ValueError: If the value is not a valid 'HH:MM:SS' time.
+    """
+    if (len(value) != 8 or value[2] != ":" or value[5] != ":"
+            or not _is_digits(value[:2] + value[3:5] + value[6:])):
+        raise ValueError(f"Invalid time: {value!r}")
+    return time.fromisoformat(value)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_datetime(date_str: str, time_str: str = "00:00:00") -> datetime:
+    """
+    Parse a 'YYYY-MM-DD' date and a 'HH:MM:SS' time into a naive datetime.
+
+    Raises:
+        ValueError: If either part is invalid.
+    """
+    return datetime.combine(parse_date(date_str), parse_time(time_str))
+
+
+def parse_timestamp(value: str) -> datetime:
+    """
+    Parse a 'YYYY-MM-DDTHH:MM:SS' string into a naive datetime.
+
+    Raises:
+        ValueError: If the value is not a valid timestamp.
+    """
+    if len(value) != 19 or value[10] != "T":
+        raise ValueError(f"Invalid timestamp: {value!r}")
+    return parse_datetime(value[:10], value[11:])
+
+
+def clear_caches() -> None:
+    """Empty the parse caches (used by the benchmarks)."""
+    parse_date.cache_clear()
+    parse_time.cache_clear()
+    parse_datetime.cache_clear()
@@ -0,0 +1,68 @@
+"""
+Sampling profiler for hot-path analysis, switched on and off at runtime.
+
+While running, a background thread takes the stack of the event-loop
+thread every `interval` seconds and counts identical stacks. The result is
+returned in the "collapsed stack" format (one 'frame;frame;frame count'
+line per stack) understood by flame graph tools.
+"""
+import sys
+import threading
+import time
+from collections import Counter
+from typing import List, Optional, Tuple
+
+MAX_DEPTH = 64
+
+
+class SamplingProfiler:
+    def __init__(self):
+        self.samples: Counter = Counter()
+        self.interval = 0.005
+        self.started_at: Optional[float] = None
+        self._target: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, interval: float) -> None:
+        """Start sampling the calling thread (the event loop) every `interval` seconds."""
+        if self.running:
+            return
+        self.samples.clear()
+        self.interval = interval
+        self.started_at = time.time()
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                code = frame.f_code
+                stack.append(f"{code.co_filename}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def top(self, limit: int) -> List[Tuple[str, int]]:
+        return self.samples.most_common(limit)
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+profiler = SamplingProfiler()
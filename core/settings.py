@@ -0,0 +1,104 @@
+"""
+Runtime settings, read once from environment variables.
+
+Every value has a default so the API runs without any configuration.
+"""
+import os
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+def _env_str(name: str, default: str) -> str:
+    return os.environ.get(name) or default
+
+
+# Servir el documento OpenAPI generado en el build (python -m core.openapi_static)
+# en lugar de construirlo en el primer acceso
+OPENAPI_STATIC = _env_bool("DATETIME_OPENAPI_STATIC", False)
+OPENAPI_STATIC_PATH = _env_str(
+    "DATETIME_OPENAPI_STATIC_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "build", "openapi.json")
+)
+
+# Cargar todas las zonas IANA al arrancar en lugar de hacerlo bajo demanda
+PRELOAD_TIMEZONES = _env_bool("DATETIME_PRELOAD_TIMEZONES", False)
+
+# Longitud máxima de una línea en los endpoints de streaming (NDJSON/CSV)
+STREAM_MAX_LINE_BYTES = _env_int("DATETIME_STREAM_MAX_LINE_BYTES", 64 * 1024)
+
+# Rango de años cubierto por las tablas de transiciones de offset UTC
+TRANSITIONS_FIRST_YEAR = _env_int("DATETIME_TRANSITIONS_FIRST_YEAR", 1900)
+TRANSITIONS_LAST_YEAR = _env_int("DATETIME_TRANSITIONS_LAST_YEAR", 2100)
+
+# Rango de años precalculado por el índice de calendario
+CALENDAR_FIRST_YEAR = _env_int("DATETIME_CALENDAR_FIRST_YEAR", 1900)
+CALENDAR_LAST_YEAR = _env_int("DATETIME_CALENDAR_LAST_YEAR", 2200)
+
+# Número máximo de fechas devueltas por una consulta de rango
+CALENDAR_MAX_RESULTS = _env_int("DATETIME_CALENDAR_MAX_RESULTS", 10000)
+
+# Número máximo de elementos de una serie generada por /series
+SERIES_MAX_COUNT = _env_int("DATETIME_SERIES_MAX_COUNT", 1000000)
+
+# Número máximo de intervalos por petición en /intervals
+INTERVALS_MAX_COUNT = _env_int("DATETIME_INTERVALS_MAX_COUNT", 1000000)
+
+# Número máximo de pares solapados que puede devolver /intervals/overlaps?pairs=true
+INTERVALS_MAX_PAIRS = _env_int("DATETIME_INTERVALS_MAX_PAIRS", 1000000)
+
+# Qué hacer al sumar meses/años cuando el día no existe en el mes de destino
+# ('clamp' = último día del mes, 'overflow' = pasar al mes siguiente, 'error' = rechazar)
+MONTH_OVERFLOW_POLICY = _env_str("DATETIME_MONTH_OVERFLOW_POLICY", "clamp")
+
+# Expresiones compiladas que se guardan para /evaluate
+EXPRESSION_CACHE_SIZE = _env_int("DATETIME_EXPRESSION_CACHE_SIZE", 1024)
+
+# Carpeta con los calendarios de feriados (<nombre>.txt, una fecha por línea)
+HOLIDAY_CALENDAR_DIR = _env_str(
+    "DATETIME_HOLIDAY_CALENDAR_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "holidays")
+)
+
+# Carpeta con los grupos de zonas horarias de /convert/multi (<nombre>.txt, una zona por línea)
+ZONE_GROUP_DIR = _env_str(
+    "DATETIME_ZONE_GROUP_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "zone_groups")
+)
+
+# Caché de respuestas de los endpoints deterministas
+CACHE_ENABLED = _env_bool("DATETIME_CACHE_ENABLED", True)
+CACHE_MAX_ENTRIES = _env_int("DATETIME_CACHE_MAX_ENTRIES", 10000)
+CACHE_TTL_SECONDS = _env_int("DATETIME_CACHE_TTL_SECONDS", 3600)
+# Backend alternativo: 'memory' (por defecto, memoria del proceso), 'dict' (sustituto
+# local de un almacén externo) o 'modulo:Clase'
+CACHE_BACKEND = _env_str("DATETIME_CACHE_BACKEND", "")
+
+# Peticiones GET idénticas y simultáneas comparten una sola ejecución
+SINGLE_FLIGHT_ENABLED = _env_bool("DATETIME_SINGLE_FLIGHT_ENABLED", True)
+# Ventana (ms) en la que las peticiones individuales de /convert y /difference se
+# agrupan en un solo cálculo vectorizado (0 = desactivado), y tamaño máximo del grupo
+MICRO_BATCH_WINDOW_MS = _env_float("DATETIME_MICRO_BATCH_WINDOW_MS", 0.0)
+MICRO_BATCH_MAX_SIZE = _env_int("DATETIME_MICRO_BATCH_MAX_SIZE", 256)
+
+# Pool de procesos para las operaciones masivas (0 = ejecutar en un hilo del proceso)
+BULK_WORKERS = _env_int("DATETIME_BULK_WORKERS", os.cpu_count() or 1)
+# Trabajos masivos que pueden esperar en cola antes de responder 503
+BULK_QUEUE_DEPTH = _env_int("DATETIME_BULK_QUEUE_DEPTH", 16)
+
+# Permitir activar el perfilador por muestreo desde /metrics/profiler
+PROFILER_ALLOWED = _env_bool("DATETIME_PROFILER_ALLOWED", False)
@@ -0,0 +1,175 @@
+"""
+Row-by-row NDJSON/CSV processing for the /<endpoint>/stream routes.
+
+The request body is read chunk by chunk, split into lines, turned into
+records and passed to the regular endpoint function; every result is
+written back immediately as one NDJSON line (or one MessagePack object,
+when the client negotiated it). Nothing but the current line is held in
+memory, so memory use does not grow with the size of the upload.
+"""
+import csv
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+import orjson
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError, validate_call
+
+from core import negotiation, settings
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+
+logger = logging.getLogger("uvicorn.error")
+
+# Documentación OpenAPI del cuerpo aceptado por los endpoints de streaming
+STREAM_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            NDJSON_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+            CSV_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
+
+STREAM_RESPONSES = {
+    200: {
+        "description": "One NDJSON line per input row, in input order. Rows that fail "
+                       "are reported as {\"line\": n, \"error\": {\"status_code\", \"detail\"}}. "
+                       "With 'Accept: application/msgpack', a sequence of MessagePack objects instead.",
+        "content": {NDJSON_MEDIA_TYPE: {}, negotiation.MSGPACK_MEDIA_TYPE: {}},
+    }
+}
+
+
+class RowStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that does not listen for disconnects.
+
+    The stock implementation reads `receive` concurrently to detect client
+    disconnects, which would steal chunks of the request body that is still
+    being consumed. Reading the body already raises on disconnect.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a stream of byte chunks into decoded lines.
+
+    Raises:
+        ValueError: If a line exceeds DATETIME_STREAM_MAX_LINE_BYTES.
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                break
+            yield buffer[start:end].decode("utf-8").rstrip("\r")
+            start = end + 1
+        buffer = buffer[start:]
+        if len(buffer) > settings.STREAM_MAX_LINE_BYTES:
+            raise ValueError("Line too long.")
+    if buffer:
+        yield buffer.decode("utf-8").rstrip("\r")
+
+
+async def iter_records(
+    lines: AsyncIterator[str],
+    csv_mode: bool
+) -> AsyncIterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """
+    Turn NDJSON or CSV lines into records.
+
+    CSV input must start with a header row naming the fields.
+
+    Yields:
+        (line_number, record, error): `record` is None when the line could
+        not be decoded, and `error` then holds the reason.
+    """
+    header = None
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+
+        if csv_mode:
+            values = next(csv.reader([line]))
+            if header is None:
+                header = values
+                continue
+            if len(values) != len(header):
+                yield line_number, None, f"Expected {len(header)} CSV columns, got {len(values)}."
+                continue
+            yield line_number, dict(zip(header, values)), None
+        else:
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                yield line_number, None, "Invalid JSON line."
+                continue
+            if not isinstance(record, dict):
+                yield line_number, None, "Each line must be a JSON object."
+                continue
+            yield line_number, record, None
+
+
+def dumps_row(payload: Dict, wire_format: str = negotiation.JSON) -> bytes:
+    """Encode one result row: an NDJSON line, or a MessagePack object."""
+    if wire_format == negotiation.MSGPACK:
+        return negotiation.dumps(payload, wire_format)
+    return orjson.dumps(payload, option=orjson.OPT_APPEND_NEWLINE)
+
+
+def row_media_type(wire_format: str) -> str:
+    return negotiation.MSGPACK_MEDIA_TYPE if wire_format == negotiation.MSGPACK else NDJSON_MEDIA_TYPE
+
+
+def stream_rows(request: Request, handler: Callable[..., Awaitable[Dict]]) -> StreamingResponse:
+    """
+    Apply an endpoint function to every row of the request body.
+
+    Each record's fields are validated against the handler's signature, the
+    same way query parameters are, and handler errors (HTTPException, or a
+    500 for any other exception) are reported per line instead of ending
+    the stream.
+    """
+    csv_mode = request.headers.get("content-type", "").startswith(CSV_MEDIA_TYPE)
+    validated_handler = validate_call(handler)
+    wire_format = negotiation.current()
+
+    def _dumps(payload: Dict) -> bytes:
+        return dumps_row(payload, wire_format)
+
+    async def results() -> AsyncIterator[bytes]:
+        try:
+            async for line_number, record, error in iter_records(iter_lines(request.stream()), csv_mode):
+                if error is not None:
+                    yield _dumps({"line": line_number, "error": {"status_code": 422, "detail": error}})
+                    continue
+                try:
+                    yield _dumps(await validated_handler(**record))
+                except HTTPException as exc:
+                    yield _dumps({"line": line_number, "error": {"status_code": exc.status_code, "detail": exc.detail}})
+                except ValidationError as exc:
+                    detail = [
+                        {"loc": ["body", *error["loc"]], "msg": error["msg"], "type": error["type"]}
+                        for error in exc.errors(include_url=False)
+                    ]
+                    yield _dumps({"line": line_number, "error": {"status_code": 422, "detail": detail}})
+                except Exception:
+                    # Un fallo inesperado en una fila no debe cortar el resto del stream
+                    logger.exception("Unhandled error in line %d of %s", line_number, request.url.path)
+                    yield _dumps({"line": line_number, "error": {"status_code": 500, "detail": "Internal Server Error"}})
+        except ValueError as exc:
+            yield _dumps({"error": {"status_code": 422, "detail": str(exc)}})
+
+    return RowStreamingResponse(results(), media_type=row_media_type(wire_format))
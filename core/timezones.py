@@ -0,0 +1,95 @@
+"""
+Registry of IANA time zones.
+
+Zone names are checked against a set computed once from the tz database, so
+invalid names are rejected without touching the filesystem. ZoneInfo objects
+are memoized on first use (or all at startup with DATETIME_PRELOAD_TIMEZONES).
+
+Named zone groups are read from DATETIME_ZONE_GROUP_DIR, one '<name>.txt'
+file per group with one zone name per line ('#' starts a comment).
+"""
+import os
+from functools import lru_cache
+from typing import Dict, FrozenSet, Tuple
+from zoneinfo import ZoneInfo, available_timezones
+
+from core import settings
+
+_zones: Dict[str, ZoneInfo] = {}
+
+
+@lru_cache(maxsize=None)
+def timezone_names() -> FrozenSet[str]:
+    """Return the set of valid IANA zone names."""
+    return frozenset(available_timezones())
+
+
+@lru_cache(maxsize=None)
+def sorted_timezone_names() -> Tuple[str, ...]:
+    """Return the valid IANA zone names in alphabetical order."""
+    return tuple(sorted(timezone_names()))
+
+
+def is_valid_timezone(name: str) -> bool:
+    return name in _zones or name in timezone_names()
+
+
+def get_zone(name: str) -> ZoneInfo:
+    """
+    Return the memoized ZoneInfo for an IANA zone name.
+
+    Raises:
+        ValueError: If the name is not a known IANA zone.
+    """
+    zone = _zones.get(name)
+    if zone is None:
+        if name not in timezone_names():
+            raise ValueError(f"Unknown time zone: {name!r}")
+        zone = _zones[name] = ZoneInfo(name)
+    return zone
+
+
+def preload() -> None:
+    """Build the ZoneInfo object for every known zone."""
+    for name in sorted_timezone_names():
+        get_zone(name)
+
+
+@lru_cache(maxsize=None)
+def available_zone_groups() -> FrozenSet[str]:
+    """
+    Names of the zone groups found in DATETIME_ZONE_GROUP_DIR.
+
+    The directory is listed once per process, like the files are read once;
+    new files are picked up on restart.
+    """
+    try:
+        files = os.listdir(settings.ZONE_GROUP_DIR)
+    except FileNotFoundError:
+        return frozenset()
+    return frozenset(name[:-4] for name in files if name.endswith(".txt"))
+
+
+@lru_cache(maxsize=None)
+def _load_zone_group(name: str) -> Tuple[str, ...]:
+    zones = []
+    with open(os.path.join(settings.ZONE_GROUP_DIR, f"{name}.txt"), encoding="utf-8") as handle:
+        for line in handle:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                if not is_valid_timezone(line):
+                    raise ValueError(f"Unknown time zone {line!r} in zone group {name!r}")
+                zones.append(line)
+    return tuple(dict.fromkeys(zones))
+
+
+def get_zone_group(name: str) -> Tuple[str, ...]:
+    """
+    Return the zone names of a named group, in file order.
+
+    Raises:
+        ValueError: If there is no such group, or it lists an unknown zone.
+    """
+    if name not in available_zone_groups():
+        raise ValueError(f"Unknown zone group: {name!r}")
+    return _load_zone_group(name)
@@ -0,0 +1,163 @@
+"""
+Precomputed UTC-offset transition tables for IANA time zones.
+
+For each zone the table holds, in UTC seconds since the epoch, every
+instant at which the offset (or its abbreviation) changes between
+DATETIME_TRANSITIONS_FIRST_YEAR and DATETIME_TRANSITIONS_LAST_YEAR, next to
+the offset that starts there. The offset of an instant is then one bisect
+into a sorted array, and so is the UTC instant of a local wall time,
+including the times repeated (fold) or skipped (gap) by a DST change.
+Instants outside the covered years are resolved with ZoneInfo.
+
+Tables are built on first use by sampling the zone once a week and
+bisecting every change down to the second. The closest consecutive changes
+in the tz database are about four days apart, and several changes inside
+one sampling step are still found one by one, so weekly sampling gives the
+same tables as sampling every day at a seventh of the cost.
+"""
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Tuple
+from zoneinfo import ZoneInfo
+
+from core import settings
+from core.timezones import get_zone
+
+EPOCH = datetime(1970, 1, 1)
+SAMPLE_STEP = 7 * 86400
+
+# Tipos de hora local devueltos por ZoneTable.resolve
+VALID = "valid"
+AMBIGUOUS = "ambiguous"
+NONEXISTENT = "nonexistent"
+KINDS = (VALID, AMBIGUOUS, NONEXISTENT)
+
+OUT_OF_RANGE_MSG = "Datetime outside the supported range (years 1 to 9999)."
+
+
+def _seconds(value: datetime) -> int:
+    return (value - EPOCH) // timedelta(seconds=1)
+
+
+def format_offset(offset: int) -> str:
+    """Render an offset in seconds as '+HH:MM' (or '+HH:MM:SS' if it has seconds)."""
+    sign = "-" if offset < 0 else "+"
+    minutes, seconds = divmod(abs(offset), 60)
+    hours, minutes = divmod(minutes, 60)
+    if seconds:
+        return f"{sign}{hours:02d}:{minutes:02d}:{seconds:02d}"
+    return f"{sign}{hours:02d}:{minutes:02d}"
+
+
+class ZoneTable:
+    def __init__(self, name: str, zone: ZoneInfo, first_year: int, last_year: int):
+        self.name = name
+        self.zone = zone
+        self.lower = _seconds(datetime(first_year, 1, 1))
+        self.upper = _seconds(datetime(last_year + 1, 1, 1))
+
+        starts = [self.lower]
+        states = [self._state(self.lower)]
+        previous = self.lower
+        for sample in range(self.lower + SAMPLE_STEP, self.upper + SAMPLE_STEP, SAMPLE_STEP):
+            sample = min(sample, self.upper)
+            state = self._state(sample)
+            # Puede haber más de un cambio entre dos muestras: se buscan uno a uno
+            while state != states[-1]:
+                low, high = previous, sample
+                while high - low > 1:
+                    middle = (low + high) // 2
+                    if self._state(middle) == states[-1]:
+                        low = middle
+                    else:
+                        high = middle
+                starts.append(high)
+                states.append(self._state(high))
+                previous = high
+            previous = sample
+
+        self.starts = array("q", starts)
+        self.offsets = array("q", [offset for offset, _ in states])
+        self.abbreviations = tuple(abbreviation for _, abbreviation in states)
+        # Hora local en la que empieza cada tramo; ordenada porque los tramos
+        # duran mucho más que cualquier salto de offset
+        self.local_starts = array("q", [start + offset for start, offset in zip(self.starts, self.offsets)])
+        self.local_upper = self.upper + self.offsets[-1]
+
+    def _state(self, utc_seconds: int) -> Tuple[int, str]:
+        try:
+            local = self.zone.fromutc((EPOCH + timedelta(seconds=utc_seconds)).replace(tzinfo=self.zone))
+        except OverflowError:
+            # El instante UTC o su hora local caen fuera de los años 1-9999 de datetime
+            raise ValueError(OUT_OF_RANGE_MSG)
+        return local.utcoffset() // timedelta(seconds=1), local.tzname()
+
+    def index_at(self, utc_seconds: int) -> int:
+        """Index of the transition in effect at `utc_seconds` (inside the covered range)."""
+        return bisect_right(self.starts, utc_seconds) - 1
+
+    def offset_at(self, utc_seconds: int) -> Tuple[int, str]:
+        """
+        Return (offset in seconds, abbreviation) in effect at a UTC instant.
+
+        Raises:
+            ValueError: If the instant or its local time is outside years 1 to 9999.
+        """
+        if self.lower <= utc_seconds < self.upper:
+            index = self.index_at(utc_seconds)
+            return self.offsets[index], self.abbreviations[index]
+        return self._state(utc_seconds)
+
+    def resolve(self, local_seconds: int, fold: int = 0) -> Tuple[int, str]:
+        """
+        Return (utc_seconds, kind) for a local wall time given in seconds
+        since 1970-01-01T00:00:00 local.
+
+        kind is VALID, AMBIGUOUS (repeated by a backward change) or
+        NONEXISTENT (skipped by a forward change). As in PEP 495, fold=0
+        uses the offset in effect before the change and fold=1 the one after.
+
+        Raises:
+            ValueError: If the local time is outside years 1 to 9999.
+        """
+        if not self.local_starts[0] <= local_seconds < self.local_upper:
+            return self._resolve_zoneinfo(local_seconds, fold)
+
+        index = bisect_right(self.local_starts, local_seconds) - 1
+        offset = self.offsets[index]
+        if index > 0 and local_seconds < self.starts[index] + self.offsets[index - 1]:
+            # Hora repetida: tras retrasar el reloj, también existe con el offset anterior
+            before = self.offsets[index - 1]
+            return local_seconds - (before if fold == 0 else offset), AMBIGUOUS
+        if index + 1 < len(self.starts) and local_seconds - offset >= self.starts[index + 1]:
+            # Hora saltada: cae entre el final de este tramo y el inicio local del siguiente
+            after = self.offsets[index + 1]
+            return local_seconds - (offset if fold == 0 else after), NONEXISTENT
+        return local_seconds - offset, VALID
+
+    def _resolve_zoneinfo(self, local_seconds: int, fold: int) -> Tuple[int, str]:
+        try:
+            naive = EPOCH + timedelta(seconds=local_seconds)
+        except OverflowError:
+            raise ValueError(OUT_OF_RANGE_MSG)
+        first = naive.replace(tzinfo=self.zone, fold=0).utcoffset()
+        second = naive.replace(tzinfo=self.zone, fold=1).utcoffset()
+        offset = (first if fold == 0 else second) // timedelta(seconds=1)
+        kind = VALID
+        if first != second:
+            # Con un salto hacia delante el offset de fold=0 es el menor
+            kind = AMBIGUOUS if first > second else NONEXISTENT
+        return local_seconds - offset, kind
+
+
+@lru_cache(maxsize=None)
+def get_table(name: str) -> ZoneTable:
+    """
+    Return the transition table of an IANA zone, building it on first use.
+
+    Raises:
+        ValueError: If the name is not a known IANA zone.
+    """
+    return ZoneTable(name, get_zone(name), settings.TRANSITIONS_FIRST_YEAR, settings.TRANSITIONS_LAST_YEAR)
@@ -0,0 +1,174 @@
+"""
+NumPy kernels for bulk date/time work.
+
+Timestamps are handled as int64 seconds since 1970-01-01 so every step
+(parsing, validation, subtraction, breakdown) runs as an array operation.
+"""
+from typing import Sequence, Tuple
+
+import numpy as np
+
+TIMESTAMP_LENGTH = 19  # 'YYYY-MM-DDTHH:MM:SS'
+_DIGITS = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]
+_SEPARATORS = {4: "-", 7: "-", 10: "T", 13: ":", 16: ":"}
+_PLACEHOLDER = "1970-01-01T00:00:00"
+
+# A partir de este valor el redondeo del float de Python puede diferir del
+# redondeo exacto (total_minutes con más de ~2000 años); esas filas se
+# redondean una a una con round() para dar exactamente el mismo resultado.
+_EXACT_ROUNDING_LIMIT = 2 ** 36
+
+
+def parse_timestamps(values: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parse strict 'YYYY-MM-DDTHH:MM:SS' strings.
+
+    Returns:
+        (seconds, valid): int64 seconds since the epoch and a boolean mask of
+        the rows that parsed. Invalid rows hold 0 in `seconds`.
+    """
+    raw = np.asarray(values, dtype=str)
+    if raw.size == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+
+    valid = np.char.str_len(raw) == TIMESTAMP_LENGTH
+    text = np.where(valid, raw, _PLACEHOLDER).astype(f"U{TIMESTAMP_LENGTH}")
+    codes = text.view(np.uint32).reshape(-1, TIMESTAMP_LENGTH)
+
+    for position, char in _SEPARATORS.items():
+        valid &= codes[:, position] == ord(char)
+    digits = codes[:, _DIGITS].astype(np.int64) - ord("0")
+    valid &= ((digits >= 0) & (digits <= 9)).all(axis=1)
+    digits[~valid] = 0
+
+    year = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + digits[:, 3]
+    month = digits[:, 4] * 10 + digits[:, 5]
+    day = digits[:, 6] * 10 + digits[:, 7]
+    hour = digits[:, 8] * 10 + digits[:, 9]
+    minute = digits[:, 10] * 10 + digits[:, 11]
+    second = digits[:, 12] * 10 + digits[:, 13]
+
+    valid &= (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1)
+    valid &= (hour < 24) & (minute < 60) & (second < 60)
+
+    # Filas inválidas -> 1970-01-01 para que el cálculo de meses no falle
+    year = np.where(valid, year, 1970)
+    month = np.where(valid, month, 1)
+    day = np.where(valid, day, 1)
+
+    month_start = ((year - 1970) * 12 + (month - 1)).astype("datetime64[M]")
+    first_day = month_start.astype("datetime64[D]")
+    days_in_month = ((month_start + 1).astype("datetime64[D]") - first_day).astype(np.int64)
+    valid &= day <= days_in_month
+
+    seconds = (first_day.astype(np.int64) + day - 1) * 86400 + hour * 3600 + minute * 60 + second
+    seconds[~valid] = 0
+    return seconds, valid
+
+
+def round_ratio(numerator: np.ndarray, divisor: int, ndigits: int = 6) -> np.ndarray:
+    """
+    Compute round(numerator / divisor, ndigits) for an int64 array, giving
+    exactly the floats Python's round() gives for the same values.
+    """
+    scale = 10 ** ndigits
+    quotient, remainder = np.divmod(numerator * scale, divisor)
+    quotient += 2 * remainder > divisor
+    result = quotient / scale
+
+    fallback = (2 * remainder == divisor) | (np.abs(numerator) >= _EXACT_ROUNDING_LIMIT)
+    for index in np.flatnonzero(fallback):
+        result[index] = round(int(numerator[index]) / divisor, ndigits)
+    return result
+
+
+def breakdown(total_seconds: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Split non-negative second counts into (days, hours, minutes, seconds)."""
+    days, remainder = np.divmod(total_seconds, 86400)
+    hours, remainder = np.divmod(remainder, 3600)
+    minutes, seconds = np.divmod(remainder, 60)
+    return days, hours, minutes, seconds
+
+
+def localize(local_seconds: np.ndarray, table, fold: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Resolve local wall times (seconds since 1970-01-01T00:00:00 local) in the
+    zone of a core.transitions.ZoneTable, with the same fold/gap rules as
+    ZoneTable.resolve.
+
+    Returns:
+        (utc_seconds, offsets, kinds): the UTC instants, the offset in effect
+        at each instant, and the index into core.transitions.KINDS of each
+        wall time (valid, ambiguous or nonexistent).
+    """
+    from core.transitions import KINDS
+
+    starts = np.asarray(table.starts, dtype=np.int64)
+    offsets = np.asarray(table.offsets, dtype=np.int64)
+    local_starts = np.asarray(table.local_starts, dtype=np.int64)
+    last = len(starts) - 1
+
+    index = np.clip(np.searchsorted(local_starts, local_seconds, side="right") - 1, 0, last)
+    previous = np.maximum(index - 1, 0)
+    following = np.minimum(index + 1, last)
+    offset = offsets[index]
+
+    ambiguous = (index > 0) & (local_seconds < starts[index] + offsets[previous])
+    nonexistent = ~ambiguous & (index < last) & (local_seconds - offset >= starts[following])
+    if fold == 0:
+        offset = np.where(ambiguous, offsets[previous], offset)
+    else:
+        offset = np.where(nonexistent, offsets[following], offset)
+    utc_seconds = local_seconds - offset
+    kinds = ambiguous.astype(np.int8) + nonexistent.astype(np.int8) * 2
+
+    # Fuera de los años de la tabla se resuelve fila a fila con ZoneInfo; si
+    # ni ZoneInfo puede (más allá de los años 1-9999) se queda el offset del
+    # extremo más cercano de la tabla
+    outside = (local_seconds < local_starts[0]) | (local_seconds >= table.local_upper)
+    for row in np.flatnonzero(outside).tolist():
+        try:
+            utc, kind = table.resolve(int(local_seconds[row]), fold)
+        except ValueError:
+            continue
+        utc_seconds[row] = utc
+        kinds[row] = KINDS.index(kind)
+
+    # Offset en vigor en cada instante UTC (para la hora local normalizada)
+    return utc_seconds, offsets_at(utc_seconds, table), kinds
+
+
+def offsets_at(utc_seconds: np.ndarray, table) -> np.ndarray:
+    """
+    UTC offset, in seconds, in effect at each UTC instant in a ZoneTable's zone.
+    Instants that ZoneInfo cannot represent get the offset of the nearest end
+    of the table.
+    """
+    starts = np.asarray(table.starts, dtype=np.int64)
+    offsets = np.asarray(table.offsets, dtype=np.int64)
+    index = np.clip(np.searchsorted(starts, utc_seconds, side="right") - 1, 0, len(starts) - 1)
+    result = offsets[index]
+
+    outside = (utc_seconds < table.lower) | (utc_seconds >= table.upper)
+    for row in np.flatnonzero(outside).tolist():
+        try:
+            result[row] = table.offset_at(int(utc_seconds[row]))[0]
+        except ValueError:
+            # Fuera de los años 1-9999: offset del extremo más cercano de la tabla
+            pass
+    return result
+
+
+def iso_weeks(days: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    ISO 8601 calendar of dates given as days since 1970-01-01.
+
+    Returns:
+        (weekday, iso_year, iso_week): weekday is 0=Monday ... 6=Sunday.
+    """
+    weekday = (days + 3) % 7  # 1970-01-01 fue jueves
+    # La semana ISO pertenece al año de su jueves
+    thursday = (days - weekday + 3).astype("datetime64[D]")
+    iso_year = thursday.astype("datetime64[Y]")
+    iso_week = (thursday - iso_year.astype("datetime64[D]")).astype(np.int64) // 7 + 1
+    return weekday, iso_year.astype(np.int64) + 1970, iso_week
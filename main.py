@@ -1,6 +1,31 @@
-from fastapi.openapi.docs import get_swagger_ui_html
-from fastapi import FastAPI
-from api import addsubtract, convert, current, dayofweek, difference, weeknumber
+import time
+IMPORT_STARTED = time.perf_counter()
+
+from contextlib import asynccontextmanager
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
+from fastapi import FastAPI, Response
+from fastapi.responses import HTMLResponse
+from api import addsubtract, cachestats, calendarrange, convert, current, dayofweek, difference, evaluate, intervals, metrics, series, timezones, weeknumber
+from core import settings
+from core import executor
+from core import metrics as metrics_registry
+from core import openapi_static
+from core.cache import ResponseCacheMiddleware, response_cache
+from core.coalescing import SingleFlightMiddleware
+from core.metrics import MetricsMiddleware
+from core.negotiation import NegotiatedResponse, NegotiationMiddleware
+from core import timezones as timezone_registry
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Arranque: zonas horarias precargadas y esquema OpenAPI ya serializado
+    if settings.PRELOAD_TIMEZONES:
+        timezone_registry.preload()
+    if settings.OPENAPI_STATIC:
+        openapi_static.load(app)
+    yield
+    # Parada: se cierra el pool de procesos de las peticiones masivas
+    executor.shutdown()
 
 app = FastAPI(
     title="DATETIME",
@@ -9,14 +34,51 @@ app = FastAPI(
     This API allows you to convert dates to different formats, 
     calculate differences between dates, obtain detailed time 
     zone information, and much more.''',
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=NegotiatedResponse,
+    # El esquema y las páginas de documentación se sirven ya serializados (ver más abajo)
+    openapi_url=None,
+    docs_url=None,
+    redoc_url=None,
+    lifespan=lifespan
 )
 
+# Endpoints que son funciones puras de sus parámetros
+DETERMINISTIC_PATHS = ["/addsubtract/", "/convert", "/convert/multi", "/dayofweek/", "/difference/", "/weeknumber_iso/"]
+
+# Las peticiones idénticas simultáneas que no están en caché se calculan una sola vez
+app.add_middleware(SingleFlightMiddleware, paths=DETERMINISTIC_PATHS)
+
+# Caché delante de esos endpoints
+app.add_middleware(ResponseCacheMiddleware, cache=response_cache, paths=DETERMINISTIC_PATHS)
+
+# JSON o MessagePack según Accept; envuelve la caché para que su clave y Vary lo tengan en cuenta
+app.add_middleware(NegotiationMiddleware)
+
+# Métricas por ruta; se registra la última para envolver también los aciertos de caché
+app.add_middleware(MetricsMiddleware, routes=app.routes)
+
+# HTML de la documentación, generado una sola vez al importar
+DOCS_HTML = get_swagger_ui_html(openapi_url="/openapi.json", title="API DateTime").body
+REDOC_HTML = get_redoc_html(openapi_url="/openapi.json", title="API DateTime").body
+
 def docs_route():
-    return get_swagger_ui_html(openapi_url="/openapi.json", title="API DateTime")
+    return HTMLResponse(DOCS_HTML)
+
+@app.get("/openapi.json", include_in_schema=False)
+async def openapi_document():
+    return Response(openapi_static.document(app), media_type="application/json")
+
+@app.get("/docs", include_in_schema=False)
+async def swagger_docs():
+    return docs_route()
+
+@app.get("/redoc", include_in_schema=False)
+async def redoc_docs():
+    return HTMLResponse(REDOC_HTML)
 
 @app.get("/")
-def main():
+async def main():
     """
     Página de Inicio de la API DateTime
 
@@ -27,10 +89,18 @@ def main():
     - **Endpoints**:
         - `/addsubtract`: Suma o resta un intervalo de tiempo a una fecha específica.
         - `/convert`: Convierte una fecha y hora a diferentes zonas horarias.
-        - `/current`: Devuelve la fecha y hora actuales en varios formatos.
+        - `/convert/multi`: Convierte una misma fecha y hora a varias zonas horarias (o a un grupo de zonas) en una sola llamada.
+        - `/format-datetime`: Devuelve una fecha y hora en varios formatos (Unix, RFC 1123, ISO 8601), opcionalmente en una zona horaria.
         - `/dayofweek`: Devuelve el día de la semana para una fecha específica.
         - `/difference`: Calcula la diferencia entre dos fechas y horas.
-        - `/weeknumber`: Devuelve el número de semana ISO para una fecha específica.
+        - `/weeknumber_iso`: Devuelve el número de semana ISO para una fecha específica.
+        - `/timezones`: Lista las zonas horarias IANA disponibles y los grupos de zonas (`/timezones/groups`).
+        - `/calendar`: Consultas de rango (fechas de una semana ISO, días de la semana entre dos fechas, calendarios de feriados).
+        - `/series`: Genera en streaming (NDJSON) todas las fechas entre dos instantes con un paso fijo.
+        - `/evaluate`: Evalúa expresiones de fechas relativas ("last business day of next month").
+        - `/intervals`: Fusión, huecos, solapamientos y totales de conjuntos de intervalos (`/intervals/summary`, `/intervals/merge`, `/intervals/gaps`, `/intervals/overlaps`).
+        - `/cache/stats`: Estado de la caché de respuestas (tamaño, aciertos y fallos).
+        - `/metrics`: Métricas de latencia, rendimiento y errores en formato Prometheus.
 
     Al acceder a esta dirección se espera devolver la documentación de la API en formato HTML.
     """
@@ -41,4 +111,13 @@ app.include_router(convert.router, tags=["EndPoints"])
 app.include_router(current.router, tags=["EndPoints"])
 app.include_router(dayofweek.router, tags=["EndPoints"])
 app.include_router(difference.router, tags=["EndPoints"])
-app.include_router(weeknumber.router, tags=["EndPoints"])
\ No newline at end of file
+app.include_router(weeknumber.router, tags=["EndPoints"])
+app.include_router(timezones.router, tags=["EndPoints"])
+app.include_router(calendarrange.router, tags=["EndPoints"])
+app.include_router(series.router, tags=["EndPoints"])
+app.include_router(evaluate.router, tags=["EndPoints"])
+app.include_router(intervals.router, tags=["EndPoints"])
+app.include_router(cachestats.router, tags=["Monitoring"])
+app.include_router(metrics.router, tags=["Monitoring"])
+
+metrics_registry.record_import(IMPORT_STARTED)
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Los jobs masivos se ejecutan en un hilo del proceso de pruebas, sin pool de procesos
+os.environ.setdefault("DATETIME_BULK_WORKERS", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,6 @@
+from benchmarks import suite
+from main import app
+
+
+def test_every_route_has_a_load_case():
+    assert suite.uncovered_routes(app, suite.load_cases()) == []
@@ -0,0 +1,165 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from core import cache, settings
+from core.cache import DictBackend, MemoryBackend, ResponseCache, ResponseCacheMiddleware
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cached_app(clock, monkeypatch):
+    """A small app behind the cache middleware, with a DictBackend and a fake clock."""
+    monkeypatch.setattr(settings, "CACHE_ENABLED", True)
+    app = FastAPI()
+    calls = []
+
+    @app.get("/square")
+    async def square(n: int):
+        calls.append(n)
+        if n < 0:
+            raise HTTPException(status_code=400, detail="negative")
+        return {"result": n * n}
+
+    response_cache = ResponseCache(DictBackend(clock), ttl=60)
+    app.add_middleware(ResponseCacheMiddleware, cache=response_cache, paths=["/square"])
+    return TestClient(app), response_cache, calls
+
+
+def test_memory_backend_evicts_least_recently_used(clock):
+    backend = MemoryBackend(max_entries=2, clock=clock)
+    backend.set("a", b"1", 60)
+    backend.set("b", b"2", 60)
+    assert backend.get("a") == b"1"  # "a" pasa a ser la más reciente
+    backend.set("c", b"3", 60)
+
+    assert backend.get("b") is None
+    assert backend.get("a") == b"1"
+    assert backend.get("c") == b"3"
+    assert len(backend) == 2
+    assert backend.evictions == 1
+
+
+@pytest.mark.parametrize("make_backend", [lambda clock: MemoryBackend(10, clock), DictBackend])
+def test_backends_expire_entries_after_ttl(make_backend, clock):
+    backend = make_backend(clock)
+    backend.set("key", b"value", 30)
+    clock.now += 30
+    assert backend.get("key") == b"value"
+    clock.now += 1
+    assert backend.get("key") is None
+    assert len(backend) == 0
+
+
+def test_dict_backend_clear():
+    backend = DictBackend()
+    backend.set("key", b"value", 30)
+    backend.clear()
+    assert backend.get("key") is None
+
+
+def test_load_backend_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "dict")
+    assert isinstance(cache._load_backend(), DictBackend)
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "core.cache:DictBackend")
+    assert isinstance(cache._load_backend(), DictBackend)
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "")
+    assert isinstance(cache._load_backend(), MemoryBackend)
+
+
+def test_miss_then_hit(cached_app):
+    client, response_cache, calls = cached_app
+    first = client.get("/square", params={"n": 4})
+    second = client.get("/square", params={"n": 4})
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json() == {"result": 16}
+    assert first.headers["x-cache"] == "MISS"
+    assert second.headers["x-cache"] == "HIT"
+    assert first.headers["etag"] == second.headers["etag"]
+    assert second.headers["cache-control"] == "public, max-age=60"
+    assert calls == [4]
+    assert (response_cache.hits, response_cache.misses) == (1, 1)
+
+
+def test_query_order_does_not_change_the_key(cached_app):
+    client, _, calls = cached_app
+    client.get("/square?n=3&unused=x")
+    response = client.get("/square?unused=x&n=3")
+    assert response.headers["x-cache"] == "HIT"
+    assert calls == [3]
+
+
+def test_if_none_match_returns_304(cached_app):
+    client, _, _ = cached_app
+    etag = client.get("/square", params={"n": 5}).headers["etag"]
+
+    response = client.get("/square", params={"n": 5}, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    response = client.get("/square", params={"n": 5}, headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+
+
+def test_entries_expire_after_ttl(cached_app, clock):
+    client, _, calls = cached_app
+    client.get("/square", params={"n": 2})
+    clock.now += 61
+    response = client.get("/square", params={"n": 2})
+    assert response.headers["x-cache"] == "MISS"
+    assert calls == [2, 2]
+
+
+def test_errors_are_not_cached(cached_app):
+    client, response_cache, calls = cached_app
+    for _ in range(2):
+        response = client.get("/square", params={"n": -1})
+        assert response.status_code == 400
+        assert "x-cache" not in response.headers
+    assert calls == [-1, -1]
+    assert len(response_cache.backend) == 0
+
+
+def test_disabled_cache_passes_through(cached_app, monkeypatch):
+    client, _, calls = cached_app
+    monkeypatch.setattr(settings, "CACHE_ENABLED", False)
+    for _ in range(2):
+        assert "x-cache" not in client.get("/square", params={"n": 6}).headers
+    assert calls == [6, 6]
+
+
+def test_cache_stats_endpoint(monkeypatch):
+    from main import app
+
+    monkeypatch.setattr(settings, "CACHE_ENABLED", True)
+    monkeypatch.setattr(cache.response_cache, "backend", DictBackend())
+    monkeypatch.setattr(cache.response_cache, "hits", 0)
+    monkeypatch.setattr(cache.response_cache, "misses", 0)
+    client = TestClient(app)
+
+    params = {"date_str": "2024-05-29"}
+    assert client.get("/dayofweek/", params=params).headers["x-cache"] == "MISS"
+    assert client.get("/dayofweek/", params=params).headers["x-cache"] == "HIT"
+    assert client.get("/dayofweek/", params=params).headers["x-cache"] == "HIT"
+
+    stats = client.get("/cache/stats/").json()
+    assert stats["enabled"] is True
+    assert stats["backend"] == "DictBackend"
+    assert stats["entries"] == 1
+    assert stats["max_entries"] is None
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["hit_ratio"] == pytest.approx(2 / 3, abs=1e-6)
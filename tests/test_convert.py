@@ -0,0 +1,83 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from core import settings
+from core.transitions import OUT_OF_RANGE_MSG
+from main import app
+
+# 0001-01-01T00:00:00 en Tokio es anterior al año 1 en UTC
+EDGE_ROW = {"date": "0001-01-01", "time": "00:00:00", "from_timezone": "Asia/Tokyo", "to_timezone": "UTC"}
+VALID_ROW = {"date": "2024-05-28", "time": "15:00:00", "from_timezone": "America/Bogota", "to_timezone": "Europe/Madrid"}
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+
+def test_batch_reports_edge_of_range_row_without_failing(client):
+    response = client.post("/convert", json={"items": [VALID_ROW, EDGE_ROW, VALID_ROW]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 3
+    assert body["errors"] == 1
+    assert body["results"][1] == {"index": 1, "error": OUT_OF_RANGE_MSG}
+    assert body["results"][0]["converted"] == "2024-05-28T22:00:00+02:00"
+    assert body["results"][2] == body["results"][0]
+
+
+def test_batch_timestamps_mode_reports_edge_of_range_row(client):
+    response = client.post("/convert", json={
+        "timestamps": ["9999-12-31T23:00:00", "2024-05-28T15:00:00"],
+        "from_timezone": "America/New_York",
+        "to_timezone": "UTC"
+    })
+
+    assert response.status_code == 200
+    assert response.json()["results"][0] == {"index": 0, "error": OUT_OF_RANGE_MSG}
+    assert response.json()["results"][1]["converted"] == "2024-05-28T19:00:00+00:00"
+
+
+def test_get_edge_of_range_is_422(client):
+    response = client.get("/convert", params=EDGE_ROW)
+
+    assert response.status_code == 422
+    assert response.json() == {"detail": OUT_OF_RANGE_MSG}
+
+
+def test_multi_edge_of_range_is_422(client):
+    params = {"date": "0001-01-01", "time": "00:00:00", "from_timezone": "Asia/Tokyo", "to_timezones": "UTC"}
+    response = client.get("/convert/multi", params=params)
+
+    assert response.status_code == 422
+    assert response.json() == {"detail": OUT_OF_RANGE_MSG}
+
+
+def test_multi_target_past_year_9999_is_422(client):
+    params = {"date": "9999-12-31", "time": "23:00:00", "from_timezone": "UTC", "to_timezones": "Europe/Madrid,Asia/Tokyo"}
+    response = client.get("/convert/multi", params=params)
+
+    assert response.status_code == 422
+    assert response.json() == {"detail": OUT_OF_RANGE_MSG}
+
+
+def test_micro_batched_get_edge_of_range_is_422(client, monkeypatch):
+    monkeypatch.setattr(settings, "MICRO_BATCH_WINDOW_MS", 5)
+    monkeypatch.setattr(settings, "CACHE_ENABLED", False)
+    response = client.get("/convert", params=EDGE_ROW)
+
+    assert response.status_code == 422
+    assert response.json() == {"detail": OUT_OF_RANGE_MSG}
+
+
+def test_micro_batched_get_matches_unbatched_before_year_1_utc(client, monkeypatch):
+    # Misma zona: astimezone() no pasa por UTC y la conversión es válida
+    params = dict(EDGE_ROW, to_timezone="Asia/Tokyo")
+    monkeypatch.setattr(settings, "CACHE_ENABLED", False)
+    unbatched = client.get("/convert", params=params)
+    monkeypatch.setattr(settings, "MICRO_BATCH_WINDOW_MS", 5)
+    batched = client.get("/convert", params=params)
+
+    assert unbatched.status_code == batched.status_code == 200
+    assert batched.json() == unbatched.json()
@@ -0,0 +1,32 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from api.current import INVALID_TIMESTAMP_MSG
+from core.transitions import OUT_OF_RANGE_MSG
+from main import app
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+
+def test_get_edge_of_range_reports_range_message(client):
+    response = client.get("/format-datetime/", params={
+        "date": "0001-01-01", "time": "00:00:00", "timezone": "Asia/Tokyo"
+    })
+
+    assert response.status_code == 422
+    assert response.json() == {"detail": OUT_OF_RANGE_MSG}
+
+
+def test_bulk_separates_range_errors_from_format_errors(client):
+    response = client.post("/format-datetime/", json={
+        "timestamps": ["2024-05-29T12:00:00", "0001-01-01T00:00:00", "2024-13-01T00:00:00"],
+        "timezone": "Asia/Tokyo"
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [error["detail"][0]["msg"] for error in body["errors"]] == [OUT_OF_RANGE_MSG, INVALID_TIMESTAMP_MSG]
+    assert body["iso_8601"] == ["2024-05-29T12:00:00+09:00", None, None]
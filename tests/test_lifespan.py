@@ -0,0 +1,17 @@
+from fastapi.testclient import TestClient
+
+import main
+from core import executor, settings
+from core import timezones as timezone_registry
+
+
+def test_lifespan_preloads_zones_and_shuts_down_the_pool(monkeypatch):
+    calls = []
+    monkeypatch.setattr(settings, "PRELOAD_TIMEZONES", True)
+    monkeypatch.setattr(timezone_registry, "preload", lambda: calls.append("preload"))
+    monkeypatch.setattr(executor, "shutdown", lambda: calls.append("shutdown"))
+
+    with TestClient(main.app) as client:
+        assert calls == ["preload"]
+        assert client.get("/dayofweek/", params={"date_str": "2024-05-28"}).status_code == 200
+    assert calls == ["preload", "shutdown"]
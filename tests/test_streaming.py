@@ -0,0 +1,41 @@
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+import api.dayofweek
+from core.transitions import OUT_OF_RANGE_MSG
+from main import app
+
+NDJSON = {"content-type": "application/x-ndjson"}
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+
+def _lines(response) -> list:
+    return [orjson.loads(line) for line in response.content.splitlines()]
+
+
+def test_out_of_range_row_is_a_line_level_422(client):
+    rows = [
+        {"date": "0001-01-01", "time": "00:00:00", "from_timezone": "Asia/Tokyo", "to_timezone": "UTC"},
+        {"date": "2024-05-28", "time": "15:00:00", "from_timezone": "America/Bogota", "to_timezone": "Europe/Madrid"},
+    ]
+    body = b"".join(orjson.dumps(row) + b"\n" for row in rows)
+    lines = _lines(client.post("/convert/stream", content=body, headers=NDJSON))
+
+    assert lines[0] == {"line": 1, "error": {"status_code": 422, "detail": OUT_OF_RANGE_MSG}}
+    assert lines[1]["converted"] == "2024-05-28T22:00:00+02:00"
+
+
+def test_unexpected_error_is_a_line_level_500(client, monkeypatch):
+    def fail(*args):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(api.dayofweek.get_index(), "weekday_of", fail)
+    body = b'{"date_str": "2024-05-28"}\n'
+    lines = _lines(client.post("/dayofweek/stream", content=body, headers=NDJSON))
+
+    assert lines == [{"line": 1, "error": {"status_code": 500, "detail": "Internal Server Error"}}]